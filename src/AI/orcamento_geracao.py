@@ -0,0 +1,159 @@
+"""
+Orçamentos de tempo e de tokens para a geração do relatório executivo.
+
+Sem limite, um pedido "Detalhado" (até 1536 tokens) pode ocupar um núcleo da
+CPU por minutos. Cada nível de detalhe tem um orçamento:
+
+- prazo:  tempo de relógio máximo do pedido inteiro, contado desde o início do
+          resumo de documentos longos (StoppingCriteria e checagem entre lotes)
+- tokens: número máximo de tokens gerados; aplicado pelo max_length do
+          generate(), o orçamento só registra que o teto foi atingido
+- secao:  a 4ª seção (Próximas Ações) já foi escrita e terminou uma frase
+
+Quando prazo ou seção disparam, o generate() para e devolve o que já foi
+gerado; o relatório é montado com esse texto parcial e o limite que parou fica
+registrado (OrcamentoGeracao.limite_atingido).
+"""
+import re
+import time
+
+# Nível de detalhe -> (segundos, tokens gerados)
+ORCAMENTOS = {
+    "Muito Curto": (30, 256),
+    "Curto": (45, 512),
+    "Médio": (60, 768),
+    "Longo": (90, 1024),
+    "Detalhado": (120, 1536),
+}
+ORCAMENTO_PADRAO = ORCAMENTOS["Médio"]
+
+LIMITE_PRAZO = "prazo"
+LIMITE_TOKENS = "tokens"
+LIMITE_SECAO = "secao"
+
+# A detecção de seção decodifica o texto: só a cada tantos tokens
+TOKENS_ENTRE_VERIFICACOES_SECAO = 8
+
+# Texto mínimo depois do título da última seção para considerá-la escrita
+CARACTERES_MINIMOS_ULTIMA_SECAO = 150
+
+_REGEX_ULTIMA_SECAO = re.compile(r"(?:^|\s)4\.\s|Próximas Ações", re.IGNORECASE)
+
+
+def orcamento_do_tamanho(tamanho):
+    """(segundos, tokens) do nível de detalhe."""
+    return ORCAMENTOS.get(tamanho, ORCAMENTO_PADRAO)
+
+
+def secoes_completas(texto):
+    """Indica se a última seção do relatório já foi escrita e terminou uma frase."""
+    encontrado = None
+    for encontrado in _REGEX_ULTIMA_SECAO.finditer(texto):
+        pass
+    if encontrado is None:
+        return False
+    resto = texto[encontrado.end():].rstrip()
+    return len(resto) >= CARACTERES_MINIMOS_ULTIMA_SECAO and resto.endswith((".", "!", "?"))
+
+
+class OrcamentoGeracao:
+    """
+    Critérios de parada de uma geração e o registro de qual deles disparou.
+
+    Uso:
+        orcamento = OrcamentoGeracao(tokenizer, segundos=60, max_tokens=768)
+        orcamento.iniciar()
+        ...  # resumo do documento longo: criterios_prazo() / esgotado()
+        modelo(prompt, max_length=768, stopping_criteria=orcamento.criterios(), ...)
+        orcamento.finalizar()
+        orcamento.limite_atingido  # None, "prazo", "tokens" ou "secao"
+    """
+
+    def __init__(self, tokenizer=None, segundos=None, max_tokens=None, detectar_secoes=True):
+        self.tokenizer = tokenizer
+        self.segundos = segundos
+        self.max_tokens = max_tokens
+        self.detectar_secoes = detectar_secoes and tokenizer is not None
+        self.limite_atingido = None
+        self.tokens_gerados = 0
+        self._inicio = None
+
+    def iniciar(self):
+        """Começa a contar o prazo (no início do pedido, antes do resumo do documento)."""
+        self._inicio = time.monotonic()
+
+    @property
+    def segundos_decorridos(self):
+        return time.monotonic() - self._inicio if self._inicio is not None else 0.0
+
+    def esgotado(self, fracao=1.0):
+        """True se já passou esta fração do prazo (sempre False sem prazo)."""
+        return self.segundos is not None and self.segundos_decorridos >= self.segundos * fracao
+
+    def _verificar(self, input_ids):
+        """True se a geração deve parar; guarda o primeiro limite que disparou."""
+        if self.limite_atingido is not None:
+            return True
+        if self._inicio is None:
+            self.iniciar()
+
+        # Encoder-decoder: input_ids é a saída do decoder (começa com o token inicial)
+        self.tokens_gerados = max(0, input_ids.shape[-1] - 1)
+
+        if self.esgotado():
+            self.limite_atingido = LIMITE_PRAZO
+        elif (self.detectar_secoes and self.tokens_gerados
+              and self.tokens_gerados % TOKENS_ENTRE_VERIFICACOES_SECAO == 0
+              and secoes_completas(self.tokenizer.decode(input_ids[0], skip_special_tokens=True))):
+            self.limite_atingido = LIMITE_SECAO
+        return self.limite_atingido is not None
+
+    def criterios(self):
+        """StoppingCriteriaList com este orçamento (precisa do transformers)."""
+        from transformers import StoppingCriteria, StoppingCriteriaList
+
+        orcamento = self
+
+        class CriterioOrcamento(StoppingCriteria):
+            def __call__(self, input_ids, scores, **kwargs):
+                return orcamento._verificar(input_ids)
+
+        return StoppingCriteriaList([CriterioOrcamento()])
+
+    def criterios_prazo(self, fracao=1.0):
+        """
+        StoppingCriteriaList só com o prazo (resumos parciais do documento longo).
+
+        Não registra limite_atingido: a geração final ainda usa o resto do prazo.
+        """
+        from transformers import StoppingCriteria, StoppingCriteriaList
+
+        orcamento = self
+
+        class CriterioPrazo(StoppingCriteria):
+            def __call__(self, input_ids, scores, **kwargs):
+                return orcamento.esgotado(fracao)
+
+        return StoppingCriteriaList([CriterioPrazo()])
+
+    def finalizar(self):
+        """
+        Depois da geração: registra o teto de tokens se o max_length foi atingido.
+
+        O teto é aplicado pelo max_length do generate() (mesmo valor de
+        max_tokens); aqui só se registra que foi ele que parou a geração.
+        """
+        if (self.limite_atingido is None and self.max_tokens is not None
+                and self.tokens_gerados + 1 >= self.max_tokens):
+            # Mesma contagem do max_length do generate() (inclui o token inicial)
+            self.limite_atingido = LIMITE_TOKENS
+
+    def resumo(self):
+        """dict para logs e para o resultado do relatório."""
+        return {
+            "limite_atingido": self.limite_atingido,
+            "segundos": round(self.segundos_decorridos, 1),
+            "tokens_gerados": self.tokens_gerados,
+            "orcamento_segundos": self.segundos,
+            "orcamento_tokens": self.max_tokens,
+        }
@@ -1,10 +1,41 @@
+import argparse
+import hashlib
+import json
 import sqlite3
 import os
-import re
+import sys
 import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Executado como script (python src/AI/processador_ia.py): src precisa estar no path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from AI import registro_modelos
+from AI.backends_modelo import backend_configurado, criar_pipeline
+from AI.prompt_relatorio import montar_prompt, tokens_para_documento
+from AI.orcamento_geracao import LIMITE_PRAZO, OrcamentoGeracao, orcamento_do_tamanho
+from AI.varredor_padroes import percentuais_para_graficos, varrer_documento
+from AI.analise_texto import analisar_texto
+from Database.cache_geracao import CacheGeracao, montar_chave
+from Database.upsert_projetos import garantir_coluna_hash_insight
+from Database.indice_termos import garantir_tabelas_indice, palavras_chave
+from AI.resumo_longo import condensar_documento
 
 # --- Configuração ---
 CAMINHO_BANCO = os.path.join("data", "projetos_sonae.db")
+NOME_MODELO = "google/flan-t5-base"
+
+# Geração greedy (reprodutível e com cache de resultados) em vez de amostragem
+GERACAO_DETERMINISTICA = os.getenv("GERACAO_DETERMINISTICA", "1") != "0"
+
+# Muda quando o prompt ou a formatação do relatório mudam (invalida o cache de geração)
+VERSAO_RELATORIO = "3"
+
+# Muda quando gerar_insight_estruturado muda: todos os insights ficam desatualizados
+VERSAO_INSIGHT = "1"
 
 # Criar diretório de logs se não existir
 os.makedirs("logs", exist_ok=True)
@@ -19,6 +50,10 @@ logging.basicConfig(
     ]
 )
 
+class GeracaoCancelada(Exception):
+    """Levantada pelo callback de progresso para interromper uma geração em andamento."""
+
+
 class ProcessadorIA:
     """
     Classe para processar informações de documentos usando IA.
@@ -57,29 +92,32 @@ class ProcessadorIA:
             }
         
         try:
+            # Uma única análise do texto alimenta todos os extratores
+            analise = analisar_texto(texto)
+            
             # Extrai conceitos-chave para categorização
-            conceitos = extrair_conceitos_chave(texto, max_conceitos=3)
+            conceitos = analise.conceitos(3)
             categoria = conceitos[0] if conceitos else ''
             
             # Extrai frase principal como nome do projeto
-            nome = extrair_frase_principal(texto)
+            nome = analise.frase_principal
             if not nome:
                 nome = texto[:100].strip()
             
             # Gera descrição resumida
             descricao = texto[:500].strip()
             
-            # Tenta extrair informações estruturadas
-            dados = _extrair_dados_contextualizados(texto)
+            # Informações estruturadas da varredura do documento
+            status = analise.varredura.status
             
             return {
                 'nome': nome,
                 'descricao': descricao,
                 'categoria': categoria,
-                'responsavel': dados.get('responsavel', ''),
-                'orcamento': dados.get('orcamento'),
-                'data_inicio': dados.get('data_inicio'),
-                'data_fim': dados.get('data_fim'),
+                'responsavel': status.get('Responsável', ''),
+                'orcamento': None,
+                'data_inicio': None,
+                'data_fim': None,
                 'tags': ', '.join(conceitos) if conceitos else ''
             }
             
@@ -96,32 +134,173 @@ class ProcessadorIA:
                 'tags': ''
             }
 
-def carregar_modelo():
+def _criar_pipeline_flan_t5(backend=None):
+    """Cria o pipeline FLAN-T5 (caro: segundos e centenas de MB). Use carregar_modelo()."""
+    return criar_pipeline(NOME_MODELO, backend or backend_configurado())
+
+
+def _chave_modelo(backend=None):
+    # Cada backend é um modelo diferente no registro (podem coexistir numa comparação)
+    return f"{NOME_MODELO}:{backend or backend_configurado()}"
+
+
+def _aquecer_flan_t5(modelo):
+    """Inferência curta para inicializar o modelo antes do primeiro relatório."""
+    modelo("Resuma: projeto em andamento.", max_length=8)
+
+
+def carregar_modelo(esperar=True, timeout=None, backend=None):
     """
-    Carrega o modelo FLAN-T5 para geração de texto.
+    Retorna o modelo FLAN-T5 compartilhado pelo processo.
+    
+    O pipeline é criado uma única vez e reaproveitado por todas as sessões e
+    reruns; se o aquecimento em segundo plano ainda estiver rodando, espera por ele.
+    
+    Args:
+        esperar: Se False, retorna None na hora caso o modelo ainda esteja carregando
+        timeout: Segundos máximos de espera (None = sem limite)
+        backend: fp32, int8 ou onnx (None = BACKEND_MODELO_IA, ver AI/backends_modelo.py)
     
     Returns:
         Pipeline do modelo ou None se falhar
     """
-    try:
-        from transformers import pipeline
-        
-        logging.info("Carregando modelo FLAN-T5...")
-        
-        modelo = pipeline(
-            "text2text-generation",
-            model="google/flan-t5-base",
-            device=-1  # CPU
-        )
-        
-        logging.info("Modelo FLAN-T5 carregado com sucesso!")
-        return modelo
-        
-    except Exception as e:
-        logging.error(f"Erro ao carregar modelo: {e}")
+    backend = backend or backend_configurado()
+    return registro_modelos.obter_modelo(
+        _chave_modelo(backend), lambda: _criar_pipeline_flan_t5(backend),
+        esperar=esperar, timeout=timeout
+    )
+
+
+def iniciar_aquecimento_modelo():
+    """Começa a carregar o FLAN-T5 em segundo plano (chamar na subida do app)."""
+    return registro_modelos.aquecer_modelo(_chave_modelo(), _criar_pipeline_flan_t5, _aquecer_flan_t5)
+
+
+def modelo_pronto():
+    """Indica se o FLAN-T5 já está carregado no processo."""
+    return registro_modelos.estado_modelo(_chave_modelo()) == registro_modelos.ESTADO_PRONTO
+
+
+_cache_geracao = None
+
+
+def obter_cache_geracao():
+    """Cache de relatórios compartilhado pelo processo (None se o banco não puder ser aberto)."""
+    global _cache_geracao
+    if _cache_geracao is None:
+        try:
+            _cache_geracao = CacheGeracao()
+        except Exception as e:
+            logging.warning(f"Cache de geração indisponível: {e}")
+            return None
+    return _cache_geracao
+
+
+def _identificador_modelo(modelo):
+    """
+    Nome do modelo carregado + backend com que foi criado (parte da chave do cache de geração).
+
+    Returns:
+        str, ou None se o backend do pipeline for desconhecido (não criado por
+        criar_pipeline): nesse caso o relatório não usa o cache
+    """
+    backend = getattr(modelo, "backend_modelo", None)
+    if backend is None:
         return None
+    nome = getattr(getattr(modelo, "model", None), "name_or_path", None) or NOME_MODELO
+    return f"{nome}:{backend}"
+
+
+def _parametros_geracao(tamanho, deterministico):
+    """Parâmetros passados ao pipeline para o relatório final."""
+    parametros = {
+        # Teto de tokens do nível de detalhe (ver AI/orcamento_geracao.py)
+        "max_length": orcamento_do_tamanho(tamanho)[1],
+        "min_length": 100,
+    }
+    if deterministico:
+        parametros.update(do_sample=False, num_beams=1)
+    else:
+        parametros.update(temperature=0.7, do_sample=True, top_p=0.9)
+    return parametros
+
+
+# Intervalo mínimo entre consultas de cancelamento durante a geração (o critério roda a cada token)
+INTERVALO_VERIFICAR_CANCELAMENTO = 0.5
+
+
+def _criterio_cancelamento(cancelado):
+    """StoppingCriteria que encerra a geração quando cancelado() devolve True."""
+    from transformers import StoppingCriteria
+    
+    class CriterioCancelamento(StoppingCriteria):
+        def __init__(self):
+            self.foi_cancelado = False
+            self._ultima_verificacao = 0.0
+        
+        def __call__(self, input_ids, scores, **kwargs):
+            agora = time.monotonic()
+            if not self.foi_cancelado and agora - self._ultima_verificacao >= INTERVALO_VERIFICAR_CANCELAMENTO:
+                self._ultima_verificacao = agora
+                self.foi_cancelado = bool(cancelado())
+            return self.foi_cancelado
+    
+    return CriterioCancelamento()
+
+
+def gerar_com_streaming(modelo, prompt, parametros, ao_receber_texto, cancelado=None, criterios=None):
+    """
+    Gera o texto token a token (TextIteratorStreamer) em vez de esperar o fim da geração.
+    
+    Args:
+        modelo: Pipeline text2text-generation
+        prompt: Prompt completo
+        parametros: Parâmetros de geração do pipeline
+        ao_receber_texto: Função chamada com o texto acumulado a cada pedaço gerado
+        cancelado: Função opcional; se devolver True a geração para e GeracaoCancelada é levantada
+        criterios: StoppingCriteriaList opcional (ex: orçamento de tempo/tokens)
+    
+    Returns:
+        str: texto gerado completo
+    """
+    from transformers import StoppingCriteriaList, TextIteratorStreamer
+    
+    streamer = TextIteratorStreamer(modelo.tokenizer, skip_prompt=True, skip_special_tokens=True)
+    criterios = StoppingCriteriaList(criterios or [])
+    criterio_cancelamento = None
+    if cancelado is not None:
+        criterio_cancelamento = _criterio_cancelamento(cancelado)
+        criterios.append(criterio_cancelamento)
+    
+    erros = []
+    
+    def gerar():
+        try:
+            modelo(prompt, streamer=streamer, stopping_criteria=criterios, **parametros)
+        except Exception as e:
+            erros.append(e)
+            # Sem isto o laço abaixo esperaria para sempre por tokens que não vêm
+            streamer.end()
+    
+    thread = threading.Thread(target=gerar, name="gerar-streaming", daemon=True)
+    thread.start()
+    
+    texto = ""
+    for pedaco in streamer:
+        texto += pedaco
+        ao_receber_texto(texto)
+    thread.join()
+    
+    if erros:
+        raise erros[0]
+    if criterio_cancelamento is not None and criterio_cancelamento.foi_cancelado:
+        raise GeracaoCancelada()
+    return texto
 
-def gerar_relatorio_executivo(modelo, conteudo, tamanho, prompt_personalizado="", incluir_graficos=False):
+
+def gerar_relatorio_executivo(modelo, conteudo, tamanho, prompt_personalizado="", incluir_graficos=False,
+                              documento_longo=True, progresso=None, deterministico=None,
+                              ao_receber_texto=None, cancelado=None):
     """
     Gera um relatório executivo completo analisando o conteúdo fornecido.
     
@@ -131,209 +310,127 @@ def gerar_relatorio_executivo(modelo, conteudo, tamanho, prompt_personalizado=""
         tamanho: Nível de detalhe (Muito Curto, Curto, Médio, Longo, Detalhado)
         prompt_personalizado: Instruções adicionais do usuário
         incluir_graficos: Se deve incluir análise de dados para gráficos (não utilizado)
+        documento_longo: Se True, documentos maiores que a janela do modelo são
+            resumidos por trechos (map-reduce); se False, são cortados no
+            orçamento de tokens
+        progresso: Função opcional chamada com (etapa, fração de 0 a 1)
+        deterministico: Geração greedy com cache de resultados
+            (None = GERACAO_DETERMINISTICA); False = amostragem, sem cache
+        ao_receber_texto: Função opcional chamada com o texto parcial enquanto o
+            modelo gera (streaming); o texto é o bruto, antes da formatação
+        cancelado: Função opcional consultada durante a geração; se devolver
+            True, a geração para e GeracaoCancelada é levantada
     
     Returns:
-        dict: {"texto": str, "dados_graficos": dict}
+        dict: {"texto": str, "dados_graficos": dict, "tokens": dict com tokens
+        usados/descartados do prompt, "orcamento": dict com o limite de
+        tempo/tokens atingido (None em ambos se veio do cache ou falhou)}
     """
+    conteudo_original = conteudo
+    if deterministico is None:
+        deterministico = GERACAO_DETERMINISTICA
+    parametros = _parametros_geracao(tamanho, deterministico)
+    
+    # Pedido idêntico já gerado (por qualquer usuário): devolve sem rodar o modelo
+    modelo_id = _identificador_modelo(modelo) if deterministico else None
+    cache = obter_cache_geracao() if modelo_id is not None else None
+    chave_cache = None
+    if cache is not None:
+        chave_cache = montar_chave(
+            conteudo_original, tamanho, prompt_personalizado, modelo_id,
+            dict(parametros, documento_longo=documento_longo, versao=VERSAO_RELATORIO)
+        )
+        texto_cache = cache.buscar(chave_cache)
+        if texto_cache is not None:
+            logging.info("Relatório executivo encontrado no cache de geração")
+            return {"texto": texto_cache, "dados_graficos": None, "tokens": None, "orcamento": None}
+    
     try:
-        # Limitar conteúdo para não sobrecarregar
-        max_chars_map = {
-            "Muito Curto": 3000,
-            "Curto": 4000,
-            "Médio": 5000,
-            "Longo": 7000,
-            "Detalhado": 10000
-        }
-        max_chars = max_chars_map.get(tamanho, 5000)
-        
-        if len(conteudo) > max_chars:
-            conteudo = conteudo[:max_chars]
-        
-        # Determinar instruções de tamanho
-        tamanho_instrucoes = {
-            "Muito Curto": "Seja MUITO CONCISO. Máximo 3-4 parágrafos curtos.",
-            "Curto": "Seja CONCISO. Máximo 5-6 parágrafos.",
-            "Médio": "Seja equilibrado. Entre 8-10 parágrafos bem estruturados.",
-            "Longo": "Seja DETALHADO. Entre 12-15 parágrafos com análise profunda.",
-            "Detalhado": "Seja EXTREMAMENTE DETALHADO. Análise completa e aprofundada com todos os aspectos relevantes."
-        }
+        tokenizer = getattr(modelo, "tokenizer", None)
+        # Orçamento de tempo/tokens do nível de detalhe: o prazo vale para o pedido
+        # inteiro (resumo do documento longo + relatório); ao estourar, fica o texto parcial
+        segundos, max_tokens = orcamento_do_tamanho(tamanho)
+        orcamento = OrcamentoGeracao(tokenizer, segundos, max_tokens)
+        orcamento.iniciar()
         
-        instrucao_tamanho = tamanho_instrucoes.get(tamanho, "Seja equilibrado e profissional.")
+        if documento_longo:
+            # Resume o documento inteiro por trechos até caber no espaço livre do prompt
+            def progresso_trechos(nivel, feitos, total):
+                if progresso:
+                    fracao = 0.8 * feitos / total if nivel == 1 else 0.85
+                    progresso(f"Resumindo trechos do documento ({feitos}/{total})", fracao)
+            
+            conteudo = condensar_documento(
+                modelo, conteudo,
+                tokens_alvo=tokens_para_documento(tokenizer, tamanho, prompt_personalizado),
+                progresso=progresso_trechos,
+                orcamento=orcamento
+            )
         
-        # Construir prompt SIMPLES para FLAN-T5
-        prompt = f"""Analise este documento e crie um relatório executivo profissional em português.
-
-Documento:
-{conteudo}
-
-Crie um relatório com estas 4 seções:
-
-1. Análise do Documento - Resuma o objetivo e contexto em 2-3 parágrafos
-
-2. Dados e Informações Relevantes - Liste os dados principais:
-   - Percentuais e métricas
-   - Valores e orçamentos  
-   - Datas e prazos
-   - Status e responsáveis
-
-3. Insights Estratégicos - Analise riscos, oportunidades e pontos de atenção em 2-3 parágrafos
-
-4. Próximas Ações Recomendadas - Liste 3-5 ações práticas baseadas no documento
-
-{instrucao_tamanho}
-{f'Foco especial: {prompt_personalizado}' if prompt_personalizado else ''}
-
-Relatório:"""
+        # Prompt cortado em tokens, exatamente na janela do modelo
+        prompt, informacoes_tokens = montar_prompt(conteudo, tamanho, prompt_personalizado, tokenizer)
         
         # Gerar relatório com FLAN-T5
         logging.info(f"Gerando relatório executivo com FLAN-T5 (tamanho: {tamanho})")
+        if progresso:
+            progresso("Escrevendo o relatório executivo", 0.9)
         
-        # Configurações de geração
-        max_length_map = {
-            "Muito Curto": 256,
-            "Curto": 512,
-            "Médio": 768,
-            "Longo": 1024,
-            "Detalhado": 1536
-        }
+        try:
+            criterios = orcamento.criterios()
+        except ImportError:
+            criterios = None
         
-        resultado = modelo(
-            prompt,
-            max_length=max_length_map.get(tamanho, 768),
-            min_length=100,
-            temperature=0.7,
-            do_sample=True,
-            top_p=0.9
-        )
+        if ao_receber_texto and tokenizer is not None:
+            texto_gerado = gerar_com_streaming(
+                modelo, prompt, parametros, ao_receber_texto, cancelado, criterios
+            )
+        else:
+            if criterios is not None:
+                parametros = dict(parametros, stopping_criteria=criterios)
+            resultado = modelo(prompt, **parametros)
+            texto_gerado = resultado[0]['generated_text']
         
+        orcamento.finalizar()
+        informacoes_orcamento = orcamento.resumo()
+        if orcamento.limite_atingido:
+            logging.info(
+                f"Geração parada pelo orçamento ({orcamento.limite_atingido}): "
+                f"{informacoes_orcamento['tokens_gerados']} tokens em {informacoes_orcamento['segundos']}s"
+            )
         logging.info("Relatório gerado com sucesso pelo FLAN-T5!")
-        texto_gerado = resultado[0]['generated_text']
         
-        # Formatação do relatório
-        relatorio_formatado = _formatar_relatorio(texto_gerado, conteudo)
+        # Formatação do relatório (dados extraídos do documento inteiro, não só do resumo)
+        relatorio_formatado = _formatar_relatorio(texto_gerado, conteudo_original)
+        # Parado pelo relógio, o texto depende da carga da máquina: não vai para o cache
+        if chave_cache is not None and orcamento.limite_atingido != LIMITE_PRAZO:
+            cache.salvar(chave_cache, modelo_id, relatorio_formatado)
         
         # Não gerar gráficos
         return {
             "texto": relatorio_formatado,
-            "dados_graficos": None
+            "dados_graficos": None,
+            "tokens": informacoes_tokens,
+            "orcamento": informacoes_orcamento
         }
         
+    except GeracaoCancelada:
+        raise
     except Exception as e:
         logging.error(f"Erro ao gerar relatório com FLAN-T5: {e}")
         # Retornar análise básica em caso de erro
         return {
-            "texto": _gerar_relatorio_basico(conteudo, prompt_personalizado),
-            "dados_graficos": None
+            "texto": _gerar_relatorio_basico(conteudo_original, prompt_personalizado),
+            "dados_graficos": None,
+            "tokens": None,
+            "orcamento": None
         }
 
 def _gerar_graficos_analise(conteudo):
     """Gera dados para gráficos com base no conteúdo analisado"""
-    import re
-    
     graficos = {}
     
-    # Palavras-chave que indicam dados IRRELEVANTES (genéricos/exemplos)
-    palavras_irrelevantes = [
-        'exemplo', 'modelo', 'template', 'amostra', 'ilustração',
-        'hipotético', 'fictício', 'simulação', 'teste', 'demo'
-    ]
-    
-    # Tentar extrair percentuais REAIS para gráfico de progresso
-    percentuais_com_label = []
-    
-    # Padrões com PRIORIDADE (mais específicos primeiro, genéricos depois)
-    padroes_prioritarios = [
-        # Padrão 1: Lista com marcador (mais específico)
-        (r'[-•]\s*([A-Za-zÀ-ÿ][^:\n]{10,150}):\s*(\d+)%', 10),
-        # Padrão 2: Lista invertida
-        (r'[-•]\s*(\d+)%\s+(?:de\s+)?([A-Za-zÀ-ÿ][^\n]{10,100})', 9),
-    ]
-    
-    padroes_genericos = [
-        # Padrão 3: Label seguido de percentual (sem marcador)
-        (r'([A-Za-zÀ-ÿ][^:\n]{10,100}):\s*(\d+)%', 5),
-        # Padrão 4: Percentual seguido de label
-        (r'(\d+)%\s+(?:de\s+)?([A-Za-zÀ-ÿ][^\n]{10,80})', 4),
-        # Padrão 5: Label com verbo de conclusão
-        (r'([A-Za-zÀ-ÿ][^\n]{10,80})\s+(?:está|atingiu|alcançou)?\s*(?:em\s+)?(\d+)%', 3),
-    ]
-    
-    linhas_conteudo = conteudo.split('\n')
-    
-    # Primeira passagem: tentar padrões prioritários
-    for linha in linhas_conteudo:
-        linha_lower = linha.lower()
-        
-        # Ignorar linhas com palavras irrelevantes
-        if any(palavra in linha_lower for palavra in palavras_irrelevantes):
-            continue
-        
-        # Ignorar linha se for apenas título genérico (como "concluído: 100%")
-        if re.match(r'^\s*[a-zç]{1,15}\s*:\s*\d+%\s*$', linha.strip(), re.IGNORECASE):
-            continue
-        
-        for padrao, prioridade in padroes_prioritarios:
-            matches = re.findall(padrao, linha, re.IGNORECASE)
-            for match in matches:
-                if len(match) == 2:
-                    label = match[0].strip() if not match[0].isdigit() else match[1].strip()
-                    valor = match[1] if not match[0].isdigit() else match[0]
-                    
-                    try:
-                        valor_num = int(valor)
-                        if 0 < valor_num <= 100:
-                            # Limpar sufixos desnecessários do label
-                            label_limpo = re.sub(r'\s+(concluído|concluída|finalizado|finalizada|completo|completa).*$', '', label, flags=re.IGNORECASE)
-                            label_limpo = re.sub(r'[:\-]$', '', label_limpo).strip()
-                            label_limpo = label_limpo[:60]
-                            
-                            # Validar tamanho mínimo
-                            if len(label_limpo) >= 8 and re.search(r'[a-zA-ZÀ-ÿ]{5,}', label_limpo):
-                                # Evitar duplicatas
-                                if not any(p['label'].lower() == label_limpo.lower() for p in percentuais_com_label):
-                                    percentuais_com_label.append({
-                                        'label': label_limpo,
-                                        'valor': valor_num,
-                                        'prioridade': prioridade
-                                    })
-                    except:
-                        pass
-    
-    # Segunda passagem: se não encontrou itens suficientes, usar padrões genéricos
-    if len(percentuais_com_label) < 2:
-        for linha in linhas_conteudo:
-            linha_lower = linha.lower()
-            
-            if any(palavra in linha_lower for palavra in palavras_irrelevantes):
-                continue
-            
-            if re.match(r'^\s*[a-zç]{1,15}\s*:\s*\d+%\s*$', linha.strip(), re.IGNORECASE):
-                continue
-            
-            for padrao, prioridade in padroes_genericos:
-                matches = re.findall(padrao, linha, re.IGNORECASE)
-                for match in matches:
-                    if len(match) == 2:
-                        label = match[0].strip() if not match[0].isdigit() else match[1].strip()
-                        valor = match[1] if not match[0].isdigit() else match[0]
-                        
-                        try:
-                            valor_num = int(valor)
-                            if 0 < valor_num <= 100:
-                                label_limpo = re.sub(r'\s+(concluído|concluída|finalizado|finalizada|completo|completa).*$', '', label, flags=re.IGNORECASE)
-                                label_limpo = re.sub(r'[:\-]$', '', label_limpo).strip()
-                                label_limpo = label_limpo[:60]
-                                
-                                # Para padrões genéricos, ser um pouco mais flexível no tamanho
-                                if len(label_limpo) >= 5 and re.search(r'[a-zA-ZÀ-ÿ]{3,}', label_limpo):
-                                    if not any(p['label'].lower() == label_limpo.lower() for p in percentuais_com_label):
-                                        percentuais_com_label.append({
-                                            'label': label_limpo,
-                                            'valor': valor_num,
-                                            'prioridade': prioridade
-                                        })
-                        except:
-                            pass
+    # Percentuais REAIS para gráfico de progresso (varredura única, ver AI/varredor_padroes.py)
+    percentuais_com_label = percentuais_para_graficos(conteudo)
     
     # Gerar gráfico apenas se houver dados válidos (mínimo 2, máximo 8)
     if len(percentuais_com_label) >= 2:
@@ -466,89 +563,12 @@ Baseado na análise do documento:
 
 def _extrair_dados_contextualizados(texto):
     """Extrai dados numéricos com contexto real do texto"""
-    import re
-    
     dados = []
     
-    # Palavras-chave que indicam dados IRRELEVANTES
-    palavras_irrelevantes = [
-        'exemplo', 'modelo', 'template', 'amostra', 'ilustração',
-        'hipotético', 'fictício', 'simulação', 'teste', 'demo',
-        'padrão', 'genérico', 'default'
-    ]
-    
-    # Buscar percentuais com contexto mais amplo
-    linhas = texto.split('\n')
-    percentuais_encontrados = []
-    
-    for linha in linhas:
-        # Ignorar linhas inteiras com palavras irrelevantes
-        linha_lower = linha.lower()
-        if any(palavra in linha_lower for palavra in palavras_irrelevantes):
-            continue
-        
-        # Ignorar linhas genéricas tipo "concluído: 100%" (títulos curtos)
-        if re.match(r'^\s*[a-zç]{1,15}\s*:\s*\d+%\s*$', linha.strip(), re.IGNORECASE):
-            continue
-        
-        # PRIORIDADE 1: Procurar padrões de lista com percentual
-        # "- Desenvolvimento da estrutura: 100% concluído"
-        match_lista = re.search(r'[-•]\s*([^:\n]{10,150}):\s*(\d+)%', linha, re.IGNORECASE)
-        if match_lista:
-            label = match_lista.group(1).strip()
-            valor = match_lista.group(2)
-            
-            # Limpar sufixos desnecessários
-            label_limpo = re.sub(r'\s+(concluído|concluída|finalizado|finalizada|completo|completa).*$', '', label, flags=re.IGNORECASE)
-            label_limpo = label_limpo.strip()
-            
-            # Validar
-            if len(label_limpo) >= 8 and re.search(r'[a-zA-ZÀ-ÿ]{5,}', label_limpo):
-                contexto = f"{label_limpo}: {valor}%"
-                
-                # Evitar duplicatas
-                if not any(p['valor'] == valor and label_limpo.lower() in p['contexto'].lower() for p in percentuais_encontrados):
-                    percentuais_encontrados.append({
-                        'valor': valor,
-                        'contexto': contexto,
-                        'prioridade': 10
-                    })
-            continue
-        
-        # PRIORIDADE 2: Procurar outros padrões de percentual com contexto
-        matches = re.finditer(r'(.{0,80})(\d+)%(.{0,80})', linha, re.IGNORECASE)
-        for match in matches:
-            contexto_antes = match.group(1).strip()
-            valor = match.group(2)
-            contexto_depois = match.group(3).strip()
-            
-            # Ignorar percentuais de 0% sem contexto relevante
-            if valor == '0' and not any(palavra in linha_lower for palavra in ['progresso', 'conclusão', 'andamento', 'completo']):
-                continue
-            
-            # Montar contexto completo
-            contexto_completo = f"{contexto_antes} {valor}% {contexto_depois}".strip()
-            
-            # Limpar contexto de caracteres especiais no início/fim
-            contexto_completo = re.sub(r'^[:\-\s]+|[:\-\s]+$', '', contexto_completo)
-            
-            # Validar que o contexto tem pelo menos algum texto significativo
-            texto_sem_percentual = contexto_completo.replace(f'{valor}%', '').strip()
-            if len(texto_sem_percentual) < 8:  # Reduzido de 10 para 8 para ser mais flexível
-                continue
-            
-            # Validar que tem texto alfabético real (não apenas números/símbolos)
-            if not re.search(r'[a-zA-ZÀ-ÿ]{4,}', texto_sem_percentual):  # Reduzido de 5 para 4
-                continue
-            
-            # Evitar duplicatas exatas ou muito similares
-            if not any(p['valor'] == valor and p['contexto'][:40] == contexto_completo[:40] for p in percentuais_encontrados):
-                percentuais_encontrados.append({
-                    'valor': valor,
-                    'contexto': contexto_completo[:200],
-                    'prioridade': 5
-                })
+    # Percentuais, status e datas saem da mesma passada pelo texto (AI/varredor_padroes.py)
+    varredura = varrer_documento(texto)
     
+    percentuais_encontrados = varredura.percentuais_dados
     if percentuais_encontrados:
         # Ordenar por prioridade e limitar a 8 itens mais relevantes
         percentuais_encontrados = sorted(percentuais_encontrados, key=lambda x: x['prioridade'], reverse=True)[:8]
@@ -566,56 +586,15 @@ def _extrair_dados_contextualizados(texto):
                 'valores': valores
             })
     
-    # Buscar informações de prazo e status (evitar duplicatas e dados genéricos)
-    status_info = {}
-    padroes_status = [
-        (r'status:?\s*([^\n.]{5,100})', 'Status'),
-        (r'situação:?\s*([^\n.]{5,100})', 'Situação'),
-        (r'responsável:?\s*([^\n.]{3,80})', 'Responsável'),
-    ]
-    
-    for linha in linhas:
-        # Ignorar linhas com palavras irrelevantes
-        if any(palavra in linha.lower() for palavra in palavras_irrelevantes):
-            continue
-            
-        for padrao, categoria in padroes_status:
-            if categoria not in status_info:  # Evitar duplicatas de categoria
-                matches = re.findall(padrao, linha, re.IGNORECASE)
-                if matches:
-                    info = matches[0] if isinstance(matches[0], str) else matches[0][0]
-                    info_limpa = info.strip()[:150]
-                    
-                    # Validar que não é genérico demais
-                    if info_limpa and len(info_limpa) > 5:
-                        # Deve conter letras reais
-                        if re.search(r'[a-zA-ZÀ-ÿ]{3,}', info_limpa):
-                            status_info[categoria] = info_limpa
-    
-    if status_info:
-        valores_formatados = [f"{cat}: {val}" for cat, val in status_info.items()]
+    if varredura.status:
+        valores_formatados = [f"{cat}: {val}" for cat, val in varredura.status.items()]
         dados.append({
             'categoria': 'ℹ️ Informações do Projeto',
             'descricao': 'Detalhes identificados no documento:',
             'valores': valores_formatados
         })
     
-    # Buscar datas específicas (sem duplicatas)
-    datas_encontradas = set()
-    padroes_data = [
-        r'\b(\d{1,2}/\d{1,2}/\d{4})\b',  # Datas dd/mm/yyyy
-    ]
-    
-    for linha in linhas:
-        # Ignorar linhas com palavras irrelevantes
-        if any(palavra in linha.lower() for palavra in palavras_irrelevantes):
-            continue
-            
-        for padrao in padroes_data:
-            matches = re.findall(padrao, linha)
-            for data in matches[:5]:
-                datas_encontradas.add(data)
-    
+    datas_encontradas = varredura.datas
     if datas_encontradas and len(datas_encontradas) <= 10:  # Limitar para evitar lixo
         dados.append({
             'categoria': 'Prazos e Datas',
@@ -625,41 +604,34 @@ def _extrair_dados_contextualizados(texto):
     
     return dados if dados else None
 
-def _extrair_palavras_chave(texto):
-    """Extrai palavras-chave relevantes e específicas do texto"""
-    import re
-    from collections import Counter
-    
-    # Lista expandida de stop words
-    stop_words = {'de', 'a', 'o', 'que', 'e', 'do', 'da', 'em', 'um', 'para', 'com', 'não', 'uma', 'os', 'no', 'se', 'na', 'por', 'mais', 'as', 'dos', 'como', 'mas', 'ao', 'ele', 'das', 'à', 'seu', 'sua', 'ou', 'quando', 'muito', 'nos', 'já', 'eu', 'também', 'só', 'pelo', 'pela', 'até', 'isso', 'ela', 'entre', 'depois', 'sem', 'mesmo', 'aos', 'ter', 'seus', 'quem', 'nas', 'me', 'esse', 'eles', 'você', 'essa', 'num', 'nem', 'suas', 'meu', 'às', 'minha', 'numa', 'pelos', 'elas', 'qual', 'nós', 'lhe', 'deles', 'essas', 'esses', 'pelas', 'este', 'dele', 'sido', 'sendo', 'estar', 'sobre', 'pode', 'fazer', 'cada', 'outro', 'outra', 'outros', 'outras', 'bem', 'ainda', 'onde', 'enquanto', 'antes', 'após', 'todas', 'todos', 'qualquer', 'algum', 'alguma', 'alguns', 'algumas', 'nenhum', 'nenhuma', 'mesmo', 'mesma', 'mesmos', 'mesmas'}
-    
-    # Termos genéricos de documentos que devem ser filtrados
-    termos_genericos = {'documento', 'relatório', 'análise', 'arquivo', 'conteúdo', 'informação', 'dados', 'sistema', 'projeto', 'seguinte', 'execução', 'exemplo', 'forma', 'parte', 'através', 'devido', 'conforme', 'segundo', 'durante', 'desta', 'deste', 'dessa', 'desse'}
-    
-    # Extrair apenas substantivos e termos técnicos (5+ caracteres)
-    palavras = re.findall(r'\b[A-ZÁÀÂÃÉÈÊÍÏÓÔÕÖÚÇÑ][a-záàâãéèêíïóôõöúçñ]{4,}\b', texto)
-    
-    # Filtrar stop words e termos genéricos
-    palavras_filtradas = [
-        p.lower() for p in palavras 
-        if p.lower() not in stop_words and p.lower() not in termos_genericos
-    ]
-    
-    # Contar frequência
-    contador = Counter(palavras_filtradas)
-    
-    # Priorizar palavras que aparecem mais de uma vez
-    palavras_relevantes = [
-        palavra for palavra, freq in contador.most_common(20)
-        if freq >= 2  # Aparecem pelo menos 2 vezes
-    ]
+def _extrair_palavras_chave(texto, quantidade=10, cursor=None):
+    """
+    Palavras-chave do texto, ordenadas por TF-IDF em relação ao corpus de
+    projetos e relatórios salvos (ver Database/indice_termos.py).
     
-    # Se não houver palavras repetidas suficientes, pegar as mais comuns
-    if len(palavras_relevantes) < 5:
-        palavras_relevantes = [palavra for palavra, _ in contador.most_common(10)]
+    Args:
+        texto: Texto do documento
+        quantidade: Número máximo de palavras-chave
+        cursor: Cursor de uma conexão já aberta com o banco (opcional)
     
-    # Capitalizar primeira letra
-    return [palavra.capitalize() for palavra in palavras_relevantes[:10]]
+    Returns:
+        list: Palavras-chave capitalizadas (vazia se o índice não puder ser lido)
+    """
+    conexao = None
+    try:
+        if cursor is None:
+            conexao = get_db_connection()
+            if conexao is None:
+                return []
+            cursor = conexao.cursor()
+        garantir_tabelas_indice(cursor.connection)
+        return [termo.capitalize() for termo, _ in palavras_chave(cursor, texto, quantidade)]
+    except Exception as e:
+        logging.error(f"Erro ao extrair palavras-chave: {e}")
+        return []
+    finally:
+        if conexao:
+            conexao.close()
 
 def _gerar_relatorio_basico(conteudo, prompt_personalizado):
     """Gera um relatório básico caso a IA falhe"""
@@ -710,27 +682,9 @@ def extrair_conceitos_chave(texto, max_conceitos=3):
         max_conceitos: Número máximo de conceitos a extrair
         
     Returns:
-        list: Lista de conceitos-chave
-    """
-    # Palavras-chave técnicas relevantes
-    palavras_relevantes = [
-        'dados', 'análise', 'integração', 'riscos', 'gestão', 'monitoramento',
-        'indicadores', 'desempenho', 'automação', 'ETL', 'API', 'dashboard',
-        'relatórios', 'métricas', 'qualidade', 'consistência', 'alertas',
-        'governança', 'compliance', 'estratégia', 'otimização', 'processos',
-        'eficiência', 'performance', 'confiabilidade', 'segurança'
-    ]
-    
-    texto_lower = texto.lower()
-    conceitos_encontrados = []
-    
-    for palavra in palavras_relevantes:
-        if palavra in texto_lower and palavra not in conceitos_encontrados:
-            conceitos_encontrados.append(palavra)
-            if len(conceitos_encontrados) >= max_conceitos:
-                break
-    
-    return conceitos_encontrados
+        list: Lista de conceitos-chave (palavras de PALAVRAS_CONCEITO, na ordem da lista)
+    """
+    return analisar_texto(texto).conceitos(max_conceitos)
 
 
 def extrair_frase_principal(texto):
@@ -743,15 +697,7 @@ def extrair_frase_principal(texto):
     Returns:
         str: Primeira frase relevante
     """
-    # Dividir em frases
-    frases = re.split(r'[.!?]\s+', texto)
-    
-    # Retornar a primeira frase com mais de 20 caracteres
-    for frase in frases:
-        if len(frase.strip()) > 20:
-            return frase.strip()
-    
-    return texto[:150].strip()
+    return analisar_texto(texto).frase_principal
 
 
 def gerar_insight_estruturado(texto_resumo, texto_desafios):
@@ -766,14 +712,14 @@ def gerar_insight_estruturado(texto_resumo, texto_desafios):
         str: Insight gerado com gramática correta
     """
     try:
+        # Análises compartilhadas (em cache para textos repetidos no portfólio)
+        analise_resumo = analisar_texto(texto_resumo)
+        
         # Extrair conceitos-chave do resumo
-        conceitos_resumo = extrair_conceitos_chave(texto_resumo, max_conceitos=3)
+        conceitos_resumo = analise_resumo.conceitos(3)
         
         # Extrair conceitos-chave dos desafios
-        conceitos_desafios = extrair_conceitos_chave(texto_desafios, max_conceitos=2)
-        
-        # Extrair frase principal do resumo
-        frase_principal = extrair_frase_principal(texto_resumo)
+        conceitos_desafios = analisar_texto(texto_desafios).conceitos(2)
         
         # Construir insight estruturado
         partes_insight = []
@@ -790,7 +736,7 @@ def gerar_insight_estruturado(texto_resumo, texto_desafios):
             partes_insight.append(f"Projeto focado em {conceitos_str}")
         else:
             # Usar frase principal como fallback
-            partes_insight.append(frase_principal[:100])
+            partes_insight.append(analise_resumo.frase_principal[:100])
         
         # Parte 2: Desafios principais
         if conceitos_desafios:
@@ -824,15 +770,81 @@ def gerar_insight_estruturado(texto_resumo, texto_desafios):
         return "Insight não disponível no momento."
 
 # --- Função de Conexão (Helper) ---
-def get_db_connection():
+def get_db_connection(caminho_banco=None):
     try:
-        conexao = sqlite3.connect(CAMINHO_BANCO)
+        conexao = sqlite3.connect(caminho_banco or CAMINHO_BANCO)
         conexao.row_factory = sqlite3.Row # Para acessar por nome
         return conexao
     except Exception as e:
         print(f"Erro ao conectar ao banco: {e}")
         return None
 
+def calcular_insight(texto_resumo, texto_desafios):
+    """
+    Calcula o insight de um projeto em memória, sem acessar o banco.
+    
+    Args:
+        texto_resumo: Texto do resumo executivo
+        texto_desafios: Texto dos principais desafios
+    
+    Returns:
+        String com o insight ou None se não houver texto
+    """
+    if not texto_resumo and not texto_desafios:
+        return None
+    
+    # Usar valores padrão se algum estiver vazio
+    if not texto_resumo:
+        texto_resumo = "Projeto em desenvolvimento"
+    if not texto_desafios:
+        texto_desafios = "Sem desafios registrados"
+    
+    return gerar_insight_estruturado(texto_resumo, texto_desafios)
+
+def hash_entradas_insight(texto_resumo, texto_desafios):
+    """
+    Hash das entradas do insight (resumo, desafios e VERSAO_INSIGHT).
+    
+    Guardado em projetos.hash_insight junto com o resumo_ia: se o hash atual
+    das entradas for igual ao guardado, o insight continua válido.
+    """
+    entradas = json.dumps([VERSAO_INSIGHT, texto_resumo, texto_desafios], ensure_ascii=False)
+    return hashlib.sha256(entradas.encode("utf-8")).hexdigest()
+
+
+def atualizar_insights_desatualizados(cursor, nomes_projeto):
+    """
+    Recalcula o insight só dos projetos cujas entradas mudaram.
+    
+    Chamado pelos leitores logo depois do UPSERT: numa reingestão em que o
+    resumo e os desafios não mudaram, nenhum insight é recalculado.
+    
+    Args:
+        cursor: Cursor da conexão (e da transação) usada no UPSERT
+        nomes_projeto: Nomes dos projetos recém-gravados
+    
+    Returns:
+        int: número de insights recalculados
+    """
+    nomes_projeto = list(nomes_projeto)
+    atualizacoes = []
+    # Limite de parâmetros por instrução do SQLite
+    for inicio in range(0, len(nomes_projeto), 500):
+        parte = nomes_projeto[inicio:inicio + 500]
+        cursor.execute(f"""
+            SELECT id, resumo_executivo, principais_desafios, hash_insight
+            FROM projetos WHERE nome_projeto IN ({", ".join(["?"] * len(parte))})
+        """, parte)
+        for projeto_id, texto_resumo, texto_desafios, hash_atual in cursor.fetchall():
+            hash_novo = hash_entradas_insight(texto_resumo, texto_desafios)
+            if hash_novo != hash_atual:
+                atualizacoes.append((calcular_insight(texto_resumo, texto_desafios), hash_novo, projeto_id))
+
+    cursor.executemany(
+        "UPDATE projetos SET resumo_ia = ?, hash_insight = ? WHERE id = ?", atualizacoes
+    )
+    return len(atualizacoes)
+
 # --- ETAPA 2: Processar os Dados ---
 def gerar_insight_para_projeto(projeto_id=None, texto_resumo=None, texto_desafios=None):
     """
@@ -871,15 +883,9 @@ def gerar_insight_para_projeto(projeto_id=None, texto_resumo=None, texto_desafio
         logging.warning("Nenhum texto disponível para gerar insight")
         return None
     
-    # Usar valores padrão se algum estiver vazio
-    if not texto_resumo:
-        texto_resumo = "Projeto em desenvolvimento"
-    if not texto_desafios:
-        texto_desafios = "Sem desafios registrados"
-    
     try:
         # Gerar insight estruturado
-        insight_texto = gerar_insight_estruturado(texto_resumo, texto_desafios)
+        insight_texto = calcular_insight(texto_resumo, texto_desafios)
         logging.info(f"Insight gerado: {insight_texto}")
         
         # Se projeto_id foi fornecido, salvar no banco
@@ -887,10 +893,11 @@ def gerar_insight_para_projeto(projeto_id=None, texto_resumo=None, texto_desafio
             conexao = get_db_connection()
             if conexao:
                 try:
+                    garantir_coluna_hash_insight(conexao)
                     cursor = conexao.cursor()
                     cursor.execute(
-                        "UPDATE projetos SET resumo_ia = ? WHERE id = ?",
-                        (insight_texto, projeto_id)
+                        "UPDATE projetos SET resumo_ia = ?, hash_insight = ? WHERE id = ?",
+                        (insight_texto, hash_entradas_insight(texto_resumo, texto_desafios), projeto_id)
                     )
                     conexao.commit()
                     logging.info(f"Insight salvo para projeto ID {projeto_id}")
@@ -903,48 +910,163 @@ def gerar_insight_para_projeto(projeto_id=None, texto_resumo=None, texto_desafio
         logging.error(f"Erro ao gerar insight: {e}")
         return None
 
-def gerar_insights():
-    """Processa todos os projetos sem insights de IA"""
-    conexao = get_db_connection()
+# Projetos lidos e gravados por vez em gerar_insights
+TAMANHO_LOTE_INSIGHTS = 1000
+
+# Projetos enviados a um processo por tarefa
+TAMANHO_CHUNK_INSIGHTS = 250
+
+
+# Projeto sem insight ou com insight calculado a partir de outras entradas
+# (precisa da função hash_entradas_insight registrada na conexão)
+CONDICAO_INSIGHT_DESATUALIZADO = """
+    hash_insight IS NOT hash_entradas_insight(resumo_executivo, principais_desafios)
+    AND (resumo_executivo IS NOT NULL OR principais_desafios IS NOT NULL OR resumo_ia IS NOT NULL)
+"""
+
+
+def _iterar_lotes_desatualizados(conexao, tamanho_lote):
+    """
+    Projetos com insight ausente ou desatualizado, em lotes ordenados por id.
+    
+    Paginação por id (WHERE id > último) em vez de fetchall: a memória fica
+    limitada a um lote e as linhas já atualizadas não são relidas.
+    """
+    ultimo_id = 0
+    while True:
+        lote = conexao.execute(f"""
+            SELECT id, nome_projeto, resumo_executivo, principais_desafios
+            FROM projetos
+            WHERE id > ?
+            AND {CONDICAO_INSIGHT_DESATUALIZADO}
+            ORDER BY id
+            LIMIT ?
+        """, (ultimo_id, tamanho_lote)).fetchall()
+        if not lote:
+            return
+        yield lote
+        ultimo_id = lote[-1]['id']
+
+
+def _calcular_insights_chunk(projetos):
+    """
+    Calcula os insights de um pedaço de projetos (roda dentro dos processos do pool).
+    
+    Args:
+        projetos: lista de tuplas (id, resumo_executivo, principais_desafios)
+    
+    Returns:
+        list[tuple]: (id, insight, hash das entradas) de cada projeto; o insight
+        é None quando o projeto não tem mais texto
+    """
+    return [
+        (projeto_id, calcular_insight(texto_resumo, texto_desafios),
+         hash_entradas_insight(texto_resumo, texto_desafios))
+        for projeto_id, texto_resumo, texto_desafios in projetos
+    ]
+
+
+def _calcular_insights_em_paralelo(lotes, workers, tamanho_chunk):
+    """
+    Distribui os lotes em pedaços para um pool de processos.
+    
+    Devolve os resultados de cada pedaço na ordem de envio. No máximo
+    2 pedaços por processo ficam pendentes, então a leitura do banco não se
+    adianta ao cálculo e a memória continua limitada.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pendentes = deque()
+        for lote in lotes:
+            for inicio in range(0, len(lote), tamanho_chunk):
+                pendentes.append(
+                    executor.submit(_calcular_insights_chunk, lote[inicio:inicio + tamanho_chunk])
+                )
+            while len(pendentes) > 2 * workers:
+                yield pendentes.popleft().result()
+        while pendentes:
+            yield pendentes.popleft().result()
+
+
+def gerar_insights(tamanho_lote=TAMANHO_LOTE_INSIGHTS, mostrar_insights=False,
+                   workers=None, tamanho_chunk=TAMANHO_CHUNK_INSIGHTS, caminho_banco=None):
+    """
+    Processa os projetos sem insight ou com insight desatualizado.
+    
+    Um insight está desatualizado quando o hash do resumo, dos desafios e de
+    VERSAO_INSIGHT difere do projetos.hash_insight gravado com ele; os demais
+    projetos não são recalculados.
+    
+    Usa uma única conexão e uma única transação: cada lote é lido, calculado em
+    memória e gravado com um executemany; o commit acontece só no fim.
+    
+    Com mais de um worker, o cálculo (só CPU) é dividido em pedaços entre
+    processos; eles devolvem (id, insight, hash) e só este processo grava no banco.
+    
+    Args:
+        tamanho_lote: Projetos lidos do banco por vez
+        mostrar_insights: Imprime cada insight gerado (lento em portfólios grandes)
+        workers: Processos de cálculo (padrão: núcleos da máquina; 1 = no próprio processo)
+        tamanho_chunk: Projetos por tarefa enviada a um processo
+        caminho_banco: Banco SQLite (padrão: CAMINHO_BANCO)
+    
+    Returns:
+        int: número de projetos atualizados
+    """
+    workers = workers or os.cpu_count() or 1
+
+    conexao = get_db_connection(caminho_banco)
     if conexao is None:
-        return
+        return 0
 
     try:
-        cursor = conexao.cursor()
-        
-        # Selecionamos projetos que têm um resumo, mas AINDA NÃO têm um insight de IA
-        cursor.execute("""
-            SELECT id, nome_projeto, resumo_executivo, principais_desafios 
-            FROM projetos 
-            WHERE resumo_ia IS NULL 
-            AND (resumo_executivo IS NOT NULL OR principais_desafios IS NOT NULL)
-        """)
+        garantir_coluna_hash_insight(conexao)
+        conexao.create_function("hash_entradas_insight", 2, hash_entradas_insight, deterministic=True)
+        total = conexao.execute(
+            f"SELECT COUNT(*) FROM projetos WHERE {CONDICAO_INSIGHT_DESATUALIZADO}"
+        ).fetchone()[0]
         
-        projetos_para_processar = cursor.fetchall()
-        
-        if not projetos_para_processar:
-            print("Nenhum projeto novo para processar. O banco já está atualizado.")
-            return
+        if not total:
+            print("Nenhum insight ausente ou desatualizado. O banco já está atualizado.")
+            return 0
+
+        print(f"Encontrados {total} projetos para gerar insights ({workers} processos)...")
+
+        # Só os textos vão para os processos; os nomes ficam aqui para a impressão
+        nomes = {}
 
-        print(f"Encontrados {len(projetos_para_processar)} projetos para gerar insights...")
+        def lotes():
+            for lote in _iterar_lotes_desatualizados(conexao, tamanho_lote):
+                if mostrar_insights:
+                    nomes.update((projeto['id'], projeto['nome_projeto']) for projeto in lote)
+                yield [(projeto['id'], projeto['resumo_executivo'], projeto['principais_desafios'])
+                       for projeto in lote]
 
-        for projeto in projetos_para_processar:
-            insight_texto = gerar_insight_para_projeto(
-                projeto_id=projeto['id'],
-                texto_resumo=projeto['resumo_executivo'],
-                texto_desafios=projeto['principais_desafios']
+        if workers > 1:
+            resultados = _calcular_insights_em_paralelo(lotes(), workers, tamanho_chunk)
+        else:
+            resultados = map(_calcular_insights_chunk, lotes())
+
+        atualizados = 0
+        for calculados in resultados:
+            conexao.executemany(
+                "UPDATE projetos SET resumo_ia = ?, hash_insight = ? WHERE id = ?",
+                [(insight_texto, hash_novo, projeto_id) for projeto_id, insight_texto, hash_novo in calculados]
             )
-            
-            if insight_texto:
-                print(f"Insight gerado para '{projeto['nome_projeto']}': {insight_texto}")
+            atualizados += len(calculados)
+            if mostrar_insights:
+                for projeto_id, insight_texto, _ in calculados:
+                    print(f"Insight gerado para '{nomes.pop(projeto_id, projeto_id)}': {insight_texto}")
+            print(f"  {atualizados}/{total} projetos processados")
 
         conexao.commit()
-        print(f"Sucesso! {len(projetos_para_processar)} projetos atualizados com insights.")
+        print(f"Sucesso! {atualizados} projetos atualizados com insights.")
+        return atualizados
 
     except Exception as e:
         print(f"ERRO durante o processamento dos insights: {e}")
         if conexao:
             conexao.rollback()
+        return 0
     finally:
         if conexao:
             conexao.close()
@@ -952,4 +1074,18 @@ def gerar_insights():
 
 # --- Executa a função principal ---
 if __name__ == "__main__":
-    gerar_insights()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Gera os insights ausentes ou desatualizados dos projetos.")
+    parser.add_argument("--banco", default=CAMINHO_BANCO, help="Caminho do banco SQLite")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processos de cálculo (padrão: núcleos da máquina)")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE_INSIGHTS, help="projetos lidos por vez")
+    parser.add_argument("--chunk", type=int, default=TAMANHO_CHUNK_INSIGHTS,
+                        help="projetos por tarefa enviada a um processo")
+    parser.add_argument("--mostrar", action="store_true", help="imprime cada insight gerado")
+    args = parser.parse_args()
+    # Lote 0 não lê nenhum projeto e chunk/workers inválidos só falhariam nos processos
+    for opcao in ("workers", "lote", "chunk"):
+        valor = getattr(args, opcao)
+        if valor is not None and valor < 1:
+            parser.error(f"--{opcao} deve ser maior que zero")
+    gerar_insights(args.lote, args.mostrar, args.workers, args.chunk, args.banco)
\ No newline at end of file
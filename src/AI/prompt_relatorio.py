@@ -0,0 +1,176 @@
+"""
+Montagem do prompt do relatório executivo dentro do orçamento de tokens.
+
+O tamanho do prompt era controlado por caracteres: um pedido "Detalhado"
+montava ~10.000 caracteres que o tokenizer cortava em silêncio, pagando a
+tokenização de texto que o modelo nunca via. Aqui as instruções são medidas em
+tokens, o documento é tokenizado uma vez e cortado exatamente no que sobra da
+janela do modelo, e cada pedido informa quantos tokens usou e descartou.
+
+As instruções do usuário (prompt_personalizado) também são limitadas: sempre
+sobram TOKENS_MINIMOS_DOCUMENTO tokens para o documento, e o excesso do
+"Foco especial" é cortado com um aviso no log.
+"""
+import logging
+
+from AI.resumo_longo import CARACTERES_POR_TOKEN, JANELA_MODELO_TOKENS, TOKENS_RESUMO_BLOCO
+
+# Tokens da janela sempre reservados ao documento (acima do tamanho de um
+# resumo parcial, para o modo documento longo ainda poder resumir)
+TOKENS_MINIMOS_DOCUMENTO = 2 * TOKENS_RESUMO_BLOCO
+
+# Só este múltiplo do orçamento (em caracteres) é tokenizado: o resto nunca caberia
+MARGEM_CARACTERES_DOCUMENTO = 2
+
+INSTRUCOES_TAMANHO = {
+    "Muito Curto": "Seja MUITO CONCISO. Máximo 3-4 parágrafos curtos.",
+    "Curto": "Seja CONCISO. Máximo 5-6 parágrafos.",
+    "Médio": "Seja equilibrado. Entre 8-10 parágrafos bem estruturados.",
+    "Longo": "Seja DETALHADO. Entre 12-15 parágrafos com análise profunda.",
+    "Detalhado": "Seja EXTREMAMENTE DETALHADO. Análise completa e aprofundada com todos os aspectos relevantes."
+}
+
+MODELO_PROMPT = """Analise este documento e crie um relatório executivo profissional em português.
+
+Documento:
+{conteudo}
+
+Crie um relatório com estas 4 seções:
+
+1. Análise do Documento - Resuma o objetivo e contexto em 2-3 parágrafos
+
+2. Dados e Informações Relevantes - Liste os dados principais:
+   - Percentuais e métricas
+   - Valores e orçamentos
+   - Datas e prazos
+   - Status e responsáveis
+
+3. Insights Estratégicos - Analise riscos, oportunidades e pontos de atenção em 2-3 parágrafos
+
+4. Próximas Ações Recomendadas - Liste 3-5 ações práticas baseadas no documento
+
+{instrucao_tamanho}
+{foco}
+
+Relatório:"""
+
+
+def _preencher(conteudo, tamanho, prompt_personalizado):
+    return MODELO_PROMPT.format(
+        conteudo=conteudo,
+        instrucao_tamanho=INSTRUCOES_TAMANHO.get(tamanho, "Seja equilibrado e profissional."),
+        foco=f"Foco especial: {prompt_personalizado}" if prompt_personalizado else ""
+    )
+
+
+def _contar(tokenizer, texto):
+    # Com tokens especiais (o </s> do T5 também ocupa a janela)
+    if tokenizer is None:
+        return len(texto) // CARACTERES_POR_TOKEN
+    return len(tokenizer(texto)["input_ids"])
+
+
+def _offsets(tokenizer, texto):
+    """Offsets (início, fim) de cada token; sem tokenizer rápido, blocos de CARACTERES_POR_TOKEN."""
+    if tokenizer is not None:
+        try:
+            return tokenizer(texto, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+        except Exception:
+            pass
+    return [(i, min(i + CARACTERES_POR_TOKEN, len(texto))) for i in range(0, len(texto), CARACTERES_POR_TOKEN)]
+
+
+def limitar_prompt_personalizado(tokenizer, tamanho, prompt_personalizado, orcamento=JANELA_MODELO_TOKENS):
+    """
+    Corta as instruções do usuário para sobrarem TOKENS_MINIMOS_DOCUMENTO tokens ao documento.
+
+    Returns:
+        str: prompt_personalizado inteiro ou cortado (vazio se nem as instruções fixas couberem)
+    """
+    if not prompt_personalizado:
+        return prompt_personalizado
+    limite = orcamento - TOKENS_MINIMOS_DOCUMENTO
+    # Instruções enormes: mede só o começo que poderia caber
+    prompt_personalizado = prompt_personalizado[:orcamento * CARACTERES_POR_TOKEN * MARGEM_CARACTERES_DOCUMENTO]
+    excesso = _contar(tokenizer, _preencher("", tamanho, prompt_personalizado)) - limite
+    if excesso <= 0:
+        return prompt_personalizado
+
+    offsets = _offsets(tokenizer, prompt_personalizado)
+    mantidos = max(0, len(offsets) - excesso)
+    while True:
+        cortado = prompt_personalizado[:offsets[mantidos - 1][1]].rstrip() if mantidos else ""
+        # A emenda pode tokenizar diferente: confere no prompt montado
+        excesso = _contar(tokenizer, _preencher("", tamanho, cortado)) - limite
+        if excesso <= 0 or mantidos == 0:
+            break
+        mantidos = max(0, mantidos - excesso)
+    logging.warning(
+        f"Instruções personalizadas cortadas de {len(offsets)} para {mantidos} tokens "
+        f"(reserva de {TOKENS_MINIMOS_DOCUMENTO} tokens para o documento)"
+    )
+    return cortado
+
+
+def tokens_para_documento(tokenizer, tamanho, prompt_personalizado="", orcamento=JANELA_MODELO_TOKENS):
+    """Quantos tokens de documento cabem na janela depois das instruções (já limitadas)."""
+    prompt_personalizado = limitar_prompt_personalizado(tokenizer, tamanho, prompt_personalizado, orcamento)
+    return max(0, orcamento - _contar(tokenizer, _preencher("", tamanho, prompt_personalizado)))
+
+
+def montar_prompt(conteudo, tamanho, prompt_personalizado="", tokenizer=None,
+                  orcamento=JANELA_MODELO_TOKENS):
+    """
+    Monta o prompt do relatório com o documento cortado para caber no orçamento.
+
+    Args:
+        conteudo: Texto do documento (ou o resumo dele, no modo documento longo)
+        tamanho: Nível de detalhe
+        prompt_personalizado: Instruções adicionais do usuário (cortadas se
+            não deixarem TOKENS_MINIMOS_DOCUMENTO tokens ao documento)
+        tokenizer: Tokenizer do modelo (None = estimativa por caracteres)
+        orcamento: Tokens de entrada disponíveis
+
+    Returns:
+        tuple (prompt, dict com tokens_usados, tokens_instrucoes, tokens_documento,
+        tokens_descartados, instrucoes_cortadas e orcamento); em documentos muito
+        maiores que o orçamento, tokens_descartados é estimado para a parte não tokenizada
+    """
+    prompt_original = prompt_personalizado
+    prompt_personalizado = limitar_prompt_personalizado(tokenizer, tamanho, prompt_personalizado, orcamento)
+    tokens_instrucoes = _contar(tokenizer, _preencher("", tamanho, prompt_personalizado))
+    disponivel = max(0, orcamento - tokens_instrucoes)
+
+    # Só o começo do documento que pode caber é tokenizado (uma única vez, com offsets)
+    limite_caracteres = orcamento * CARACTERES_POR_TOKEN * MARGEM_CARACTERES_DOCUMENTO
+    tokens_fora = 0
+    if len(conteudo) > limite_caracteres:
+        tokens_fora = (len(conteudo) - limite_caracteres) // CARACTERES_POR_TOKEN
+        conteudo = conteudo[:limite_caracteres]
+    offsets = _offsets(tokenizer, conteudo)
+
+    tokens_documento = len(offsets) + tokens_fora
+    mantidos = min(len(offsets), disponivel)
+    prompt = None
+    while True:
+        fim = offsets[mantidos - 1][1] if mantidos else 0
+        prompt = _preencher(conteudo[:fim].rstrip(), tamanho, prompt_personalizado)
+        tokens_usados = _contar(tokenizer, prompt)
+        # Tokens na emenda documento/instruções podem se juntar diferente: confere no prompt final
+        if tokens_usados <= orcamento or mantidos == 0:
+            break
+        mantidos = max(0, mantidos - (tokens_usados - orcamento))
+
+    informacoes = {
+        "tokens_usados": tokens_usados,
+        "tokens_instrucoes": tokens_instrucoes,
+        "tokens_documento": mantidos,
+        "tokens_descartados": tokens_documento - mantidos,
+        "instrucoes_cortadas": prompt_personalizado != prompt_original,
+        "orcamento": orcamento
+    }
+    logging.info(
+        f"Prompt: {tokens_usados}/{orcamento} tokens, "
+        f"{informacoes['tokens_descartados']} tokens do documento descartados"
+    )
+    return prompt, informacoes
@@ -0,0 +1,141 @@
+"""
+Registro de modelos compartilhado pelo processo inteiro.
+
+Cada modelo é carregado uma única vez por processo e reaproveitado por todas
+as sessões e reruns do Streamlit (os módulos Python só são importados uma vez
+por processo). Se duas sessões pedirem o mesmo modelo ao mesmo tempo, a
+segunda espera o carregamento da primeira em vez de carregar outra cópia.
+
+O carregamento também pode começar em segundo plano (aquecer) assim que o
+app sobe, para que o primeiro relatório não pague o tempo de carga.
+"""
+import logging
+import threading
+
+ESTADO_NAO_CARREGADO = "nao_carregado"
+ESTADO_CARREGANDO = "carregando"
+ESTADO_PRONTO = "pronto"
+ESTADO_ERRO = "erro"
+
+
+class _Entrada:
+    """Estado de carregamento de um modelo."""
+
+    def __init__(self):
+        self.modelo = None
+        self.estado = ESTADO_NAO_CARREGADO
+        self.erro = None
+        self.pronto = threading.Event()
+
+
+_entradas = {}
+_trava = threading.Lock()
+
+
+def _entrada(chave):
+    with _trava:
+        if chave not in _entradas:
+            _entradas[chave] = _Entrada()
+        return _entradas[chave]
+
+
+def _carregar(chave, construtor, entrada):
+    """Executa o construtor e publica o resultado (roda numa única thread por vez)."""
+    try:
+        logging.info(f"Carregando modelo '{chave}' (uma vez por processo)...")
+        modelo = construtor()
+        if modelo is None:
+            raise RuntimeError("o construtor não retornou um modelo")
+        entrada.modelo = modelo
+        entrada.estado = ESTADO_PRONTO
+        logging.info(f"Modelo '{chave}' pronto.")
+    except Exception as e:
+        entrada.erro = str(e)
+        entrada.estado = ESTADO_ERRO
+        logging.error(f"Erro ao carregar modelo '{chave}': {e}")
+    finally:
+        entrada.pronto.set()
+
+
+def _iniciar_carregamento(chave):
+    """
+    Marca o modelo como carregando se ninguém estiver carregando ainda.
+
+    Returns:
+        tuple (entrada, deve_carregar) - só quem recebe True executa o construtor
+    """
+    entrada = _entrada(chave)
+    with _trava:
+        if entrada.estado in (ESTADO_NAO_CARREGADO, ESTADO_ERRO):
+            entrada.estado = ESTADO_CARREGANDO
+            entrada.erro = None
+            entrada.pronto.clear()
+            return entrada, True
+    return entrada, False
+
+
+def obter_modelo(chave, construtor, esperar=True, timeout=None):
+    """
+    Retorna o modelo compartilhado, carregando-o na primeira chamada.
+
+    Args:
+        chave: Identificador do modelo (ex: nome + backend)
+        construtor: Função sem argumentos que cria o modelo
+        esperar: Se False e o modelo ainda estiver carregando, retorna None na hora
+        timeout: Segundos máximos de espera (None = sem limite)
+
+    Returns:
+        O modelo, ou None se falhou, não ficou pronto a tempo ou esperar=False
+    """
+    entrada, deve_carregar = _iniciar_carregamento(chave)
+    if deve_carregar:
+        _carregar(chave, construtor, entrada)
+    elif entrada.estado == ESTADO_CARREGANDO:
+        if not esperar or not entrada.pronto.wait(timeout):
+            return None
+    return entrada.modelo if entrada.estado == ESTADO_PRONTO else None
+
+
+def aquecer_modelo(chave, construtor, aquecimento=None):
+    """
+    Começa a carregar o modelo numa thread em segundo plano (se ainda não carregou).
+
+    Args:
+        chave: Identificador do modelo
+        construtor: Função sem argumentos que cria o modelo
+        aquecimento: Função opcional chamada com o modelo já carregado
+            (ex: uma inferência curta para inicializar os kernels)
+
+    Returns:
+        bool: True se uma nova thread de carregamento foi iniciada
+    """
+    # Depois de uma falha, não insiste em segundo plano: obter_modelo tenta de novo sob demanda
+    if estado_modelo(chave) == ESTADO_ERRO:
+        return False
+    entrada, deve_carregar = _iniciar_carregamento(chave)
+    if not deve_carregar:
+        return False
+
+    def tarefa():
+        _carregar(chave, construtor, entrada)
+        if aquecimento and entrada.estado == ESTADO_PRONTO:
+            try:
+                aquecimento(entrada.modelo)
+            except Exception as e:
+                logging.warning(f"Aquecimento do modelo '{chave}' falhou: {e}")
+
+    threading.Thread(target=tarefa, name=f"aquecer-{chave}", daemon=True).start()
+    return True
+
+
+def estado_modelo(chave):
+    """Retorna o estado do modelo (nao_carregado, carregando, pronto ou erro)."""
+    with _trava:
+        entrada = _entradas.get(chave)
+    return entrada.estado if entrada else ESTADO_NAO_CARREGADO
+
+
+def descarregar_modelo(chave):
+    """Remove o modelo do registro (a memória é liberada quando ninguém mais o usa)."""
+    with _trava:
+        _entradas.pop(chave, None)
@@ -0,0 +1,238 @@
+"""
+Resumo de documentos longos em map-reduce para o FLAN-T5.
+
+O FLAN-T5 só enxerga bem ~512 tokens de entrada; cortar o documento em
+alguns milhares de caracteres joga fora quase tudo de um relatório longo.
+Aqui o documento é dividido em blocos do tamanho da janela do modelo:
+
+  map:    cada bloco vira um resumo parcial (vários blocos por chamada ao modelo)
+  reduce: os resumos parciais são agrupados em novos blocos e resumidos de novo,
+          até caberem juntos num único prompt
+
+Cada nível encolhe o texto ~TOKENS_POR_BLOCO / TOKENS_RESUMO_BLOCO vezes, então o
+número total de chamadas cresce linearmente com o tamanho do documento.
+"""
+import logging
+
+from AI.inferencia_lote import gerar_em_lote
+
+# Janela de entrada do FLAN-T5 (posições relativas: passa disso, mas a qualidade cai)
+JANELA_MODELO_TOKENS = 512
+
+# Tokens de documento por bloco (o resto da janela fica para a instrução)
+TOKENS_POR_BLOCO = 400
+
+# Tamanho máximo de cada resumo parcial
+TOKENS_RESUMO_BLOCO = 96
+
+# Blocos resumidos juntos numa mesma chamada ao modelo
+TAMANHO_LOTE_BLOCOS = 8
+
+# Sem tokenizer com offsets, estima o tamanho dos blocos por caracteres
+CARACTERES_POR_TOKEN = 4
+
+# Até quantos níveis de reduce antes de desistir e cortar (não deve acontecer)
+MAX_NIVEIS_REDUCAO = 6
+
+# Fração do prazo do pedido que o resumo pode usar; o resto fica para o relatório final
+FRACAO_PRAZO_RESUMO = 0.6
+
+PROMPT_BLOCO = """Resuma em português os pontos principais deste trecho de um documento.
+Mantenha percentuais, valores, datas, status, responsáveis, riscos e problemas.
+
+Trecho:
+{bloco}
+
+Resumo:"""
+
+
+def contar_tokens(tokenizer, texto):
+    """Número de tokens do texto (sem tokens especiais)."""
+    return len(tokenizer(texto, add_special_tokens=False)["input_ids"])
+
+
+def _tamanho_em_tokens(tokenizer, texto):
+    if tokenizer is None:
+        return len(texto) // CARACTERES_POR_TOKEN
+    return contar_tokens(tokenizer, texto)
+
+
+def _fim_do_bloco(texto, inicio, fim):
+    """Recua o fim do bloco até uma quebra de linha ou de frase no último quinto dele."""
+    limite = inicio + (fim - inicio) * 4 // 5
+    for separador in ("\n", ". "):
+        posicao = texto.rfind(separador, limite, fim)
+        if posicao != -1:
+            return posicao + len(separador)
+    return fim
+
+
+def dividir_em_blocos(texto, tokenizer=None, tokens_por_bloco=TOKENS_POR_BLOCO):
+    """
+    Divide o texto em blocos de até tokens_por_bloco tokens, cortando de
+    preferência em quebras de linha ou fim de frase.
+
+    O texto é tokenizado uma única vez (offsets do tokenizer rápido); sem
+    tokenizer, usa CARACTERES_POR_TOKEN como estimativa.
+
+    Returns:
+        list[str]: blocos em ordem
+
+    Raises:
+        ValueError: se tokens_por_bloco < 1 (nenhum corte avançaria)
+    """
+    if tokens_por_bloco < 1:
+        raise ValueError(f"tokens_por_bloco deve ser pelo menos 1 (recebido {tokens_por_bloco})")
+    texto = texto.strip()
+    if not texto:
+        return []
+
+    offsets = None
+    if tokenizer is not None:
+        try:
+            offsets = tokenizer(
+                texto, add_special_tokens=False, return_offsets_mapping=True
+            )["offset_mapping"]
+        except Exception:
+            # Tokenizer lento (sem offsets): cai na estimativa por caracteres
+            offsets = None
+
+    if offsets is None:
+        passo = tokens_por_bloco * CARACTERES_POR_TOKEN
+        cortes = []
+        inicio = 0
+        while inicio < len(texto):
+            fim = min(inicio + passo, len(texto))
+            if fim < len(texto):
+                fim = _fim_do_bloco(texto, inicio, fim)
+            cortes.append((inicio, fim))
+            inicio = fim
+    else:
+        cortes = []
+        primeiro = 0
+        inicio = 0
+        while primeiro < len(offsets):
+            ultimo = min(primeiro + tokens_por_bloco, len(offsets))
+            if ultimo == len(offsets):
+                fim = len(texto)
+            else:
+                fim = max(_fim_do_bloco(texto, inicio, offsets[ultimo][0]), inicio + 1)
+                # O próximo bloco começa no primeiro token depois do corte
+                while ultimo > primeiro + 1 and offsets[ultimo - 1][0] >= fim:
+                    ultimo -= 1
+            cortes.append((inicio, fim))
+            inicio = fim
+            primeiro = ultimo
+
+    return [texto[inicio:fim].strip() for inicio, fim in cortes if texto[inicio:fim].strip()]
+
+
+def _limites_do_prazo(orcamento):
+    """(parar, stopping_criteria) do prazo do resumo; (None, None) sem orçamento."""
+    if orcamento is None:
+        return None, None
+    try:
+        criterios = orcamento.criterios_prazo(FRACAO_PRAZO_RESUMO)
+    except ImportError:
+        criterios = None
+    return (lambda: orcamento.esgotado(FRACAO_PRAZO_RESUMO)), criterios
+
+
+def resumir_blocos(modelo, blocos, tamanho_lote=TAMANHO_LOTE_BLOCOS,
+                   max_tokens_resumo=TOKENS_RESUMO_BLOCO, progresso=None, orcamento=None):
+    """
+    Resume cada bloco, TAMANHO_LOTE_BLOCOS por forward pass (ver AI/inferencia_lote.py).
+
+    Args:
+        modelo: Pipeline text2text-generation
+        blocos: Lista de trechos do documento
+        progresso: Função opcional chamada com (blocos_feitos, total) após cada lote
+        orcamento: OrcamentoGeracao do pedido; passado FRACAO_PRAZO_RESUMO do
+            prazo, a geração para e os blocos restantes ficam sem resumo
+
+    Returns:
+        list[str]: um resumo por bloco, na mesma ordem (None nos não resumidos)
+    """
+    parar, criterios = _limites_do_prazo(orcamento)
+    parametros = {"stopping_criteria": criterios} if criterios is not None else {}
+    # Greedy: resumos parciais não precisam de criatividade e ficam reprodutíveis
+    return gerar_em_lote(
+        modelo,
+        [PROMPT_BLOCO.format(bloco=bloco) for bloco in blocos],
+        batch_size=tamanho_lote,
+        progresso=progresso,
+        parar=parar,
+        max_new_tokens=max_tokens_resumo,
+        do_sample=False,
+        **parametros
+    )
+
+
+def _cortar(texto, tokenizer, tokens_alvo):
+    """Começo do texto que cabe em tokens_alvo tokens (vazio se o alvo for 0)."""
+    if tokens_alvo < 1 or not texto:
+        return ""
+    blocos = dividir_em_blocos(texto, tokenizer, tokens_alvo)
+    return blocos[0] if blocos else ""
+
+
+def condensar_documento(modelo, texto, tokens_alvo=TOKENS_POR_BLOCO, progresso=None, orcamento=None):
+    """
+    Reduz o documento (map-reduce) até caber em tokens_alvo tokens.
+
+    Se o alvo não passa de TOKENS_RESUMO_BLOCO (instruções do usuário ocupando
+    quase toda a janela), resumir não faz o texto caber: o documento é só
+    cortado. A redução também para quando um nível não encolhe o texto ou
+    quando o prazo do pedido (orcamento) passa de FRACAO_PRAZO_RESUMO.
+
+    Args:
+        modelo: Pipeline text2text-generation
+        texto: Documento completo
+        tokens_alvo: Tamanho máximo do texto condensado
+        progresso: Função opcional chamada com (nivel, blocos_feitos, total)
+        orcamento: OrcamentoGeracao do pedido (já iniciado), ou None sem prazo
+
+    Returns:
+        str: texto que cabe no prompt final (o próprio texto se já couber)
+    """
+    tokenizer = getattr(modelo, "tokenizer", None)
+    atual = texto
+    tamanho_atual = _tamanho_em_tokens(tokenizer, atual)
+    if tamanho_atual <= tokens_alvo:
+        return atual
+    if tokens_alvo <= TOKENS_RESUMO_BLOCO:
+        logging.warning(
+            f"Resumo longo: só {tokens_alvo} tokens livres no prompt, documento cortado sem resumir"
+        )
+        return _cortar(atual, tokenizer, tokens_alvo)
+
+    for nivel in range(1, MAX_NIVEIS_REDUCAO + 1):
+        if orcamento is not None and orcamento.esgotado(FRACAO_PRAZO_RESUMO):
+            logging.warning(f"Resumo longo: prazo esgotado antes do nível {nivel}, cortando")
+            break
+        blocos = dividir_em_blocos(atual, tokenizer)
+
+        logging.info(f"Resumo longo: nível {nivel}, {len(blocos)} blocos")
+        # No último nível os resumos podem ser maiores: aproveita todo o orçamento do prompt
+        resumos = resumir_blocos(
+            modelo, blocos,
+            max_tokens_resumo=max(TOKENS_RESUMO_BLOCO, tokens_alvo // len(blocos)),
+            progresso=(lambda feitos, total, nivel=nivel: progresso(nivel, feitos, total))
+            if progresso else None,
+            orcamento=orcamento
+        )
+        resumido = "\n".join(resumo for resumo in resumos if resumo)
+        if not resumido:
+            break
+        tamanho_resumido = _tamanho_em_tokens(tokenizer, resumido)
+        atual = resumido
+        if tamanho_resumido <= tokens_alvo:
+            return atual
+        if tamanho_resumido >= tamanho_atual:
+            # Os resumos não encolheram o texto: mais níveis não vão convergir
+            logging.warning(f"Resumo longo: nível {nivel} não reduziu o texto, cortando")
+            break
+        tamanho_atual = tamanho_resumido
+
+    # Não convergiu: fica com o começo do último nível
+    return _cortar(atual, tokenizer, tokens_alvo) if atual else _cortar(texto, None, tokens_alvo)
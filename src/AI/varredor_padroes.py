@@ -0,0 +1,218 @@
+"""
+Varredura única de um documento para os extratores de gráficos e de dados.
+
+_gerar_graficos_analise e _extrair_dados_contextualizados percorriam o texto
+várias vezes (uma por tipo de dado), compilando os padrões a cada linha,
+refazendo a checagem de palavras irrelevantes em cada passada e removendo
+duplicatas com buscas lineares na lista de resultados.
+
+Aqui todos os padrões são compilados uma vez no módulo e o documento é
+percorrido uma única vez: cada linha é classificada (irrelevante? tem '%'?
+tem data? tem status?) com testes literais baratos, e só as linhas que podem
+casar passam pelos regex. Duplicatas são removidas com conjuntos (hash).
+
+A varredura de um texto é guardada (lru_cache) para que os dois extratores,
+chamados sobre o mesmo documento, não o percorram duas vezes.
+"""
+import re
+from functools import lru_cache
+
+# Palavras que indicam dados genéricos/de exemplo (os gráficos usam as 10 primeiras)
+PALAVRAS_IRRELEVANTES_GRAFICOS = (
+    'exemplo', 'modelo', 'template', 'amostra', 'ilustração',
+    'hipotético', 'fictício', 'simulação', 'teste', 'demo'
+)
+PALAVRAS_IRRELEVANTES_EXTRAS_DADOS = ('padrão', 'genérico', 'default')
+
+PALAVRAS_PROGRESSO = ('progresso', 'conclusão', 'andamento', 'completo')
+
+# Linha que é só um título genérico, como "concluído: 100%"
+_RE_TITULO_GENERICO = re.compile(r'^\s*[a-zç]{1,15}\s*:\s*\d+%\s*$', re.IGNORECASE)
+
+# Percentuais para gráficos: (padrão, prioridade)
+PADROES_GRAFICOS_PRIORITARIOS = [
+    # Lista com marcador (mais específico)
+    (re.compile(r'[-•]\s*([A-Za-zÀ-ÿ][^:\n]{10,150}):\s*(\d+)%', re.IGNORECASE), 10),
+    # Lista invertida
+    (re.compile(r'[-•]\s*(\d+)%\s+(?:de\s+)?([A-Za-zÀ-ÿ][^\n]{10,100})', re.IGNORECASE), 9),
+]
+PADROES_GRAFICOS_GENERICOS = [
+    # Label seguido de percentual (sem marcador)
+    (re.compile(r'([A-Za-zÀ-ÿ][^:\n]{10,100}):\s*(\d+)%', re.IGNORECASE), 5),
+    # Percentual seguido de label
+    (re.compile(r'(\d+)%\s+(?:de\s+)?([A-Za-zÀ-ÿ][^\n]{10,80})', re.IGNORECASE), 4),
+    # Label com verbo de conclusão
+    (re.compile(r'([A-Za-zÀ-ÿ][^\n]{10,80})\s+(?:está|atingiu|alcançou)?\s*(?:em\s+)?(\d+)%', re.IGNORECASE), 3),
+]
+
+_RE_SUFIXO_CONCLUSAO = re.compile(
+    r'\s+(concluído|concluída|finalizado|finalizada|completo|completa).*$', re.IGNORECASE
+)
+_RE_PONTUACAO_FINAL = re.compile(r'[:\-]$')
+_RE_PALAVRA_5 = re.compile(r'[a-zA-ZÀ-ÿ]{5,}')
+_RE_PALAVRA_4 = re.compile(r'[a-zA-ZÀ-ÿ]{4,}')
+_RE_PALAVRA_3 = re.compile(r'[a-zA-ZÀ-ÿ]{3,}')
+
+# Percentuais com contexto para o relatório
+_RE_LISTA_PERCENTUAL = re.compile(r'[-•]\s*([^:\n]{10,150}):\s*(\d+)%', re.IGNORECASE)
+_RE_PERCENTUAL_CONTEXTO = re.compile(r'(.{0,80})(\d+)%(.{0,80})', re.IGNORECASE)
+_RE_BORDAS = re.compile(r'^[:\-\s]+|[:\-\s]+$')
+
+# (literal em minúsculas para o pré-filtro, padrão, categoria)
+PADROES_STATUS = [
+    ('status', re.compile(r'status:?\s*([^\n.]{5,100})', re.IGNORECASE), 'Status'),
+    ('situação', re.compile(r'situação:?\s*([^\n.]{5,100})', re.IGNORECASE), 'Situação'),
+    ('responsável', re.compile(r'responsável:?\s*([^\n.]{3,80})', re.IGNORECASE), 'Responsável'),
+]
+
+_RE_DATA = re.compile(r'\b(\d{1,2}/\d{1,2}/\d{4})\b')
+
+
+class VarreduraDocumento:
+    """Resultado da passada única sobre o documento."""
+
+    def __init__(self):
+        # Linhas com '%' que passaram pelos filtros de cada extrator
+        self.linhas_percentual_graficos = []
+        self.percentuais_dados = []
+        self.status = {}
+        self.datas = set()
+
+
+def _limpar_label(label):
+    label_limpo = _RE_SUFIXO_CONCLUSAO.sub('', label)
+    return _RE_PONTUACAO_FINAL.sub('', label_limpo).strip()[:60]
+
+
+def _percentuais_da_linha(linha, linha_lower, percentuais, vistos):
+    """
+    Percentuais com contexto de uma linha (mesmas regras de _extrair_dados_contextualizados).
+
+    vistos guarda (valor, label) dos itens de lista e (valor, 40 primeiros
+    caracteres do contexto) de todos os itens.
+    """
+    # Prioridade 1: item de lista com percentual ("- Desenvolvimento da estrutura: 100%")
+    match_lista = _RE_LISTA_PERCENTUAL.search(linha)
+    if match_lista:
+        valor = match_lista.group(2)
+        label_limpo = _RE_SUFIXO_CONCLUSAO.sub('', match_lista.group(1).strip()).strip()
+        if len(label_limpo) >= 8 and _RE_PALAVRA_5.search(label_limpo):
+            chave = ('lista', valor, label_limpo.lower())
+            if chave not in vistos:
+                contexto = f"{label_limpo}: {valor}%"
+                vistos.add(chave)
+                vistos.add(('contexto', valor, contexto[:40]))
+                percentuais.append({
+                    'valor': valor,
+                    'contexto': contexto,
+                    'prioridade': 10
+                })
+        return
+
+    # Prioridade 2: qualquer percentual com o texto em volta
+    for match in _RE_PERCENTUAL_CONTEXTO.finditer(linha):
+        valor = match.group(2)
+        if valor == '0' and not any(palavra in linha_lower for palavra in PALAVRAS_PROGRESSO):
+            continue
+
+        contexto = f"{match.group(1).strip()} {valor}% {match.group(3).strip()}".strip()
+        contexto = _RE_BORDAS.sub('', contexto)
+
+        texto_sem_percentual = contexto.replace(f'{valor}%', '').strip()
+        if len(texto_sem_percentual) < 8 or not _RE_PALAVRA_4.search(texto_sem_percentual):
+            continue
+
+        chave = ('contexto', valor, contexto[:40])
+        if chave not in vistos:
+            vistos.add(chave)
+            percentuais.append({
+                'valor': valor,
+                'contexto': contexto[:200],
+                'prioridade': 5
+            })
+
+
+def _varrer(texto):
+    varredura = VarreduraDocumento()
+    vistos_percentuais = set()
+    categorias_pendentes = list(PADROES_STATUS)
+
+    for linha in texto.split('\n'):
+        linha_lower = linha.lower()
+        if any(palavra in linha_lower for palavra in PALAVRAS_IRRELEVANTES_GRAFICOS):
+            continue
+        relevante_dados = not any(palavra in linha_lower for palavra in PALAVRAS_IRRELEVANTES_EXTRAS_DADOS)
+
+        if '%' in linha and not _RE_TITULO_GENERICO.match(linha.strip()):
+            varredura.linhas_percentual_graficos.append(linha)
+            if relevante_dados:
+                _percentuais_da_linha(linha, linha_lower, varredura.percentuais_dados, vistos_percentuais)
+
+        if not relevante_dados:
+            continue
+
+        if categorias_pendentes:
+            for item in list(categorias_pendentes):
+                literal, padrao, categoria = item
+                if literal not in linha_lower:
+                    continue
+                match = padrao.search(linha)
+                if match:
+                    info_limpa = match.group(1).strip()[:150]
+                    if len(info_limpa) > 5 and _RE_PALAVRA_3.search(info_limpa):
+                        varredura.status[categoria] = info_limpa
+                        categorias_pendentes.remove(item)
+
+        if '/' in linha:
+            for data in _RE_DATA.findall(linha)[:5]:
+                varredura.datas.add(data)
+
+    return varredura
+
+
+@lru_cache(maxsize=4)
+def varrer_documento(texto):
+    """Varredura (em cache) do texto: a mesma instância para o mesmo documento."""
+    return _varrer(texto)
+
+
+def percentuais_para_graficos(texto):
+    """
+    Percentuais com label para o gráfico de progresso.
+
+    Returns:
+        list[dict] com label, valor e prioridade (padrões prioritários primeiro;
+        os genéricos só entram se os prioritários acharem menos de 2)
+    """
+    linhas = varrer_documento(texto).linhas_percentual_graficos
+    percentuais = []
+    vistos = set()
+
+    def coletar(padroes, tamanho_minimo, regex_palavra):
+        for linha in linhas:
+            for padrao, prioridade in padroes:
+                for grupo1, grupo2 in padrao.findall(linha):
+                    label = grupo2.strip() if grupo1.isdigit() else grupo1.strip()
+                    valor = grupo1 if grupo1.isdigit() else grupo2
+                    try:
+                        valor_num = int(valor)
+                    except ValueError:
+                        continue
+                    if not 0 < valor_num <= 100:
+                        continue
+                    label_limpo = _limpar_label(label)
+                    if len(label_limpo) >= tamanho_minimo and regex_palavra.search(label_limpo):
+                        chave = label_limpo.lower()
+                        if chave not in vistos:
+                            vistos.add(chave)
+                            percentuais.append({
+                                'label': label_limpo,
+                                'valor': valor_num,
+                                'prioridade': prioridade
+                            })
+
+    coletar(PADROES_GRAFICOS_PRIORITARIOS, 8, _RE_PALAVRA_5)
+    if len(percentuais) < 2:
+        # Padrões genéricos: um pouco mais flexíveis no tamanho do label
+        coletar(PADROES_GRAFICOS_GENERICOS, 5, _RE_PALAVRA_3)
+    return percentuais
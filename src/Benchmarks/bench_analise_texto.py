@@ -0,0 +1,173 @@
+"""
+Benchmark: insights do portfólio com analisadores separados x análise compartilhada.
+
+As versões antigas de extrair_conceitos_chave, extrair_frase_principal e
+gerar_insight_estruturado (cada analisador normaliza o texto de novo e a frase
+principal divide o texto inteiro) ficam aqui como referência. O benchmark monta
+um portfólio sintético em que parte dos projetos usa os mesmos textos (como os
+textos padrão do Excel), confere que os insights são iguais e mede o tempo de
+cada versão.
+
+Uso:
+    python src/Benchmarks/bench_analise_texto.py
+    python src/Benchmarks/bench_analise_texto.py --projetos 200000 --repetidos 0.5
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from AI.analise_texto import _analise_em_cache
+from AI.processador_ia import calcular_insight
+
+FRASES_RESUMO = [
+    "O projeto de transformação digital atingiu 60% de conclusão",
+    "A migração do ERP avança dentro do orçamento previsto",
+    "A equipe de Operações concluiu a integração com os fornecedores",
+    "O piloto nas lojas mostrou ganho de eficiência na reposição",
+    "A plataforma de dados entrou em produção para a área comercial",
+    "Os indicadores de desempenho passam a ser publicados no dashboard semanal",
+    "Foco em governança e gestão de riscos da cadeia de abastecimento",
+    "Ok",
+]
+FRASES_DESAFIOS = [
+    "Risco de atraso na entrega do fornecedor",
+    "Falta de recursos na equipe de integração",
+    "Orçamento pressionado pela mudança de escopo",
+    "Qualidade dos dados de origem abaixo do esperado",
+    "Segurança e compliance das novas APIs",
+]
+
+# Textos repetidos em muitos projetos (como os padrões do leitor de Excel)
+RESUMO_PADRAO = (
+    "Projeto focado na extração, transformação e análise de dados empresariais "
+    "para suporte à tomada de decisão estratégica. Implementa processos automatizados "
+    "de ETL para consolidação de informações de múltiplas fontes de dados.")
+DESAFIOS_PADRAO = (
+    "Garantir a qualidade e consistência dos dados provenientes de fontes heterogêneas. "
+    "Integração com sistemas legados e monitoramento contínuo dos pipelines.")
+
+PALAVRAS_RELEVANTES_ANTIGO = [
+    'dados', 'análise', 'integração', 'riscos', 'gestão', 'monitoramento',
+    'indicadores', 'desempenho', 'automação', 'ETL', 'API', 'dashboard',
+    'relatórios', 'métricas', 'qualidade', 'consistência', 'alertas',
+    'governança', 'compliance', 'estratégia', 'otimização', 'processos',
+    'eficiência', 'performance', 'confiabilidade', 'segurança'
+]
+
+
+def conceitos_antigo(texto, max_conceitos=3):
+    """extrair_conceitos_chave antes da análise compartilhada (referência)."""
+    texto_lower = texto.lower()
+    conceitos_encontrados = []
+    for palavra in PALAVRAS_RELEVANTES_ANTIGO:
+        if palavra in texto_lower and palavra not in conceitos_encontrados:
+            conceitos_encontrados.append(palavra)
+            if len(conceitos_encontrados) >= max_conceitos:
+                break
+    return conceitos_encontrados
+
+
+def frase_antigo(texto):
+    """extrair_frase_principal antes da análise compartilhada (referência)."""
+    frases = re.split(r'[.!?]\s+', texto)
+    for frase in frases:
+        if len(frase.strip()) > 20:
+            return frase.strip()
+    return texto[:150].strip()
+
+
+def insight_antigo(texto_resumo, texto_desafios):
+    """calcular_insight + gerar_insight_estruturado antes da análise compartilhada (referência)."""
+    if not texto_resumo and not texto_desafios:
+        return None
+    texto_resumo = texto_resumo or "Projeto em desenvolvimento"
+    texto_desafios = texto_desafios or "Sem desafios registrados"
+
+    conceitos_resumo = conceitos_antigo(texto_resumo, max_conceitos=3)
+    conceitos_desafios = conceitos_antigo(texto_desafios, max_conceitos=2)
+    frase_principal = frase_antigo(texto_resumo)
+
+    partes_insight = []
+    if conceitos_resumo:
+        if len(conceitos_resumo) == 1:
+            conceitos_str = conceitos_resumo[0]
+        elif len(conceitos_resumo) == 2:
+            conceitos_str = f"{conceitos_resumo[0]} e {conceitos_resumo[1]}"
+        else:
+            conceitos_str = ", ".join(conceitos_resumo[:-1]) + f" e {conceitos_resumo[-1]}"
+        partes_insight.append(f"Projeto focado em {conceitos_str}")
+    else:
+        partes_insight.append(frase_principal[:100])
+
+    if conceitos_desafios:
+        if len(conceitos_desafios) == 1:
+            desafios_str = conceitos_desafios[0]
+        else:
+            desafios_str = f"{conceitos_desafios[0]} e {conceitos_desafios[1]}"
+        partes_insight.append(f"com desafios relacionados a {desafios_str}")
+
+    if 'dados' in conceitos_resumo or 'análise' in conceitos_resumo:
+        partes_insight.append("visando suporte à tomada de decisão estratégica")
+    elif 'riscos' in conceitos_resumo or 'gestão' in conceitos_resumo:
+        partes_insight.append("para garantir operações seguras e eficientes")
+    elif 'indicadores' in conceitos_resumo or 'monitoramento' in conceitos_resumo:
+        partes_insight.append("permitindo acompanhamento contínuo de resultados e performance")
+    elif 'automação' in conceitos_resumo or 'processos' in conceitos_resumo:
+        partes_insight.append("otimizando processos e aumentando a eficiência operacional")
+
+    insight = ", ".join(partes_insight) + "."
+    return insight[0].upper() + insight[1:]
+
+
+def montar_portfolio(quantidade, repetidos, semente=11):
+    """Pares (resumo, desafios); a fração 'repetidos' usa os textos padrão."""
+    aleatorio = random.Random(semente)
+    projetos = []
+    for _ in range(quantidade):
+        if aleatorio.random() < repetidos:
+            projetos.append((RESUMO_PADRAO, DESAFIOS_PADRAO))
+            continue
+        resumo = ". ".join(aleatorio.choice(FRASES_RESUMO) for _ in range(aleatorio.randint(1, 12))) + "."
+        desafios = ". ".join(aleatorio.choice(FRASES_DESAFIOS) for _ in range(aleatorio.randint(1, 6))) + "."
+        projetos.append((resumo, desafios))
+    return projetos
+
+
+def medir(funcao, projetos):
+    _analise_em_cache.cache_clear()
+    inicio = time.perf_counter()
+    for texto_resumo, texto_desafios in projetos:
+        funcao(texto_resumo, texto_desafios)
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara os analisadores antigos com a análise compartilhada")
+    parser.add_argument("--projetos", type=int, default=100000)
+    parser.add_argument("--repetidos", type=float, default=0.3,
+                        help="fração de projetos com os textos padrão")
+    args = parser.parse_args()
+
+    projetos = montar_portfolio(args.projetos, args.repetidos)
+    print(f"{args.projetos} projetos, {args.repetidos:.0%} com os textos padrão")
+
+    _analise_em_cache.cache_clear()
+    for texto_resumo, texto_desafios in projetos:
+        if insight_antigo(texto_resumo, texto_desafios) != calcular_insight(texto_resumo, texto_desafios):
+            print(f"ERRO: insights diferentes para {texto_resumo[:60]!r}")
+            sys.exit(1)
+
+    tempo_antigo = medir(insight_antigo, projetos)
+    tempo_novo = medir(calcular_insight, projetos)
+    print(f"{'':<22} {'tempo':>8} {'projetos/s':>11}")
+    for nome, segundos in (("analisadores antigos", tempo_antigo), ("análise compartilhada", tempo_novo)):
+        print(f"{nome:<22} {segundos:>7.2f}s {args.projetos / segundos:>11.0f}")
+    print(f"ganho: {tempo_antigo / tempo_novo:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
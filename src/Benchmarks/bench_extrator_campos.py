@@ -0,0 +1,70 @@
+"""
+Micro-benchmark: extrair_valor (uma varredura por marcador) x ExtratorCampos (uma passada).
+
+Monta um texto sintético parecido com um relatório PDF longo, confere que os
+dois caminhos retornam os mesmos campos e mede o tempo de cada um.
+
+Uso:
+    python src/Benchmarks/bench_extrator_campos.py
+    python src/Benchmarks/bench_extrator_campos.py --paginas 500 --repeticoes 50
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from Readers.leitor_pdf import MARCADORES_PDF, EXTRATOR_PDF, extrair_valor
+
+
+def montar_texto(paginas):
+    """Texto com 'paginas' blocos de conteúdo e os marcadores espalhados (alguns só no fim)."""
+    pagina = ("Lorem ipsum dolor sit amet, análise de riscos operacionais e financeiros.\n" * 40)
+    marcadores = list(MARCADORES_PDF)
+    partes = []
+    for numero in range(paginas):
+        partes.append(pagina)
+        # Metade dos marcadores no começo, o resto só nas últimas páginas
+        if numero == 0:
+            partes.extend(f"{m} valor de {m}\n" for m in marcadores[:len(marcadores) // 2])
+        elif numero == paginas - 1:
+            partes.extend(f"{m} valor de {m}\n" for m in marcadores[len(marcadores) // 2:])
+    return "".join(partes)
+
+
+def extrair_antigo(texto):
+    campos = {}
+    for marcador, campo in MARCADORES_PDF.items():
+        valor = extrair_valor(texto, marcador)
+        if valor is not None:
+            campos[campo] = valor
+    return campos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara extrair_valor com ExtratorCampos")
+    parser.add_argument("--paginas", type=int, default=200)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    texto = montar_texto(args.paginas)
+    antigo = extrair_antigo(texto)
+    novo = EXTRATOR_PDF.extrair(texto)
+    if antigo != novo:
+        print("ERRO: os resultados são diferentes!")
+        print(f"  antigo: {antigo}")
+        print(f"  novo:   {novo}")
+        sys.exit(1)
+
+    tempo_antigo = timeit.timeit(lambda: extrair_antigo(texto), number=args.repeticoes)
+    tempo_novo = timeit.timeit(lambda: EXTRATOR_PDF.extrair(texto), number=args.repeticoes)
+
+    print(f"Texto: {len(texto) / 1024:.0f} KB, {len(MARCADORES_PDF)} marcadores, "
+          f"{args.repeticoes} repetições")
+    print(f"extrair_valor x{len(MARCADORES_PDF)}: {tempo_antigo / args.repeticoes * 1000:.2f} ms por texto")
+    print(f"ExtratorCampos:     {tempo_novo / args.repeticoes * 1000:.2f} ms por texto")
+    print(f"Ganho: {tempo_antigo / tempo_novo:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
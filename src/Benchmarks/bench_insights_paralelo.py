@@ -0,0 +1,113 @@
+"""
+Benchmark: tempo de uma regeração completa de insights x número de processos.
+
+Cria um portfólio sintético num banco temporário, roda gerar_insights do zero
+para cada quantidade de workers e mostra projetos/segundo e o ganho em relação
+a 1 processo. Os insights gerados são comparados com os da execução serial.
+
+Uso:
+    python src/Benchmarks/bench_insights_paralelo.py
+    python src/Benchmarks/bench_insights_paralelo.py --projetos 200000 --workers 1 2 4 8 --chunk 500
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from AI.processador_ia import TAMANHO_CHUNK_INSIGHTS, TAMANHO_LOTE_INSIGHTS, gerar_insights
+
+FRASES_RESUMO = [
+    "O projeto de transformação digital atingiu 60% de conclusão.",
+    "A migração do ERP avança dentro do orçamento previsto.",
+    "A equipe de Operações concluiu a integração com os fornecedores.",
+    "O piloto nas lojas mostrou ganho de eficiência na reposição.",
+    "A plataforma de dados entrou em produção para a área comercial.",
+]
+FRASES_DESAFIOS = [
+    "Risco de atraso na entrega do fornecedor.",
+    "Falta de recursos na equipe de integração.",
+    "Orçamento pressionado pela mudança de escopo.",
+    "Dependência de aprovação da área jurídica.",
+    "Qualidade dos dados de origem abaixo do esperado.",
+]
+
+
+def criar_portfolio(caminho, quantidade, semente=42):
+    aleatorio = random.Random(semente)
+    conexao = sqlite3.connect(caminho)
+    conexao.execute("""
+        CREATE TABLE projetos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome_projeto TEXT,
+            resumo_executivo TEXT,
+            principais_desafios TEXT,
+            resumo_ia TEXT,
+            hash_insight TEXT
+        )
+    """)
+    conexao.executemany(
+        "INSERT INTO projetos (nome_projeto, resumo_executivo, principais_desafios) VALUES (?, ?, ?)",
+        (
+            (f"Projeto {i}",
+             " ".join(aleatorio.choice(FRASES_RESUMO) for _ in range(aleatorio.randint(1, 8))),
+             " ".join(aleatorio.choice(FRASES_DESAFIOS) for _ in range(aleatorio.randint(1, 5))))
+            for i in range(quantidade)
+        )
+    )
+    conexao.commit()
+    conexao.close()
+
+
+def insights(caminho):
+    conexao = sqlite3.connect(caminho)
+    try:
+        return conexao.execute("SELECT id, resumo_ia FROM projetos ORDER BY id").fetchall()
+    finally:
+        conexao.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projetos", type=int, default=100000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE_INSIGHTS)
+    parser.add_argument("--chunk", type=int, default=TAMANHO_CHUNK_INSIGHTS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "portfolio.db")
+        criar_portfolio(caminho, args.projetos)
+        print(f"{args.projetos} projetos, lote={args.lote}, chunk={args.chunk}, {os.cpu_count()} núcleos")
+
+        referencia = None
+        tempo_serial = None
+        for workers in sorted(set(args.workers)):
+            conexao = sqlite3.connect(caminho)
+            conexao.execute("UPDATE projetos SET resumo_ia = NULL, hash_insight = NULL")
+            conexao.commit()
+            conexao.close()
+
+            inicio = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                gerar_insights(args.lote, False, workers, args.chunk, caminho)
+            segundos = time.perf_counter() - inicio
+
+            resultado = insights(caminho)
+            if referencia is None:
+                referencia = resultado
+            iguais = "ok" if resultado == referencia else "DIFERENTE"
+            if workers == 1:
+                tempo_serial = segundos
+            ganho = f"{tempo_serial / segundos:.2f}x" if tempo_serial else "-"
+            print(f"  workers={workers:<3} {segundos:7.2f}s  {args.projetos / segundos:9.0f} projetos/s  "
+                  f"ganho {ganho:>6}  insights {iguais}")
+
+
+if __name__ == "__main__":
+    main()
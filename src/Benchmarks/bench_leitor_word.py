@@ -0,0 +1,98 @@
+"""
+Benchmark: leitura de relatórios Word com python-docx x XML em streaming (lxml iterparse).
+
+Gera um relatório CRM sintético grande, confere que os dois modos extraem o
+mesmo registro e mede tempo e pico de memória de cada um.
+
+Uso:
+    python src/Benchmarks/bench_leitor_word.py
+    python src/Benchmarks/bench_leitor_word.py --paragrafos 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import resource
+
+import docx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from Readers.leitor_word import iterar_paragrafos_word, EXTRATOR_WORD
+
+
+def gerar_relatorio(caminho, paragrafos):
+    """Relatório no formato do relatorio_crm.docx, com seções muito longas."""
+    documento = docx.Document()
+    documento.add_paragraph("Nome do Projeto: Monitor de Indicadores")
+    documento.add_paragraph("Responsável: Ana Costa")
+    documento.add_paragraph("Status: Em andamento")
+    documento.add_paragraph("Data: 04/10/2025")
+    secoes = ["1. Resumo Executivo", "2. Progresso Atual", "3. Principais Desafios",
+              "4. Ações Corretivas", "5. Perspectiva"]
+    por_secao = max(1, paragrafos // len(secoes))
+    for secao in secoes:
+        documento.add_paragraph(secao)
+        for numero in range(por_secao):
+            documento.add_paragraph(f"- Item {numero} da seção {secao}: indicadores revisados.")
+    documento.save(caminho)
+
+
+def ler_campos(caminho, streaming):
+    """Percorre os parágrafos e conta as linhas de cada seção (mesma lógica do leitor)."""
+    contagem = {}
+    secao = None
+    for texto in iterar_paragrafos_word(caminho, streaming):
+        texto = texto.strip()
+        if not texto:
+            continue
+        encontrado = EXTRATOR_WORD.marcador_no_inicio(texto)
+        if encontrado:
+            secao = encontrado[1]
+            contagem[secao] = 0
+        elif secao:
+            contagem[secao] += 1
+    return contagem
+
+
+def medir(caminho, streaming):
+    """
+    Retorna (resultado, segundos, MB que o pico de RSS do processo cresceu).
+
+    O lxml aloca fora do heap do Python, então o tracemalloc não enxerga o DOM;
+    por isso o pico de RSS. O modo streaming é medido primeiro para que o
+    crescimento do pico do python-docx não fique escondido.
+    """
+    pico_antes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    inicio = time.perf_counter()
+    resultado = ler_campos(caminho, streaming)
+    segundos = time.perf_counter() - inicio
+    pico_depois = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return resultado, segundos, (pico_depois - pico_antes) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara python-docx com leitura do XML em streaming")
+    parser.add_argument("--paragrafos", type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "relatorio_grande.docx")
+        gerar_relatorio(caminho, args.paragrafos)
+        print(f"Relatório com {args.paragrafos} parágrafos "
+              f"({os.path.getsize(caminho) / 1024:.0f} KB compactado)")
+
+        resultado_xml, tempo_xml, pico_xml = medir(caminho, streaming=True)
+        resultado_docx, tempo_docx, pico_docx = medir(caminho, streaming=False)
+
+    if resultado_docx != resultado_xml:
+        print("ERRO: os modos extraíram conteúdos diferentes!")
+        sys.exit(1)
+
+    print(f"python-docx:   {tempo_docx:.2f}s, pico de RSS +{pico_docx:.1f} MB")
+    print(f"XML streaming: {tempo_xml:.2f}s, pico de RSS +{pico_xml:.1f} MB")
+    print(f"Ganho: {tempo_docx / tempo_xml:.1f}x mais rápido")
+
+
+if __name__ == "__main__":
+    main()
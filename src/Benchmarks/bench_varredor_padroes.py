@@ -0,0 +1,392 @@
+"""
+Benchmark: extratores de gráficos/dados com padrões por linha x varredura única.
+
+As versões antigas de _gerar_graficos_analise e _extrair_dados_contextualizados
+(regex sem compilar por linha e por padrão, uma passada por tipo de dado,
+duplicatas removidas com any()) ficam aqui como referência. O benchmark monta
+um documento de ~1 MB, confere que as duas versões dão o mesmo resultado e
+mede o tempo de cada uma.
+
+Uso:
+    python src/Benchmarks/bench_varredor_padroes.py
+    python src/Benchmarks/bench_varredor_padroes.py --megabytes 4 --repeticoes 5
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from AI.processador_ia import _extrair_dados_contextualizados, _gerar_graficos_analise
+from AI.varredor_padroes import varrer_documento
+
+LINHAS = [
+    "O comitê revisou o cronograma e os riscos operacionais da operação de lojas.",
+    "- Desenvolvimento da estrutura de dados: 100% concluído",
+    "- 45% de integração com o ERP finalizada pela equipe",
+    "Status: Em andamento com riscos de atraso",
+    "Responsável: Ana Costa, Operações",
+    "Entrega prevista para 15/12/2025, com revisão em 01/02/2026.",
+    "Exemplo de preenchimento: 30% (apenas ilustrativo)",
+    "O projeto atingiu 75% da meta anual prevista no plano.",
+    "Orçamento consumido: 80% do total aprovado para o ano.",
+    "Reunião de acompanhamento com fornecedores e área de negócio.",
+    "A equipe identificou dependências externas que podem impactar o prazo.",
+]
+
+
+def graficos_antigo(conteudo):
+    """_gerar_graficos_analise antes da varredura única (referência)."""
+    import re
+    
+    graficos = {}
+    
+    # Palavras-chave que indicam dados IRRELEVANTES (genéricos/exemplos)
+    palavras_irrelevantes = [
+        'exemplo', 'modelo', 'template', 'amostra', 'ilustração',
+        'hipotético', 'fictício', 'simulação', 'teste', 'demo'
+    ]
+    
+    # Tentar extrair percentuais REAIS para gráfico de progresso
+    percentuais_com_label = []
+    
+    # Padrões com PRIORIDADE (mais específicos primeiro, genéricos depois)
+    padroes_prioritarios = [
+        # Padrão 1: Lista com marcador (mais específico)
+        (r'[-•]\s*([A-Za-zÀ-ÿ][^:\n]{10,150}):\s*(\d+)%', 10),
+        # Padrão 2: Lista invertida
+        (r'[-•]\s*(\d+)%\s+(?:de\s+)?([A-Za-zÀ-ÿ][^\n]{10,100})', 9),
+    ]
+    
+    padroes_genericos = [
+        # Padrão 3: Label seguido de percentual (sem marcador)
+        (r'([A-Za-zÀ-ÿ][^:\n]{10,100}):\s*(\d+)%', 5),
+        # Padrão 4: Percentual seguido de label
+        (r'(\d+)%\s+(?:de\s+)?([A-Za-zÀ-ÿ][^\n]{10,80})', 4),
+        # Padrão 5: Label com verbo de conclusão
+        (r'([A-Za-zÀ-ÿ][^\n]{10,80})\s+(?:está|atingiu|alcançou)?\s*(?:em\s+)?(\d+)%', 3),
+    ]
+    
+    linhas_conteudo = conteudo.split('\n')
+    
+    # Primeira passagem: tentar padrões prioritários
+    for linha in linhas_conteudo:
+        linha_lower = linha.lower()
+        
+        # Ignorar linhas com palavras irrelevantes
+        if any(palavra in linha_lower for palavra in palavras_irrelevantes):
+            continue
+        
+        # Ignorar linha se for apenas título genérico (como "concluído: 100%")
+        if re.match(r'^\s*[a-zç]{1,15}\s*:\s*\d+%\s*$', linha.strip(), re.IGNORECASE):
+            continue
+        
+        for padrao, prioridade in padroes_prioritarios:
+            matches = re.findall(padrao, linha, re.IGNORECASE)
+            for match in matches:
+                if len(match) == 2:
+                    label = match[0].strip() if not match[0].isdigit() else match[1].strip()
+                    valor = match[1] if not match[0].isdigit() else match[0]
+                    
+                    try:
+                        valor_num = int(valor)
+                        if 0 < valor_num <= 100:
+                            # Limpar sufixos desnecessários do label
+                            label_limpo = re.sub(r'\s+(concluído|concluída|finalizado|finalizada|completo|completa).*$', '', label, flags=re.IGNORECASE)
+                            label_limpo = re.sub(r'[:\-]$', '', label_limpo).strip()
+                            label_limpo = label_limpo[:60]
+                            
+                            # Validar tamanho mínimo
+                            if len(label_limpo) >= 8 and re.search(r'[a-zA-ZÀ-ÿ]{5,}', label_limpo):
+                                # Evitar duplicatas
+                                if not any(p['label'].lower() == label_limpo.lower() for p in percentuais_com_label):
+                                    percentuais_com_label.append({
+                                        'label': label_limpo,
+                                        'valor': valor_num,
+                                        'prioridade': prioridade
+                                    })
+                    except:
+                        pass
+    
+    # Segunda passagem: se não encontrou itens suficientes, usar padrões genéricos
+    if len(percentuais_com_label) < 2:
+        for linha in linhas_conteudo:
+            linha_lower = linha.lower()
+            
+            if any(palavra in linha_lower for palavra in palavras_irrelevantes):
+                continue
+            
+            if re.match(r'^\s*[a-zç]{1,15}\s*:\s*\d+%\s*$', linha.strip(), re.IGNORECASE):
+                continue
+            
+            for padrao, prioridade in padroes_genericos:
+                matches = re.findall(padrao, linha, re.IGNORECASE)
+                for match in matches:
+                    if len(match) == 2:
+                        label = match[0].strip() if not match[0].isdigit() else match[1].strip()
+                        valor = match[1] if not match[0].isdigit() else match[0]
+                        
+                        try:
+                            valor_num = int(valor)
+                            if 0 < valor_num <= 100:
+                                label_limpo = re.sub(r'\s+(concluído|concluída|finalizado|finalizada|completo|completa).*$', '', label, flags=re.IGNORECASE)
+                                label_limpo = re.sub(r'[:\-]$', '', label_limpo).strip()
+                                label_limpo = label_limpo[:60]
+                                
+                                # Para padrões genéricos, ser um pouco mais flexível no tamanho
+                                if len(label_limpo) >= 5 and re.search(r'[a-zA-ZÀ-ÿ]{3,}', label_limpo):
+                                    if not any(p['label'].lower() == label_limpo.lower() for p in percentuais_com_label):
+                                        percentuais_com_label.append({
+                                            'label': label_limpo,
+                                            'valor': valor_num,
+                                            'prioridade': prioridade
+                                        })
+                        except:
+                            pass
+    
+    # Gerar gráfico apenas se houver dados válidos (mínimo 2, máximo 8)
+    if len(percentuais_com_label) >= 2:
+        # Ordenar por prioridade primeiro, depois por valor
+        percentuais_com_label = sorted(percentuais_com_label, key=lambda x: (x['prioridade'], x['valor']), reverse=True)[:8]
+        
+        valores = [p['valor'] for p in percentuais_com_label]
+        labels = [p['label'] for p in percentuais_com_label]
+        
+        graficos['progresso'] = {
+            'tipo': 'barra',
+            'valores': valores,
+            'labels': labels,
+            'titulo': 'Indicadores de Progresso do Projeto',
+            'descricao': 'Percentuais de conclusão das diferentes etapas identificadas no documento. Estes dados representam o estado atual do projeto conforme documentado.'
+        }
+    
+    return graficos if graficos else None
+
+
+def dados_antigo(texto):
+    """_extrair_dados_contextualizados antes da varredura única (referência)."""
+    import re
+    
+    dados = []
+    
+    # Palavras-chave que indicam dados IRRELEVANTES
+    palavras_irrelevantes = [
+        'exemplo', 'modelo', 'template', 'amostra', 'ilustração',
+        'hipotético', 'fictício', 'simulação', 'teste', 'demo',
+        'padrão', 'genérico', 'default'
+    ]
+    
+    # Buscar percentuais com contexto mais amplo
+    linhas = texto.split('\n')
+    percentuais_encontrados = []
+    
+    for linha in linhas:
+        # Ignorar linhas inteiras com palavras irrelevantes
+        linha_lower = linha.lower()
+        if any(palavra in linha_lower for palavra in palavras_irrelevantes):
+            continue
+        
+        # Ignorar linhas genéricas tipo "concluído: 100%" (títulos curtos)
+        if re.match(r'^\s*[a-zç]{1,15}\s*:\s*\d+%\s*$', linha.strip(), re.IGNORECASE):
+            continue
+        
+        # PRIORIDADE 1: Procurar padrões de lista com percentual
+        # "- Desenvolvimento da estrutura: 100% concluído"
+        match_lista = re.search(r'[-•]\s*([^:\n]{10,150}):\s*(\d+)%', linha, re.IGNORECASE)
+        if match_lista:
+            label = match_lista.group(1).strip()
+            valor = match_lista.group(2)
+            
+            # Limpar sufixos desnecessários
+            label_limpo = re.sub(r'\s+(concluído|concluída|finalizado|finalizada|completo|completa).*$', '', label, flags=re.IGNORECASE)
+            label_limpo = label_limpo.strip()
+            
+            # Validar
+            if len(label_limpo) >= 8 and re.search(r'[a-zA-ZÀ-ÿ]{5,}', label_limpo):
+                contexto = f"{label_limpo}: {valor}%"
+                
+                # Evitar duplicatas
+                if not any(p['valor'] == valor and label_limpo.lower() in p['contexto'].lower() for p in percentuais_encontrados):
+                    percentuais_encontrados.append({
+                        'valor': valor,
+                        'contexto': contexto,
+                        'prioridade': 10
+                    })
+            continue
+        
+        # PRIORIDADE 2: Procurar outros padrões de percentual com contexto
+        matches = re.finditer(r'(.{0,80})(\d+)%(.{0,80})', linha, re.IGNORECASE)
+        for match in matches:
+            contexto_antes = match.group(1).strip()
+            valor = match.group(2)
+            contexto_depois = match.group(3).strip()
+            
+            # Ignorar percentuais de 0% sem contexto relevante
+            if valor == '0' and not any(palavra in linha_lower for palavra in ['progresso', 'conclusão', 'andamento', 'completo']):
+                continue
+            
+            # Montar contexto completo
+            contexto_completo = f"{contexto_antes} {valor}% {contexto_depois}".strip()
+            
+            # Limpar contexto de caracteres especiais no início/fim
+            contexto_completo = re.sub(r'^[:\-\s]+|[:\-\s]+$', '', contexto_completo)
+            
+            # Validar que o contexto tem pelo menos algum texto significativo
+            texto_sem_percentual = contexto_completo.replace(f'{valor}%', '').strip()
+            if len(texto_sem_percentual) < 8:  # Reduzido de 10 para 8 para ser mais flexível
+                continue
+            
+            # Validar que tem texto alfabético real (não apenas números/símbolos)
+            if not re.search(r'[a-zA-ZÀ-ÿ]{4,}', texto_sem_percentual):  # Reduzido de 5 para 4
+                continue
+            
+            # Evitar duplicatas exatas ou muito similares
+            if not any(p['valor'] == valor and p['contexto'][:40] == contexto_completo[:40] for p in percentuais_encontrados):
+                percentuais_encontrados.append({
+                    'valor': valor,
+                    'contexto': contexto_completo[:200],
+                    'prioridade': 5
+                })
+    
+    if percentuais_encontrados:
+        # Ordenar por prioridade e limitar a 8 itens mais relevantes
+        percentuais_encontrados = sorted(percentuais_encontrados, key=lambda x: x['prioridade'], reverse=True)[:8]
+        
+        valores = []
+        for p in percentuais_encontrados:
+            contexto_limpo = p['contexto'].replace('\n', ' ').strip()
+            if contexto_limpo:
+                valores.append(f"{p['valor']}% → {contexto_limpo}")
+        
+        if valores:
+            dados.append({
+                'categoria': 'Indicadores de Progresso',
+                'descricao': 'Percentuais e métricas identificados no documento:',
+                'valores': valores
+            })
+    
+    # Buscar informações de prazo e status (evitar duplicatas e dados genéricos)
+    status_info = {}
+    padroes_status = [
+        (r'status:?\s*([^\n.]{5,100})', 'Status'),
+        (r'situação:?\s*([^\n.]{5,100})', 'Situação'),
+        (r'responsável:?\s*([^\n.]{3,80})', 'Responsável'),
+    ]
+    
+    for linha in linhas:
+        # Ignorar linhas com palavras irrelevantes
+        if any(palavra in linha.lower() for palavra in palavras_irrelevantes):
+            continue
+            
+        for padrao, categoria in padroes_status:
+            if categoria not in status_info:  # Evitar duplicatas de categoria
+                matches = re.findall(padrao, linha, re.IGNORECASE)
+                if matches:
+                    info = matches[0] if isinstance(matches[0], str) else matches[0][0]
+                    info_limpa = info.strip()[:150]
+                    
+                    # Validar que não é genérico demais
+                    if info_limpa and len(info_limpa) > 5:
+                        # Deve conter letras reais
+                        if re.search(r'[a-zA-ZÀ-ÿ]{3,}', info_limpa):
+                            status_info[categoria] = info_limpa
+    
+    if status_info:
+        valores_formatados = [f"{cat}: {val}" for cat, val in status_info.items()]
+        dados.append({
+            'categoria': 'ℹ️ Informações do Projeto',
+            'descricao': 'Detalhes identificados no documento:',
+            'valores': valores_formatados
+        })
+    
+    # Buscar datas específicas (sem duplicatas)
+    datas_encontradas = set()
+    padroes_data = [
+        r'\b(\d{1,2}/\d{1,2}/\d{4})\b',  # Datas dd/mm/yyyy
+    ]
+    
+    for linha in linhas:
+        # Ignorar linhas com palavras irrelevantes
+        if any(palavra in linha.lower() for palavra in palavras_irrelevantes):
+            continue
+            
+        for padrao in padroes_data:
+            matches = re.findall(padrao, linha)
+            for data in matches[:5]:
+                datas_encontradas.add(data)
+    
+    if datas_encontradas and len(datas_encontradas) <= 10:  # Limitar para evitar lixo
+        dados.append({
+            'categoria': 'Prazos e Datas',
+            'descricao': 'Datas identificadas no documento:',
+            'valores': sorted(list(datas_encontradas))[:5]
+        })
+    
+    return dados if dados else None
+
+
+def montar_documento(megabytes, semente=7):
+    aleatorio = random.Random(semente)
+    linhas = []
+    tamanho = 0
+    while tamanho < megabytes * 1024 * 1024:
+        linha = aleatorio.choice(LINHAS)
+        # Varia números e labels para gerar muitos itens distintos
+        linha = linha.replace("45%", f"{aleatorio.randint(1, 100)}%").replace("estrutura", f"estrutura {len(linhas)}")
+        linhas.append(linha)
+        tamanho += len(linha) + 1
+    return "\n".join(linhas)
+
+
+def medir(funcao, texto, repeticoes, limpar_cache=True):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        if limpar_cache:
+            varrer_documento.cache_clear()
+        inicio = time.perf_counter()
+        funcao(texto)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara os extratores antigos com a varredura única")
+    parser.add_argument("--megabytes", type=float, default=1.0)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    texto = montar_documento(args.megabytes)
+    print(f"Documento: {len(texto) / 1024 / 1024:.2f} MB, {texto.count(chr(10)) + 1} linhas")
+
+    varrer_documento.cache_clear()
+    if graficos_antigo(texto) != _gerar_graficos_analise(texto) or dados_antigo(texto) != _extrair_dados_contextualizados(texto):
+        print("ERRO: os resultados são diferentes!")
+        sys.exit(1)
+
+    def antigo(texto):
+        graficos_antigo(texto)
+        dados_antigo(texto)
+
+    def novo(texto):
+        _gerar_graficos_analise(texto)
+        _extrair_dados_contextualizados(texto)
+
+    tempo_graficos_antigo = medir(graficos_antigo, texto, args.repeticoes)
+    tempo_dados_antigo = medir(dados_antigo, texto, args.repeticoes)
+    tempo_antigo = medir(antigo, texto, args.repeticoes)
+    tempo_graficos_novo = medir(_gerar_graficos_analise, texto, args.repeticoes)
+    tempo_dados_novo = medir(_extrair_dados_contextualizados, texto, args.repeticoes)
+    tempo_novo = medir(novo, texto, args.repeticoes)
+
+    print(f"{'':<33} {'antigo':>9} {'novo':>9} {'ganho':>7}")
+    for nome, velho, atual in (
+        ("_gerar_graficos_analise", tempo_graficos_antigo, tempo_graficos_novo),
+        ("_extrair_dados_contextualizados", tempo_dados_antigo, tempo_dados_novo),
+        ("os dois (mesmo documento)", tempo_antigo, tempo_novo),
+    ):
+        print(f"{nome:<33} {velho * 1000:>7.0f}ms {atual * 1000:>7.0f}ms {velho / atual:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
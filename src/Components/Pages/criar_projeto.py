@@ -9,6 +9,25 @@ caminho_src = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__
 sys.path.insert(0, caminho_src)
 
 from Readers.criptograph import encriptar_dado
+from Database.upsert_projetos import conectar, inserir_projeto_novo
+from Database.indice_termos import indexar_projetos
+from AI.processador_ia import _extrair_palavras_chave
+from Readers.extrator_campos import ExtratorCampos
+from Readers.extracao_documentos import extrair_texto_documento, tipo_do_arquivo, tipo_suportado
+
+# Palavras que antecedem o nome do responsável, em ordem de preferência
+EXTRATOR_RESPONSAVEL = ExtratorCampos(
+    {"responsável": "responsável", "gestor": "gestor", "coordenador": "coordenador"},
+    padrao_valor=r'[:\s]+([A-ZÀ-Ú][a-zà-ú]+(?:\s+[A-ZÀ-Ú][a-zà-ú]+)*)'
+)
+
+# Palavras que indicam o status; a ordem de ORDEM_STATUS define a prioridade
+EXTRATOR_STATUS = ExtratorCampos({
+    "concluído": "Concluído", "finalizado": "Concluído",
+    "andamento": "Em Andamento", "em curso": "Em Andamento",
+    "planejado": "Planejado", "planejamento": "Planejado"
+})
+ORDEM_STATUS = ["Concluído", "Em Andamento", "Planejado"]
 
 def render_criar_projeto_page():
     """Página para criar novos projetos"""
@@ -151,84 +170,75 @@ def render_criar_projeto_upload():
 
 def processar_upload_arquivo(arquivo, nome_projeto: str, criado_por: int) -> tuple[bool, str]:
     """Processa arquivo enviado e cria projeto"""
+    caminho_arquivo = None
+    conexao = None
     try:
-        # Determinar tipo de arquivo
-        extensao = arquivo.name.split('.')[-1].lower()
-        
-        # Importar leitores apropriados
-        conteudo = None
-        
-        if extensao == 'pdf':
-            from Readers.leitor_pdf import ler_pdf
-            conteudo = ler_pdf(arquivo)
-        
-        elif extensao in ['docx', 'doc']:
-            from Readers.leitor_word import ler_word
-            # Salvar temporariamente para ler
-            import tempfile
-            with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{extensao}') as tmp:
-                tmp.write(arquivo.getbuffer())
-                tmp_path = tmp.name
-            conteudo = ler_word(tmp_path)
-            os.remove(tmp_path)
-        
-        elif extensao in ['xlsx', 'xls']:
-            from Readers.leitor_excel import ler_excel
-            # Salvar temporariamente para ler
-            import tempfile
-            with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{extensao}') as tmp:
-                tmp.write(arquivo.getbuffer())
-                tmp_path = tmp.name
-            conteudo = ler_excel(tmp_path)
-            os.remove(tmp_path)
-        
-        else:
-            return False, f"Formato de arquivo não suportado: .{extensao}"
+        # Extrair o texto direto do buffer do upload (sem arquivo temporário)
+        if not tipo_suportado(arquivo.name):
+            return False, f"Formato de arquivo não suportado: .{tipo_do_arquivo(arquivo.name)}"
+        conteudo = extrair_texto_documento(arquivo)
         
         if not conteudo or len(conteudo.strip()) < 50:
             return False, "Não foi possível extrair conteúdo suficiente do arquivo"
         
+        CAMINHO_BANCO = os.path.join("data", "projetos_sonae.db")
+        conexao = conectar(CAMINHO_BANCO)
+        cursor = conexao.cursor()
+        
+        # Nome já usado: recusa antes de gravar o arquivo (não deixa arquivo órfão em uploads)
+        cursor.execute("SELECT 1 FROM projetos WHERE nome_projeto = ?", (nome_projeto,))
+        if cursor.fetchone():
+            return False, f"Já existe um projeto com o nome '{nome_projeto}'"
+        
         # Salvar arquivo no diretório data
         caminho_arquivo = salvar_arquivo_upload(arquivo, nome_projeto)
         
         # Extrair informações básicas do conteúdo
         dados_extraidos = extrair_dados_basicos(conteudo)
         
-        # Criar projeto no banco
-        CAMINHO_BANCO = os.path.join("data", "projetos_sonae.db")
-        conexao = sqlite3.connect(CAMINHO_BANCO)
-        cursor = conexao.cursor()
-        
         # Criptografar responsável se houver
         responsavel = dados_extraidos.get('responsavel', 'A definir')
         responsavel_cript = encriptar_dado(responsavel)
         
-        cursor.execute("""
-            INSERT INTO projetos (
-                nome, nome_projeto, responsavel, status, 
-                descricao, fonte_dados, criado_por, criado_em,
-                data_inicio
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            nome_projeto,
-            nome_projeto,
-            responsavel_cript,
-            dados_extraidos.get('status', 'Em Andamento'),
-            conteudo[:1000],  # Primeiros 1000 caracteres como descrição
-            caminho_arquivo,
-            criado_por,
-            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            datetime.now().strftime("%Y-%m-%d")
-        ))
+        novo_id = inserir_projeto_novo(cursor, nome_projeto, {
+            "nome": nome_projeto,
+            "responsavel": responsavel_cript,
+            "status": dados_extraidos.get('status', 'Em Andamento'),
+            "descricao": conteudo[:1000],  # Primeiros 1000 caracteres como descrição
+            # Tags sugeridas: termos do documento mais característicos no corpus (TF-IDF)
+            "tags": ", ".join(_extrair_palavras_chave(conteudo, 5, cursor)) or None,
+            "fonte_dados": caminho_arquivo,
+            "criado_por": criado_por,
+            "criado_em": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "data_inicio": datetime.now().strftime("%Y-%m-%d")
+        })
+        if novo_id is None:
+            # Outra origem criou o mesmo nome entre a verificação e o INSERT
+            _remover_arquivo_upload(caminho_arquivo)
+            return False, f"Já existe um projeto com o nome '{nome_projeto}'"
+        indexar_projetos(cursor, [nome_projeto])
         
         conexao.commit()
-        conexao.close()
         
         return True, f"Projeto '{nome_projeto}' criado com sucesso a partir do arquivo!"
         
     except Exception as e:
         import traceback
+        _remover_arquivo_upload(caminho_arquivo)
         return False, f"Erro ao processar arquivo: {str(e)}\n{traceback.format_exc()}"
+    
+    finally:
+        if conexao:
+            conexao.close()
+
+
+def _remover_arquivo_upload(caminho_arquivo):
+    """Apaga o arquivo salvo de um upload que não virou projeto."""
+    if caminho_arquivo and os.path.exists(caminho_arquivo):
+        try:
+            os.remove(caminho_arquivo)
+        except OSError:
+            pass
 
 
 def salvar_arquivo_upload(arquivo, nome_projeto: str) -> str:
@@ -254,33 +264,21 @@ def salvar_arquivo_upload(arquivo, nome_projeto: str) -> str:
 
 def extrair_dados_basicos(conteudo: str) -> dict:
     """Extrai informações básicas do conteúdo"""
-    import re
-    
     dados = {}
     
-    # Tentar extrair responsável
-    padroes_responsavel = [
-        r'responsável[:\s]+([A-ZÀ-Ú][a-zà-ú]+(?:\s+[A-ZÀ-Ú][a-zà-ú]+)*)',
-        r'gestor[:\s]+([A-ZÀ-Ú][a-zà-ú]+(?:\s+[A-ZÀ-Ú][a-zà-ú]+)*)',
-        r'coordenador[:\s]+([A-ZÀ-Ú][a-zà-ú]+(?:\s+[A-ZÀ-Ú][a-zà-ú]+)*)'
-    ]
-    
-    for padrao in padroes_responsavel:
-        match = re.search(padrao, conteudo, re.IGNORECASE)
-        if match:
-            dados['responsavel'] = match.group(1)
+    # Tentar extrair responsável (uma passada para as três palavras-chave)
+    responsaveis = EXTRATOR_RESPONSAVEL.extrair(conteudo)
+    for chave in EXTRATOR_RESPONSAVEL.marcadores.values():
+        if chave in responsaveis:
+            dados['responsavel'] = responsaveis[chave]
             break
     
     # Tentar determinar status
-    conteudo_lower = conteudo.lower()
-    if 'concluído' in conteudo_lower or 'finalizado' in conteudo_lower:
-        dados['status'] = 'Concluído'
-    elif 'andamento' in conteudo_lower or 'em curso' in conteudo_lower:
-        dados['status'] = 'Em Andamento'
-    elif 'planejado' in conteudo_lower or 'planejamento' in conteudo_lower:
-        dados['status'] = 'Planejado'
-    else:
-        dados['status'] = 'Em Andamento'
+    status_encontrados = EXTRATOR_STATUS.extrair(conteudo)
+    dados['status'] = next(
+        (status for status in ORDEM_STATUS if status in status_encontrados),
+        'Em Andamento'
+    )
     
     return dados
 
@@ -322,24 +320,36 @@ def criar_projeto_db(
         # Criptografar responsável
         responsavel_cript = encriptar_dado(responsavel)
         
-        conexao = sqlite3.connect(CAMINHO_BANCO)
+        conexao = conectar(CAMINHO_BANCO)
         cursor = conexao.cursor()
         
-        cursor.execute("""
-            INSERT INTO projetos (
-                nome, nome_projeto, responsavel, data_inicio, data_fim,
-                status, prioridade, orcamento, custo_atual, progresso,
-                descricao, categoria, tags, criado_por, criado_em
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            nome, nome, responsavel_cript, data_inicio, data_fim,
-            status, prioridade, orcamento, custo_atual, progresso,
-            descricao, categoria, tags, criado_por, datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        ))
+        # O índice único em nome_projeto impede duplicatas mesmo se outra
+        # origem criar o mesmo projeto entre a verificação e este INSERT
+        novo_id = inserir_projeto_novo(cursor, nome, {
+            "nome": nome,
+            "responsavel": responsavel_cript,
+            "data_inicio": data_inicio,
+            "data_fim": data_fim,
+            "status": status,
+            "prioridade": prioridade,
+            "orcamento": orcamento,
+            "custo_atual": custo_atual,
+            "progresso": progresso,
+            "descricao": descricao,
+            "categoria": categoria,
+            "tags": tags,
+            "criado_por": criado_por,
+            "criado_em": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        })
+        if novo_id is not None:
+            indexar_projetos(cursor, [nome])
         
         conexao.commit()
         conexao.close()
         
+        if novo_id is None:
+            return False, f"Já existe um projeto com o nome '{nome}'"
+        
         return True, f"Projeto '{nome}' criado com sucesso!"
         
     except Exception as e:
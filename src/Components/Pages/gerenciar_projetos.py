@@ -10,6 +10,7 @@ caminho_src = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__
 sys.path.insert(0, caminho_src)
 
 from Readers.criptograph import encriptar_dado, decriptar_dado
+from Database.indice_termos import ORIGEM_PROJETO, garantir_tabelas_indice, indexar_projetos, remover_documento
 
 def render_gerenciar_projetos_page():
     """Página para gestores gerenciarem seus projetos"""
@@ -195,6 +196,7 @@ def atualizar_projeto_db(projeto_id, nome, responsavel, data_inicio, data_fim, s
     try:
         responsavel_cript = encriptar_dado(responsavel)
         conexao = sqlite3.connect(CAMINHO_BANCO)
+        garantir_tabelas_indice(conexao)
         cursor = conexao.cursor()
         
         cursor.execute("""
@@ -205,10 +207,15 @@ def atualizar_projeto_db(projeto_id, nome, responsavel, data_inicio, data_fim, s
             WHERE id = ?
         """, (nome, nome, responsavel_cript, data_inicio, data_fim, status, prioridade,
               orcamento, custo_atual, progresso, descricao, categoria, tags, projeto_id))
+        # Texto editado: reindexa na mesma transação (palavras-chave por TF-IDF)
+        indexar_projetos(cursor, [nome])
         
         conexao.commit()
         conexao.close()
         return True, f"Projeto '{nome}' atualizado!"
+    except sqlite3.IntegrityError:
+        # Índice único em nome_projeto: renomear para um nome já usado
+        return False, f"Já existe um projeto com o nome '{nome}'"
     except Exception as e:
         return False, f"Erro: {str(e)}"
 
@@ -218,10 +225,12 @@ def excluir_projeto_db(projeto_id: int):
     CAMINHO_BANCO = os.path.join("data", "projetos_sonae.db")
     try:
         conexao = sqlite3.connect(CAMINHO_BANCO)
+        garantir_tabelas_indice(conexao)
         cursor = conexao.cursor()
         cursor.execute("SELECT nome FROM projetos WHERE id = ?", (projeto_id,))
         nome = cursor.fetchone()[0]
         cursor.execute("DELETE FROM projetos WHERE id = ?", (projeto_id,))
+        remover_documento(cursor, ORIGEM_PROJETO, projeto_id)
         conexao.commit()
         conexao.close()
         return True, f"Projeto '{nome}' excluído!"
@@ -1,7 +1,6 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-import time
 import sys
 import os
 
@@ -85,6 +84,9 @@ def render_custom_summary_page():
                 incluir_graficos
             )
     
+    # Relatórios na fila / em geração deste usuário
+    _render_fila_relatorios()
+    
     # Exibir relatório se existe um no session_state
     if st.session_state.relatorio_atual is not None:
         _exibir_resultados(
@@ -95,7 +97,10 @@ def render_custom_summary_page():
             st.session_state.relatorio_atual['insights'],
             st.session_state.relatorio_atual['alertas'],
             st.session_state.relatorio_atual['prompt'],
-            st.session_state.relatorio_atual.get('dados_graficos')
+            st.session_state.relatorio_atual.get('dados_graficos'),
+            st.session_state.relatorio_atual.get('relatorio_id'),
+            st.session_state.relatorio_atual.get('nome_relatorio'),
+            st.session_state.relatorio_atual.get('tags')
         )
     
     # Seção de histórico
@@ -156,127 +161,183 @@ def render_custom_summary_page():
         else:
             st.info("Nenhum relatório salvo ainda. Gere e salve seu primeiro relatório!")
 
+def _usuario_fila():
+    """Chave do usuário na fila: o ID do login ou, sem login, um ID da sessão."""
+    if st.session_state.get('user_id') is not None:
+        return str(st.session_state.user_id)
+    if 'id_sessao_relatorios' not in st.session_state:
+        import uuid
+        st.session_state.id_sessao_relatorios = f"sessao-{uuid.uuid4().hex}"
+    return st.session_state.id_sessao_relatorios
+
+
 def _process_file(uploaded_file, prompt_personalizado, tamanho_resumo, incluir_insights, incluir_alertas, incluir_graficos=False):
-    """Processa o arquivo e exibe relatório executivo com IA"""
+    """Extrai o conteúdo e envia o relatório para a fila de geração (não bloqueia a sessão)"""
+    from AI.fila_relatorios import obter_fila
+    
+    with st.spinner("Extraindo conteúdo do arquivo..."):
+        conteudo = _extrair_conteudo_arquivo(uploaded_file)
+    if not conteudo:
+        st.error("Não foi possível extrair conteúdo do arquivo")
+        return
     
-    # Carregar modelo IA
-    with st.spinner("Carregando modelo de IA (primeira vez pode demorar alguns minutos)..."):
+    # Validar tamanho
+    if len(conteudo.strip()) < 50:
+        st.error("Arquivo muito pequeno para análise executiva (mínimo 50 caracteres)")
+        return
+    
+    try:
+        job_id = obter_fila().enviar(
+            usuario=_usuario_fila(),
+            conteudo=conteudo,
+            nome_arquivo=uploaded_file.name,
+            tamanho=tamanho_resumo,
+            prompt_personalizado=prompt_personalizado,
+            incluir_graficos=incluir_graficos,
+            user_id=st.session_state.get('user_id')
+        )
+    except Exception as e:
+        st.error(f"Erro ao enviar relatório para a fila: {e}")
+        return
+    
+    # Opções que só a página usa para exibir o resultado
+    st.session_state.job_relatorio_atual = {
+        'id': job_id,
+        'insights': incluir_insights,
+        'alertas': incluir_alertas
+    }
+    st.session_state.relatorio_atual = None
+    st.success("Relatório enviado para a fila! Você pode acompanhar o progresso abaixo ou sair da página e voltar depois.")
+
+
+def _abrir_relatorio_do_job(job_id, opcoes=None):
+    """Carrega no session_state o relatório salvo por um job concluído."""
+    from Database import jobs_relatorios
+    
+    conexao = jobs_relatorios.conectar()
+    try:
+        job = jobs_relatorios.buscar_job(conexao, job_id)
+    finally:
+        conexao.close()
+    if not job or not job['relatorio_id']:
+        return False
+    
+    relatorio = RelatoriosDB().buscar_relatorio_por_id(job['relatorio_id'])
+    if not relatorio:
+        return False
+    
+    opcoes = opcoes or {}
+    st.session_state.relatorio_atual = {
+        'nome_arquivo': job['nome_arquivo'] or "documento",
+        'relatorio': relatorio['conteudo_relatorio'],
+        'conteudo_original': job['conteudo'],
+        'tamanho': job['tamanho'],
+        'insights': opcoes.get('insights', True),
+        'alertas': opcoes.get('alertas', True),
+        'prompt': job['prompt_personalizado'] or "",
+        'dados_graficos': None,
+        'relatorio_id': job['relatorio_id'],
+        'nome_relatorio': relatorio['nome_relatorio'],
+        'tags': relatorio['tags']
+    }
+    return True
+
+
+def _render_fila_relatorios():
+    """Mostra os relatórios do usuário na fila/em geração; atualiza sozinho enquanto houver ativos."""
+    from Database import jobs_relatorios
+    
+    usuario = _usuario_fila()
+    try:
+        conexao = jobs_relatorios.conectar()
         try:
-            from AI.processador_ia import carregar_modelo, gerar_relatorio_executivo
-            modelo = carregar_modelo()
-            if modelo is None:
-                st.error("Erro ao carregar modelo de IA.")
-                return
-        except Exception as e:
-            st.error(f"Erro ao carregar modelo: {e}")
-            import traceback
-            st.code(traceback.format_exc())
-            return
+            jobs_relatorios.garantir_tabela_jobs(conexao)
+            jobs = jobs_relatorios.listar_jobs_usuario(conexao, usuario, limite=5)
+        finally:
+            conexao.close()
+    except Exception as e:
+        st.error(f"Erro ao consultar a fila de relatórios: {e}")
+        return
     
-    # Processar arquivo
-    with st.spinner("Analisando arquivo e gerando relatório executivo..."):
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
+    ativos = any(job['status'] in jobs_relatorios.STATUS_ATIVOS for job in jobs)
+    
+    # Enquanto houver job ativo, só este bloco é reexecutado a cada segundo (mostra o texto gerado até agora)
+    @st.fragment(run_every=1 if ativos else None)
+    def _painel():
+        conexao = jobs_relatorios.conectar()
         try:
-            # Etapas de processamento
-            status_text.text("Extraindo conteúdo do arquivo...")
-            progress_bar.progress(20)
-            time.sleep(0.3)
-            
-            # Ler conteúdo do arquivo
-            conteudo = _extrair_conteudo_arquivo(uploaded_file)
-            if not conteudo:
-                st.error("Não foi possível extrair conteúdo do arquivo")
-                return
-            
-            status_text.text("Analisando conteúdo com IA...")
-            progress_bar.progress(40)
-            time.sleep(0.3)
-            
-            # Validar tamanho
-            if len(conteudo.strip()) < 50:
-                st.error("Arquivo muito pequeno para análise executiva (mínimo 50 caracteres)")
-                return
-            
-            status_text.text("Gerando relatório executivo...")
-            progress_bar.progress(60)
-            
-            # Gerar relatório usando FLAN-T5
-            resultado = gerar_relatorio_executivo(
-                modelo, 
-                conteudo, 
-                tamanho_resumo,
-                prompt_personalizado,
-                incluir_graficos
-            )
-            
-            if not resultado or not resultado.get("texto"):
-                st.error("Erro ao gerar relatório")
-                return
-            
-            status_text.text("Finalizando formatação...")
-            progress_bar.progress(90)
-            time.sleep(0.3)
-            
-            progress_bar.progress(100)
-            status_text.empty()
-            
-            # Salvar no session_state para persistir
-            st.session_state.relatorio_atual = {
-                'nome_arquivo': uploaded_file.name,
-                'relatorio': resultado["texto"],
-                'conteudo_original': conteudo,
-                'tamanho': tamanho_resumo,
-                'insights': incluir_insights,
-                'alertas': incluir_alertas,
-                'prompt': prompt_personalizado,
-                'dados_graficos': resultado.get("dados_graficos")
+            jobs_atuais = jobs_relatorios.listar_jobs_usuario(conexao, usuario, limite=5)
+            posicoes = {
+                job['id']: jobs_relatorios.posicao_na_fila(conexao, job['id'])
+                for job in jobs_atuais if job['status'] == jobs_relatorios.STATUS_NA_FILA
             }
+        finally:
+            conexao.close()
+        
+        if not jobs_atuais:
+            return
+        
+        st.subheader("Seus Relatórios em Processamento")
+        job_acompanhado = st.session_state.get('job_relatorio_atual') or {}
+        
+        for job in jobs_atuais:
+            titulo = f"**{job['nome_arquivo'] or 'Documento'}** ({job['tamanho']})"
+            status = job['status']
             
-            # Recarregar para mostrar o relatório
-            st.rerun()
+            if status == jobs_relatorios.STATUS_NA_FILA:
+                st.markdown(f"{titulo} - na fila (posição {posicoes.get(job['id'], 0) + 1})")
+                st.progress(0)
+            elif status == jobs_relatorios.STATUS_EXECUTANDO:
+                st.markdown(f"{titulo} - {job['etapa']}")
+                st.progress(min(max(job['progresso'], 0), 100))
+                if job.get('texto_parcial'):
+                    with st.container(border=True):
+                        st.markdown(job['texto_parcial'] + " ▌")
+            elif status == jobs_relatorios.STATUS_CONCLUIDO:
+                st.markdown(f"{titulo} - concluído e salvo no histórico")
+                if job['id'] == job_acompanhado.get('id') and st.session_state.get('relatorio_atual') is None:
+                    # O relatório que esta sessão pediu ficou pronto: exibe sem clique
+                    if _abrir_relatorio_do_job(job['id'], job_acompanhado):
+                        st.session_state.job_relatorio_atual = None
+                        st.rerun()
+                elif st.button("Abrir relatório", key=f"abrir_job_{job['id']}"):
+                    if _abrir_relatorio_do_job(job['id']):
+                        st.rerun()
+            elif status == jobs_relatorios.STATUS_ERRO:
+                st.markdown(f"{titulo} - erro: {job['erro']}")
+            else:
+                st.markdown(f"{titulo} - cancelado")
             
-        except Exception as e:
-            st.error(f"Erro ao processar arquivo: {e}")
-            import traceback
-            st.code(traceback.format_exc())
-            progress_bar.empty()
-            status_text.empty()
+            if status in jobs_relatorios.STATUS_ATIVOS:
+                if st.button("Cancelar", key=f"cancelar_job_{job['id']}"):
+                    from AI.fila_relatorios import obter_fila
+                    obter_fila().cancelar(job['id'], usuario)
+                    st.rerun()
+        
+        # Ficou sem jobs ativos: rerun completo para parar a atualização automática
+        if ativos and not any(j['status'] in jobs_relatorios.STATUS_ATIVOS for j in jobs_atuais):
+            st.rerun()
+    
+    _painel()
+    
+    # Garante que a fila esteja rodando (ex: jobs pendentes de antes de um reinício)
+    if ativos:
+        from AI.fila_relatorios import obter_fila
+        obter_fila()
+
 
 def _extrair_conteudo_arquivo(arquivo):
-    """Extrai conteúdo do arquivo baseado no tipo"""
-    tipo = arquivo.name.split('.')[-1].lower()
+    """Extrai conteúdo do arquivo baseado no tipo (direto do buffer do upload)"""
+    from Readers.extracao_documentos import extrair_texto_documento
     
     try:
-        if tipo == 'pdf':
-            import fitz
-            pdf_bytes = arquivo.read()
-            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-            texto = ""
-            for pagina in doc:
-                texto += pagina.get_text()
-            return texto
-            
-        elif tipo in ['docx', 'doc']:
-            from docx import Document
-            import io
-            doc = Document(io.BytesIO(arquivo.read()))
-            texto = "\n".join([p.text for p in doc.paragraphs])
-            return texto
-            
-        elif tipo in ['xlsx', 'xls']:
-            import pandas as pd
-            import io
-            df = pd.read_excel(io.BytesIO(arquivo.read()))
-            texto = df.to_string()
-            return texto
-            
+        return extrair_texto_documento(arquivo)
+        
     except Exception as e:
         st.error(f"Erro ao extrair conteúdo: {e}")
         return None
 
-def _exibir_resultados(nome_arquivo, relatorio, conteudo_original, tamanho, insights, alertas, prompt, dados_graficos=None):
+def _exibir_resultados(nome_arquivo, relatorio, conteudo_original, tamanho, insights, alertas, prompt, dados_graficos=None, relatorio_id=None, nome_salvo=None, tags_salvas=None):
     """Exibe os resultados do relatório executivo"""
     st.success("Relatório executivo gerado com sucesso!")
     
@@ -479,14 +540,18 @@ def _exibir_resultados(nome_arquivo, relatorio, conteudo_original, tamanho, insi
     with col_save1:
         nome_relatorio = st.text_input(
             "Nome para salvar",
-            value=f"Relatorio_{nome_arquivo.split('.')[0]}",
+            value=nome_salvo or f"Relatorio_{nome_arquivo.split('.')[0]}",
             key=f"nome_save_{id(nome_arquivo)}"
         )
     
     with col_save2:
+        # Tags sugeridas pela fila (TF-IDF) entram como opções já selecionadas
+        tags_sugeridas = [t.strip() for t in (tags_salvas or "").split(",") if t.strip()]
+        opcoes_tags = ["Urgente", "Projeto", "Relatório", "Análise", "Documentação", "Financeiro", "Estratégico"]
         tags = st.multiselect(
             "Tags (opcional)",
-            options=["Urgente", "Projeto", "Relatório", "Análise", "Documentação", "Financeiro", "Estratégico"],
+            options=opcoes_tags + [t for t in tags_sugeridas if t not in opcoes_tags],
+            default=tags_sugeridas,
             key=f"tags_save_{id(nome_arquivo)}"
         )
     
@@ -494,7 +559,13 @@ def _exibir_resultados(nome_arquivo, relatorio, conteudo_original, tamanho, insi
     
     with col_btn_save:
         if st.button("Salvar no Histórico", use_container_width=True, type="primary", key=f"btn_salvar_{id(nome_arquivo)}"):
-            if nome_relatorio.strip():
+            if nome_relatorio.strip() and relatorio_id is not None:
+                # Gerado pela fila: já está no histórico, só renomeia e aplica as tags
+                if RelatoriosDB().atualizar_relatorio(relatorio_id, nome_relatorio, tags):
+                    st.success(f"Relatório '{nome_relatorio}' atualizado no histórico!")
+                else:
+                    st.error("Erro ao atualizar relatório no banco de dados")
+            elif nome_relatorio.strip():
                 db = RelatoriosDB()
                 sucesso = db.salvar_relatorio(
                     nome_relatorio=nome_relatorio,
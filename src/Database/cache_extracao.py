@@ -0,0 +1,87 @@
+"""
+Cache persistente do texto extraído de documentos, endereçado pelo conteúdo.
+
+A chave é o sha256 dos bytes do arquivo + tipo + versão do extrator: o mesmo
+arquivo enviado de novo (com qualquer nome) não é lido outra vez, e mudar a
+versão do extrator invalida as entradas antigas sem precisar apagar nada.
+
+O cache fica num banco SQLite separado (data/cache_extracao.db) e tem limite
+de tamanho: quando o total de texto passa do limite, as entradas usadas há
+mais tempo saem primeiro (LRU). Acertos e falhas são contados no próprio banco.
+A parte comum com o cache de geração fica em Database/cache_lru.py.
+
+Uso:
+    python src/Database/cache_extracao.py           # mostra as estatísticas
+    python src/Database/cache_extracao.py --limpar  # apaga todas as entradas
+"""
+import hashlib
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Database.cache_lru import CacheLRU, executar_linha_comando
+
+CAMINHO_CACHE = "data/cache_extracao.db"
+
+# Limite do total de texto guardado (em bytes UTF-8)
+TAMANHO_MAXIMO_CACHE = 256 * 1024 * 1024
+
+# Documentos com mais texto que isto não entram no cache (não acumula o texto em memória)
+TAMANHO_MAXIMO_ENTRADA = 32 * 1024 * 1024
+
+TAMANHO_BLOCO_HASH = 1024 * 1024
+
+
+def sha256_do_arquivo(arquivo):
+    """
+    Calcula o sha256 de um caminho, bytes ou objeto tipo arquivo.
+
+    Buffers em memória (BytesIO, UploadedFile) são lidos sem cópia via getbuffer().
+    """
+    sha = hashlib.sha256()
+    if isinstance(arquivo, (bytes, bytearray, memoryview)):
+        sha.update(arquivo)
+    elif hasattr(arquivo, "getbuffer"):
+        sha.update(arquivo.getbuffer())
+    elif hasattr(arquivo, "read"):
+        arquivo.seek(0)
+        for bloco in iter(lambda: arquivo.read(TAMANHO_BLOCO_HASH), b""):
+            sha.update(bloco)
+        arquivo.seek(0)
+    else:
+        with open(arquivo, "rb") as entrada:
+            for bloco in iter(lambda: entrada.read(TAMANHO_BLOCO_HASH), b""):
+                sha.update(bloco)
+    return sha.hexdigest()
+
+
+class CacheExtracao(CacheLRU):
+    """Cache LRU em SQLite do texto extraído, com contagem de acertos e falhas"""
+
+    TABELA = "extracoes"
+    COLUNAS = ("sha256", "tipo", "versao")
+    DESCRICAO = "cache de extração"
+
+    def __init__(self, caminho_cache=CAMINHO_CACHE, tamanho_maximo=TAMANHO_MAXIMO_CACHE):
+        super().__init__(caminho_cache, tamanho_maximo)
+
+    @staticmethod
+    def montar_chave(sha256, tipo, versao):
+        return f"{sha256}:{tipo}:{versao}"
+
+    def buscar(self, sha256, tipo, versao):
+        """
+        Procura o texto já extraído deste conteúdo.
+
+        Returns:
+            str com o texto, ou None se não estiver no cache
+        """
+        return self._buscar(self.montar_chave(sha256, tipo, versao))
+
+    def salvar(self, sha256, tipo, versao, texto):
+        """Guarda o texto extraído e remove as entradas menos usadas se passar do limite."""
+        return self._salvar(self.montar_chave(sha256, tipo, versao), (sha256, tipo, versao), texto)
+
+
+if __name__ == "__main__":
+    executar_linha_comando(CacheExtracao(), sys.argv)
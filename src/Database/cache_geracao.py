@@ -0,0 +1,80 @@
+"""
+Cache persistente de relatórios gerados pelo modelo.
+
+Só é usado no modo determinístico (geração greedy): com a mesma entrada, o
+modelo produz sempre a mesma saída, então um pedido idêntico - mesmo de outro
+usuário - pode devolver o relatório guardado sem rodar o modelo de novo.
+
+A chave é o sha256 de tudo que influencia a saída: hash do conteúdo, tamanho,
+prompt personalizado, identificador do modelo (nome + backend) e parâmetros
+de geração. Mudar qualquer um deles gera uma chave nova.
+
+Como o cache de extração, fica num banco SQLite separado
+(data/cache_geracao.db) com limite de tamanho e despejo LRU (Database/cache_lru.py).
+
+Uso:
+    python src/Database/cache_geracao.py           # mostra as estatísticas
+    python src/Database/cache_geracao.py --limpar  # apaga todas as entradas
+"""
+import hashlib
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Database.cache_lru import CacheLRU, executar_linha_comando
+
+CAMINHO_CACHE = "data/cache_geracao.db"
+
+# Limite do total de texto guardado (em bytes UTF-8)
+TAMANHO_MAXIMO_CACHE = 64 * 1024 * 1024
+
+
+def montar_chave(conteudo, tamanho, prompt_personalizado, modelo_id, parametros):
+    """
+    Chave do cache para um pedido de geração.
+
+    Args:
+        conteudo: Texto completo do documento (entra só o hash)
+        tamanho: Nível de detalhe
+        prompt_personalizado: Instruções do usuário
+        modelo_id: Nome do modelo + backend
+        parametros: dict com os parâmetros de geração
+
+    Returns:
+        str: sha256 hexadecimal
+    """
+    sha_conteudo = hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+    pedido = json.dumps(
+        [sha_conteudo, tamanho, prompt_personalizado or "", modelo_id, parametros],
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(pedido.encode("utf-8")).hexdigest()
+
+
+class CacheGeracao(CacheLRU):
+    """Cache LRU em SQLite de relatórios gerados, com contagem de acertos e falhas"""
+
+    TABELA = "geracoes"
+    COLUNAS = ("modelo",)
+    DESCRICAO = "cache de geração"
+
+    def __init__(self, caminho_cache=CAMINHO_CACHE, tamanho_maximo=TAMANHO_MAXIMO_CACHE):
+        super().__init__(caminho_cache, tamanho_maximo)
+
+    def buscar(self, chave):
+        """
+        Procura um relatório já gerado para esta chave.
+
+        Returns:
+            str com o relatório, ou None se não estiver no cache
+        """
+        return self._buscar(chave)
+
+    def salvar(self, chave, modelo_id, texto):
+        """Guarda o relatório e remove as entradas menos usadas se passar do limite."""
+        return self._salvar(chave, (modelo_id,), texto)
+
+
+if __name__ == "__main__":
+    executar_linha_comando(CacheGeracao(), sys.argv)
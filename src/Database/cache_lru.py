@@ -0,0 +1,200 @@
+"""
+Base dos caches persistentes de texto (extração de documentos e geração de relatórios).
+
+Cada cache fica numa tabela SQLite própria com a chave, as colunas de
+identificação do cache, o texto e o tamanho em bytes. Aqui ficam a parte comum:
+
+- busca que atualiza o último acesso e conta acertos/falhas
+- gravação com UPSERT pela chave
+- limite de tamanho: passando do limite, as entradas usadas há mais tempo saem
+  primeiro (LRU)
+- estatísticas, limpeza e o resumo impresso pelos scripts
+
+As subclasses definem TABELA, COLUNAS (colunas de identificação, em ordem),
+DESCRICAO (usada nas mensagens) e a forma de montar a chave.
+"""
+import sqlite3
+import time
+from datetime import datetime
+
+
+class CacheLRU:
+    """Cache LRU em SQLite de textos, com contagem de acertos e falhas"""
+
+    TABELA = None
+    COLUNAS = ()
+    DESCRICAO = "cache"
+
+    def __init__(self, caminho_cache, tamanho_maximo):
+        self.caminho_cache = caminho_cache
+        self.tamanho_maximo = tamanho_maximo
+        self._garantir_tabelas()
+
+    def _conectar(self):
+        # timeout: sessões do Streamlit e trabalhadores da fila podem gravar ao mesmo tempo
+        return sqlite3.connect(self.caminho_cache, timeout=30)
+
+    def _garantir_tabelas(self):
+        colunas = "".join(f"{coluna} TEXT NOT NULL,\n" for coluna in self.COLUNAS)
+        conexao = self._conectar()
+        try:
+            conexao.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.TABELA} (
+                    chave TEXT PRIMARY KEY,
+                    {colunas}
+                    texto TEXT NOT NULL,
+                    tamanho INTEGER NOT NULL,
+                    ultimo_acesso REAL NOT NULL,
+                    criado_em TEXT NOT NULL
+                )
+            """)
+            conexao.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{self.TABELA}_ultimo_acesso ON {self.TABELA}(ultimo_acesso)"
+            )
+            conexao.execute("""
+                CREATE TABLE IF NOT EXISTS estatisticas_cache (
+                    nome TEXT PRIMARY KEY,
+                    valor INTEGER NOT NULL
+                )
+            """)
+            conexao.execute("""
+                INSERT OR IGNORE INTO estatisticas_cache (nome, valor)
+                VALUES ('acertos', 0), ('falhas', 0)
+            """)
+            conexao.commit()
+        finally:
+            conexao.close()
+
+    def _buscar(self, chave):
+        """
+        Procura o texto guardado nesta chave.
+
+        Returns:
+            str com o texto, ou None se não estiver no cache
+        """
+        conexao = None
+        try:
+            conexao = self._conectar()
+            cursor = conexao.cursor()
+            cursor.execute(f"""
+                UPDATE {self.TABELA} SET ultimo_acesso = ? WHERE chave = ?
+                RETURNING texto
+            """, (time.time(), chave))
+            linha = cursor.fetchone()
+            contador = "acertos" if linha else "falhas"
+            cursor.execute(
+                "UPDATE estatisticas_cache SET valor = valor + 1 WHERE nome = ?", (contador,)
+            )
+            conexao.commit()
+            return linha[0] if linha else None
+
+        except Exception as e:
+            print(f"Erro ao consultar {self.DESCRICAO}: {e}")
+            return None
+
+        finally:
+            if conexao:
+                conexao.close()
+
+    def _salvar(self, chave, valores, texto):
+        """
+        Guarda o texto e remove as entradas menos usadas se passar do limite.
+
+        Args:
+            valores: valores das COLUNAS, na mesma ordem
+        """
+        tamanho = len(texto.encode("utf-8"))
+        if tamanho > self.tamanho_maximo:
+            return False
+
+        colunas = ", ".join(("chave",) + tuple(self.COLUNAS) + ("texto", "tamanho", "ultimo_acesso", "criado_em"))
+        marcadores = ", ".join(["?"] * (len(self.COLUNAS) + 5))
+        conexao = None
+        try:
+            conexao = self._conectar()
+            cursor = conexao.cursor()
+            cursor.execute(f"""
+                INSERT INTO {self.TABELA} ({colunas})
+                VALUES ({marcadores})
+                ON CONFLICT(chave) DO UPDATE SET
+                    texto = excluded.texto, tamanho = excluded.tamanho,
+                    ultimo_acesso = excluded.ultimo_acesso
+            """, (
+                chave, *valores, texto, tamanho, time.time(),
+                datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+            ))
+            self._despejar(cursor)
+            conexao.commit()
+            return True
+
+        except Exception as e:
+            print(f"Erro ao gravar {self.DESCRICAO}: {e}")
+            if conexao:
+                conexao.rollback()
+            return False
+
+        finally:
+            if conexao:
+                conexao.close()
+
+    def _despejar(self, cursor):
+        """Remove as entradas com acesso mais antigo até o total caber no limite."""
+        cursor.execute(f"SELECT COALESCE(SUM(tamanho), 0) FROM {self.TABELA}")
+        excesso = cursor.fetchone()[0] - self.tamanho_maximo
+        if excesso <= 0:
+            return
+
+        remover = []
+        for chave, tamanho in cursor.execute(
+                f"SELECT chave, tamanho FROM {self.TABELA} ORDER BY ultimo_acesso").fetchall():
+            if excesso <= 0:
+                break
+            remover.append((chave,))
+            excesso -= tamanho
+        cursor.executemany(f"DELETE FROM {self.TABELA} WHERE chave = ?", remover)
+
+    def estatisticas(self):
+        """
+        Returns:
+            dict com acertos, falhas, taxa_acerto, entradas e bytes
+        """
+        conexao = self._conectar()
+        try:
+            contadores = dict(conexao.execute("SELECT nome, valor FROM estatisticas_cache"))
+            entradas, total_bytes = conexao.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM {self.TABELA}"
+            ).fetchone()
+        finally:
+            conexao.close()
+
+        acertos = contadores.get("acertos", 0)
+        falhas = contadores.get("falhas", 0)
+        consultas = acertos + falhas
+        return {
+            "acertos": acertos,
+            "falhas": falhas,
+            "taxa_acerto": acertos / consultas if consultas else 0.0,
+            "entradas": entradas,
+            "bytes": total_bytes
+        }
+
+    def limpar(self):
+        """Apaga todas as entradas e zera os contadores."""
+        conexao = self._conectar()
+        try:
+            conexao.execute(f"DELETE FROM {self.TABELA}")
+            conexao.execute("UPDATE estatisticas_cache SET valor = 0")
+            conexao.commit()
+        finally:
+            conexao.close()
+
+
+def executar_linha_comando(cache, argv):
+    """Uso dos scripts dos caches: mostra as estatísticas e, com --limpar, apaga as entradas antes."""
+    if "--limpar" in argv:
+        cache.limpar()
+        print(f"{cache.DESCRICAO[0].upper()}{cache.DESCRICAO[1:]} apagado.")
+    estatisticas = cache.estatisticas()
+    print(f"Entradas: {estatisticas['entradas']} ({estatisticas['bytes'] / 1024 / 1024:.1f} MB)")
+    print(f"Acertos: {estatisticas['acertos']}  Falhas: {estatisticas['falhas']}  "
+          f"Taxa de acerto: {estatisticas['taxa_acerto']:.0%}")
@@ -0,0 +1,59 @@
+import sqlite3
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Database.upsert_projetos import garantir_indice_nome_projeto
+from Database.indice_termos import ORIGEM_PROJETO, garantir_tabelas_indice, remover_documento
+
+CAMINHO_BANCO = "data/projetos_sonae.db"
+
+def criar_indice_projetos():
+    """
+    Cria o índice único em projetos.nome_projeto usado pelo UPSERT dos leitores.
+
+    Se já existirem nomes duplicados, mantém o registro mais antigo (menor ID),
+    que é o que os leitores vinham atualizando, e remove os demais.
+    """
+    conexao = None
+    try:
+        conexao = sqlite3.connect(CAMINHO_BANCO)
+        cursor = conexao.cursor()
+
+        cursor.execute("""
+            SELECT nome_projeto, COUNT(*) FROM projetos
+            GROUP BY nome_projeto HAVING COUNT(*) > 1
+        """)
+        duplicados = cursor.fetchall()
+
+        for nome, quantidade in duplicados:
+            print(f"⚠️  '{nome}' aparece {quantidade} vezes - mantendo o registro mais antigo")
+
+        if duplicados:
+            cursor.execute("""
+                SELECT id FROM projetos
+                WHERE id NOT IN (SELECT MIN(id) FROM projetos GROUP BY nome_projeto)
+            """)
+            ids_removidos = [linha[0] for linha in cursor.fetchall()]
+            cursor.executemany("DELETE FROM projetos WHERE id = ?", [(i,) for i in ids_removidos])
+            # Os duplicados também saem do índice de termos (não contam em N nem na frequência)
+            garantir_tabelas_indice(conexao)
+            for projeto_id in ids_removidos:
+                remover_documento(cursor, ORIGEM_PROJETO, projeto_id)
+            print(f"🗑️  {len(ids_removidos)} registros duplicados removidos")
+
+        garantir_indice_nome_projeto(conexao)
+        conexao.commit()
+        print("✅ Índice único 'idx_projetos_nome_projeto' pronto!")
+
+    except Exception as e:
+        print(f"❌ Erro ao criar índice: {e}")
+        if conexao:
+            conexao.rollback()
+        raise
+    finally:
+        if conexao:
+            conexao.close()
+
+if __name__ == "__main__":
+    criar_indice_projetos()
@@ -0,0 +1,295 @@
+"""
+Índice de termos do corpus (projetos e relatórios salvos) para palavras-chave por TF-IDF.
+
+As palavras-chave eram a contagem de palavras capitalizadas do próprio
+documento: termos que aparecem em quase todo relatório (nomes da empresa,
+"Operações", "Equipe") ganhavam dos termos que de fato distinguem o documento.
+Aqui cada documento indexado guarda seus termos e quantas vezes aparecem, e a
+frequência de documentos (em quantos documentos cada termo aparece) fica numa
+tabela própria. As palavras-chave de um texto novo são os seus termos ordenados
+por TF-IDF: frequência no texto x raridade no corpus, com uma consulta só aos
+termos do texto.
+
+O índice é incremental: ao gravar um projeto ou relatório, só os termos que
+entraram ou saíram do documento mudam a frequência de documentos, e documentos
+com o mesmo texto (mesmo sha256) nem são processados.
+
+Uso:
+    python src/Database/indice_termos.py              # indexa o que falta e mostra as estatísticas
+    python src/Database/indice_termos.py --reconstruir  # apaga e reindexa todo o banco
+"""
+import hashlib
+import math
+import re
+import sqlite3
+import sys
+from collections import Counter
+
+CAMINHO_BANCO = "data/projetos_sonae.db"
+
+ORIGEM_PROJETO = "projeto"
+ORIGEM_RELATORIO = "relatorio"
+
+# Colunas de projetos que formam o texto indexado
+COLUNAS_TEXTO_PROJETO = (
+    "resumo_executivo", "progresso_atual", "principais_desafios",
+    "acoes_corretivas", "perspectiva", "descricao"
+)
+
+# Palavras de 5+ letras (sem dígitos nem sublinhado)
+_RE_TERMO = re.compile(r'\b[^\W\d_]{5,}\b')
+
+STOP_WORDS = frozenset({
+    'de', 'a', 'o', 'que', 'e', 'do', 'da', 'em', 'um', 'para', 'com', 'não', 'uma', 'os', 'no', 'se',
+    'na', 'por', 'mais', 'as', 'dos', 'como', 'mas', 'ao', 'ele', 'das', 'à', 'seu', 'sua', 'ou',
+    'quando', 'muito', 'nos', 'já', 'eu', 'também', 'só', 'pelo', 'pela', 'até', 'isso', 'ela',
+    'entre', 'depois', 'sem', 'mesmo', 'aos', 'ter', 'seus', 'quem', 'nas', 'me', 'esse', 'eles',
+    'você', 'essa', 'num', 'nem', 'suas', 'meu', 'às', 'minha', 'numa', 'pelos', 'elas', 'qual',
+    'nós', 'lhe', 'deles', 'essas', 'esses', 'pelas', 'este', 'dele', 'sido', 'sendo', 'estar',
+    'sobre', 'pode', 'fazer', 'cada', 'outro', 'outra', 'outros', 'outras', 'bem', 'ainda', 'onde',
+    'enquanto', 'antes', 'após', 'todas', 'todos', 'qualquer', 'algum', 'alguma', 'alguns',
+    'algumas', 'nenhum', 'nenhuma', 'mesma', 'mesmos', 'mesmas'
+})
+
+# Termos genéricos de documentos que nunca são palavra-chave
+TERMOS_GENERICOS = frozenset({
+    'documento', 'relatório', 'análise', 'arquivo', 'conteúdo', 'informação', 'dados', 'sistema',
+    'projeto', 'seguinte', 'execução', 'exemplo', 'forma', 'parte', 'através', 'devido', 'conforme',
+    'segundo', 'durante', 'desta', 'deste', 'dessa', 'desse'
+})
+
+# Limite de parâmetros por instrução do SQLite
+_TAMANHO_LOTE_IN = 500
+
+
+def garantir_tabelas_indice(conexao):
+    """Cria (se necessário) as tabelas do índice de termos."""
+    conexao.execute("""
+        CREATE TABLE IF NOT EXISTS documentos_indexados (
+            origem TEXT NOT NULL,
+            documento_id INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            PRIMARY KEY (origem, documento_id)
+        ) WITHOUT ROWID
+    """)
+    conexao.execute("""
+        CREATE TABLE IF NOT EXISTS termos_documentos (
+            origem TEXT NOT NULL,
+            documento_id INTEGER NOT NULL,
+            termo TEXT NOT NULL,
+            frequencia INTEGER NOT NULL,
+            PRIMARY KEY (origem, documento_id, termo)
+        ) WITHOUT ROWID
+    """)
+    conexao.execute("""
+        CREATE TABLE IF NOT EXISTS frequencia_termos (
+            termo TEXT PRIMARY KEY,
+            documentos INTEGER NOT NULL
+        ) WITHOUT ROWID
+    """)
+
+
+def contar_termos(texto):
+    """
+    Termos do texto (minúsculas, 5+ letras, sem stop words e termos genéricos).
+
+    Returns:
+        Counter {termo: ocorrências no texto}
+    """
+    if not texto:
+        return Counter()
+    return Counter(
+        termo for termo in _RE_TERMO.findall(texto.lower())
+        if termo not in STOP_WORDS and termo not in TERMOS_GENERICOS
+    )
+
+
+def _consultar_em_lotes(cursor, sql, valores):
+    """Executa um SELECT ... IN ({}) em lotes e junta as linhas."""
+    linhas = []
+    for inicio in range(0, len(valores), _TAMANHO_LOTE_IN):
+        parte = valores[inicio:inicio + _TAMANHO_LOTE_IN]
+        cursor.execute(sql.format(", ".join(["?"] * len(parte))), parte)
+        linhas.extend(cursor.fetchall())
+    return linhas
+
+
+def _trocar_termos(cursor, origem, documento_id, termos_novos):
+    """Substitui os termos do documento e ajusta a frequência só dos que entraram ou saíram."""
+    cursor.execute(
+        "SELECT termo FROM termos_documentos WHERE origem = ? AND documento_id = ?",
+        (origem, documento_id)
+    )
+    termos_antigos = {termo for termo, in cursor.fetchall()}
+
+    removidos = [(termo,) for termo in termos_antigos - termos_novos.keys()]
+    adicionados = [(termo,) for termo in termos_novos.keys() - termos_antigos]
+    if removidos:
+        cursor.executemany(
+            "UPDATE frequencia_termos SET documentos = documentos - 1 WHERE termo = ?", removidos
+        )
+        cursor.executemany(
+            "DELETE FROM frequencia_termos WHERE termo = ? AND documentos <= 0", removidos
+        )
+    if adicionados:
+        cursor.executemany("""
+            INSERT INTO frequencia_termos (termo, documentos) VALUES (?, 1)
+            ON CONFLICT(termo) DO UPDATE SET documentos = documentos + 1
+        """, adicionados)
+
+    cursor.execute(
+        "DELETE FROM termos_documentos WHERE origem = ? AND documento_id = ?", (origem, documento_id)
+    )
+    cursor.executemany(
+        "INSERT INTO termos_documentos (origem, documento_id, termo, frequencia) VALUES (?, ?, ?, ?)",
+        [(origem, documento_id, termo, frequencia) for termo, frequencia in termos_novos.items()]
+    )
+
+
+def indexar_documento(cursor, origem, documento_id, texto):
+    """
+    Indexa (ou reindexa) um documento.
+
+    Args:
+        cursor: Cursor da conexão (a mesma transação dos dados do documento)
+        origem: ORIGEM_PROJETO ou ORIGEM_RELATORIO
+        documento_id: ID do projeto ou do relatório
+        texto: Texto completo do documento
+
+    Returns:
+        bool: False se o documento já estava indexado com o mesmo texto
+    """
+    sha256 = hashlib.sha256((texto or "").encode("utf-8")).hexdigest()
+    cursor.execute(
+        "SELECT sha256 FROM documentos_indexados WHERE origem = ? AND documento_id = ?",
+        (origem, documento_id)
+    )
+    linha = cursor.fetchone()
+    if linha and linha[0] == sha256:
+        return False
+
+    _trocar_termos(cursor, origem, documento_id, contar_termos(texto))
+    cursor.execute("""
+        INSERT INTO documentos_indexados (origem, documento_id, sha256) VALUES (?, ?, ?)
+        ON CONFLICT(origem, documento_id) DO UPDATE SET sha256 = excluded.sha256
+    """, (origem, documento_id, sha256))
+    return True
+
+
+def remover_documento(cursor, origem, documento_id):
+    """Tira um documento do índice (ex: relatório excluído)."""
+    _trocar_termos(cursor, origem, documento_id, Counter())
+    cursor.execute(
+        "DELETE FROM documentos_indexados WHERE origem = ? AND documento_id = ?", (origem, documento_id)
+    )
+
+
+def texto_projeto(linha):
+    """Texto indexado de um projeto a partir das colunas de COLUNAS_TEXTO_PROJETO."""
+    return "\n".join(valor for valor in linha if valor)
+
+
+def indexar_projetos(cursor, nomes_projeto):
+    """
+    Indexa os projetos recém-gravados (chamado pelos leitores depois do UPSERT).
+
+    Returns:
+        int: número de projetos cujo texto mudou
+    """
+    linhas = _consultar_em_lotes(
+        cursor,
+        f"SELECT id, {', '.join(COLUNAS_TEXTO_PROJETO)} FROM projetos WHERE nome_projeto IN ({{}})",
+        list(nomes_projeto)
+    )
+    return sum(
+        indexar_documento(cursor, ORIGEM_PROJETO, projeto_id, texto_projeto(textos))
+        for projeto_id, *textos in linhas
+    )
+
+
+def palavras_chave(cursor, texto, quantidade=10):
+    """
+    Termos do texto ordenados por TF-IDF em relação ao corpus indexado.
+
+    tf = 1 + log(ocorrências no texto); idf = log((1 + N) / (1 + df)) + 1,
+    com N documentos no índice e df documentos que contêm o termo. Com o
+    índice vazio, a ordem é a da frequência no texto.
+
+    Returns:
+        list de tuplas (termo, pontuação), da maior para a menor pontuação
+    """
+    termos = contar_termos(texto)
+    if not termos:
+        return []
+
+    cursor.execute("SELECT COUNT(*) FROM documentos_indexados")
+    total_documentos = cursor.fetchone()[0]
+    frequencias = dict(_consultar_em_lotes(
+        cursor, "SELECT termo, documentos FROM frequencia_termos WHERE termo IN ({})", list(termos)
+    ))
+
+    pontuacoes = []
+    for termo, ocorrencias in termos.items():
+        idf = math.log((1 + total_documentos) / (1 + frequencias.get(termo, 0))) + 1
+        pontuacoes.append((termo, (1 + math.log(ocorrencias)) * idf))
+    pontuacoes.sort(key=lambda item: (-item[1], item[0]))
+    return pontuacoes[:quantidade]
+
+
+def indexar_banco(conexao, reconstruir=False):
+    """
+    Indexa todos os projetos e relatórios salvos do banco.
+
+    Só documentos novos ou com texto alterado são processados, e os que não
+    existem mais saem do índice. Com reconstruir=True o índice é apagado antes.
+
+    Returns:
+        dict com projetos, relatorios (documentos reindexados) e removidos
+    """
+    garantir_tabelas_indice(conexao)
+    cursor = conexao.cursor()
+    if reconstruir:
+        for tabela in ("documentos_indexados", "termos_documentos", "frequencia_termos"):
+            cursor.execute(f"DELETE FROM {tabela}")
+
+    estatisticas = {"projetos": 0, "relatorios": 0, "removidos": 0}
+    cursor.execute(f"SELECT id, {', '.join(COLUNAS_TEXTO_PROJETO)} FROM projetos")
+    existentes = {ORIGEM_PROJETO: set(), ORIGEM_RELATORIO: set()}
+    for projeto_id, *textos in cursor.fetchall():
+        existentes[ORIGEM_PROJETO].add(projeto_id)
+        estatisticas["projetos"] += indexar_documento(
+            cursor, ORIGEM_PROJETO, projeto_id, texto_projeto(textos)
+        )
+
+    try:
+        cursor.execute("SELECT id, conteudo_relatorio FROM relatorios_salvos")
+        relatorios = cursor.fetchall()
+    except sqlite3.OperationalError:
+        # Banco sem a tabela de relatórios (criar_tabela_relatorios.py não rodou)
+        relatorios = []
+    for relatorio_id, conteudo in relatorios:
+        existentes[ORIGEM_RELATORIO].add(relatorio_id)
+        estatisticas["relatorios"] += indexar_documento(cursor, ORIGEM_RELATORIO, relatorio_id, conteudo)
+
+    cursor.execute("SELECT origem, documento_id FROM documentos_indexados")
+    for origem, documento_id in cursor.fetchall():
+        if documento_id not in existentes.get(origem, ()):
+            remover_documento(cursor, origem, documento_id)
+            estatisticas["removidos"] += 1
+
+    conexao.commit()
+    return estatisticas
+
+
+if __name__ == "__main__":
+    conexao = sqlite3.connect(CAMINHO_BANCO)
+    try:
+        estatisticas = indexar_banco(conexao, reconstruir="--reconstruir" in sys.argv)
+        print(f"Indexados: {estatisticas['projetos']} projetos, {estatisticas['relatorios']} relatórios "
+              f"({estatisticas['removidos']} removidos do índice).")
+        documentos, termos = conexao.execute(
+            "SELECT (SELECT COUNT(*) FROM documentos_indexados), (SELECT COUNT(*) FROM frequencia_termos)"
+        ).fetchone()
+        print(f"Índice: {documentos} documentos, {termos} termos distintos.")
+    finally:
+        conexao.close()
@@ -0,0 +1,324 @@
+"""
+Tabela de jobs de geração de relatório (fila persistida no SQLite).
+
+Cada pedido de relatório vira uma linha em jobs_relatorios com o texto já
+extraído do documento. Os trabalhadores (AI/fila_relatorios.py) reservam o
+próximo job de forma atômica, gravam a etapa e o progresso enquanto geram,
+e no fim apontam para o relatório salvo em relatorios_salvos.
+
+Status: na_fila -> executando -> concluido | erro | cancelado
+
+Cada job executando guarda o processo dono (host:pid) e o último sinal de vida
+(sinal_em), renovado pelo trabalhador. Ao subir, um processo só devolve para a
+fila os jobs sem sinal recente ou cujo dono, neste host, já morreu; jobs de
+outros processos vivos (outra instância do Streamlit, outro servidor) ficam.
+"""
+import os
+import socket
+import sqlite3
+import time
+
+CAMINHO_BANCO = "data/projetos_sonae.db"
+
+STATUS_NA_FILA = "na_fila"
+STATUS_EXECUTANDO = "executando"
+STATUS_CONCLUIDO = "concluido"
+STATUS_ERRO = "erro"
+STATUS_CANCELADO = "cancelado"
+
+STATUS_ATIVOS = (STATUS_NA_FILA, STATUS_EXECUTANDO)
+
+# Sem renovar o sinal por este tempo, o job executando é considerado abandonado
+JOB_SEM_SINAL_SEGUNDOS = 120
+
+COLUNAS_JOB = [
+    "id", "usuario", "user_id", "status", "etapa", "progresso", "nome_arquivo",
+    "conteudo", "tamanho", "prompt_personalizado", "incluir_graficos",
+    "relatorio_id", "erro", "criado_em", "iniciado_em", "concluido_em", "texto_parcial",
+    "dono", "sinal_em"
+]
+
+# Colunas acrescentadas depois da criação da tabela (bancos antigos não têm)
+COLUNAS_NOVAS = {
+    "texto_parcial": "TEXT",
+    "dono": "TEXT",
+    "sinal_em": "REAL",
+}
+
+
+def conectar(caminho_banco=CAMINHO_BANCO):
+    # Vários trabalhadores e sessões usam a mesma tabela: espera a vez em vez de falhar
+    conexao = sqlite3.connect(caminho_banco, timeout=30)
+    conexao.row_factory = sqlite3.Row
+    return conexao
+
+
+def garantir_tabela_jobs(conexao):
+    """Cria (se necessário) a tabela de jobs e os índices usados pelo agendador."""
+    conexao.execute("""
+        CREATE TABLE IF NOT EXISTS jobs_relatorios (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            usuario TEXT NOT NULL,
+            user_id INTEGER,
+            status TEXT NOT NULL,
+            etapa TEXT,
+            progresso INTEGER NOT NULL DEFAULT 0,
+            nome_arquivo TEXT,
+            conteudo TEXT NOT NULL,
+            tamanho TEXT,
+            prompt_personalizado TEXT,
+            incluir_graficos INTEGER NOT NULL DEFAULT 0,
+            relatorio_id INTEGER,
+            erro TEXT,
+            criado_em REAL NOT NULL,
+            iniciado_em REAL,
+            concluido_em REAL,
+            texto_parcial TEXT,
+            dono TEXT,
+            sinal_em REAL,
+            FOREIGN KEY (relatorio_id) REFERENCES relatorios_salvos(id)
+        )
+    """)
+    # Bancos criados antes do streaming / do registro do dono não têm estas colunas
+    colunas = {linha[1] for linha in conexao.execute("PRAGMA table_info(jobs_relatorios)")}
+    for coluna, tipo in COLUNAS_NOVAS.items():
+        if coluna not in colunas:
+            conexao.execute(f"ALTER TABLE jobs_relatorios ADD COLUMN {coluna} {tipo}")
+    conexao.execute(
+        "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs_relatorios(status, usuario)"
+    )
+    conexao.execute(
+        "CREATE INDEX IF NOT EXISTS idx_jobs_usuario ON jobs_relatorios(usuario, id)"
+    )
+    conexao.commit()
+
+
+def _para_dict(linha):
+    return dict(linha) if linha else None
+
+
+def identificar_processo():
+    """Dono gravado nos jobs reservados por este processo ("host:pid")."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _processo_vivo(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # PermissionError: existe, mas é de outro usuário
+        return True
+    return True
+
+
+def _dono_morto(dono):
+    """True só se o dono é deste host e o pid não existe mais (outros hosts: decide o sinal)."""
+    if not dono or ":" not in dono:
+        return False
+    host, pid = dono.rsplit(":", 1)
+    if host != socket.gethostname() or not pid.isdigit():
+        return False
+    return int(pid) != os.getpid() and not _processo_vivo(int(pid))
+
+
+def inserir_job(conexao, usuario, conteudo, nome_arquivo=None, tamanho=None,
+                prompt_personalizado=None, incluir_graficos=False, user_id=None):
+    """
+    Coloca um pedido de relatório na fila.
+
+    Returns:
+        int: ID do job
+    """
+    cursor = conexao.execute("""
+        INSERT INTO jobs_relatorios
+        (usuario, user_id, status, etapa, progresso, nome_arquivo, conteudo, tamanho,
+         prompt_personalizado, incluir_graficos, criado_em)
+        VALUES (?, ?, ?, 'Na fila', 0, ?, ?, ?, ?, ?, ?)
+    """, (usuario, user_id, STATUS_NA_FILA, nome_arquivo, conteudo, tamanho,
+          prompt_personalizado, int(bool(incluir_graficos)), time.time()))
+    conexao.commit()
+    return cursor.lastrowid
+
+
+def reservar_proximo_job(conexao, max_por_usuario, dono=None):
+    """
+    Reserva atomicamente o próximo job da fila, com justiça entre usuários.
+
+    Ordem de escolha:
+      1. só usuários abaixo do limite de jobs executando (max_por_usuario)
+      2. usuário com menos jobs executando agora
+      3. usuário que começou um job há mais tempo (rodízio)
+      4. job mais antigo desse usuário
+
+    Args:
+        dono: Processo que reserva o job (padrão: identificar_processo())
+
+    Returns:
+        dict com o job reservado (já como 'executando') ou None se não houver
+    """
+    dono = dono or identificar_processo()
+    agora = time.time()
+    conexao.execute("BEGIN IMMEDIATE")
+    try:
+        linha = conexao.execute("""
+            WITH por_usuario AS (
+                SELECT usuario,
+                       SUM(status = 'executando') AS executando,
+                       MAX(iniciado_em) AS ultimo_inicio
+                FROM jobs_relatorios
+                WHERE usuario IN (SELECT usuario FROM jobs_relatorios WHERE status = 'na_fila')
+                GROUP BY usuario
+            )
+            UPDATE jobs_relatorios
+            SET status = 'executando', etapa = 'Iniciando', progresso = 5, iniciado_em = ?,
+                dono = ?, sinal_em = ?
+            WHERE id = (
+                SELECT j.id
+                FROM jobs_relatorios j JOIN por_usuario u ON u.usuario = j.usuario
+                WHERE j.status = 'na_fila' AND u.executando < ?
+                ORDER BY u.executando, COALESCE(u.ultimo_inicio, 0), j.id
+                LIMIT 1
+            )
+            RETURNING *
+        """, (agora, dono, agora, max_por_usuario)).fetchone()
+        conexao.commit()
+        return _para_dict(linha)
+    except Exception:
+        conexao.rollback()
+        raise
+
+
+def atualizar_progresso(conexao, job_id, etapa, progresso):
+    """Grava a etapa atual (lida pela página a cada poucos segundos)."""
+    conexao.execute("""
+        UPDATE jobs_relatorios SET etapa = ?, progresso = ?, sinal_em = ?
+        WHERE id = ? AND status = 'executando'
+    """, (etapa, int(progresso), time.time(), job_id))
+    conexao.commit()
+
+
+def atualizar_texto_parcial(conexao, job_id, texto):
+    """Grava o texto que o modelo já gerou (a página mostra enquanto o job executa)."""
+    conexao.execute("""
+        UPDATE jobs_relatorios SET texto_parcial = ?, sinal_em = ?
+        WHERE id = ? AND status = 'executando'
+    """, (texto, time.time(), job_id))
+    conexao.commit()
+
+
+def concluir_job(conexao, job_id, relatorio_id, etapa="Concluído"):
+    conexao.execute("""
+        UPDATE jobs_relatorios
+        SET status = ?, etapa = ?, progresso = 100, relatorio_id = ?, concluido_em = ?,
+            texto_parcial = NULL
+        WHERE id = ? AND status = 'executando'
+    """, (STATUS_CONCLUIDO, etapa, relatorio_id, time.time(), job_id))
+    conexao.commit()
+
+
+def falhar_job(conexao, job_id, erro):
+    conexao.execute("""
+        UPDATE jobs_relatorios SET status = ?, etapa = 'Erro', erro = ?, concluido_em = ?
+        WHERE id = ? AND status = 'executando'
+    """, (STATUS_ERRO, str(erro), time.time(), job_id))
+    conexao.commit()
+
+
+def cancelar_job(conexao, job_id, usuario):
+    """
+    Cancela um job do usuário que ainda está na fila ou executando.
+
+    Returns:
+        bool: True se o job foi cancelado
+    """
+    cursor = conexao.execute("""
+        UPDATE jobs_relatorios SET status = ?, etapa = 'Cancelado', concluido_em = ?
+        WHERE id = ? AND usuario = ? AND status IN (?, ?)
+    """, (STATUS_CANCELADO, time.time(), job_id, usuario, *STATUS_ATIVOS))
+    conexao.commit()
+    return cursor.rowcount > 0
+
+
+def status_do_job(conexao, job_id):
+    linha = conexao.execute("SELECT status FROM jobs_relatorios WHERE id = ?", (job_id,)).fetchone()
+    return linha["status"] if linha else None
+
+
+def buscar_job(conexao, job_id):
+    return _para_dict(conexao.execute(
+        "SELECT * FROM jobs_relatorios WHERE id = ?", (job_id,)
+    ).fetchone())
+
+
+def listar_jobs_usuario(conexao, usuario, limite=10):
+    """Últimos jobs do usuário, sem o texto do documento (a página só mostra o progresso)."""
+    colunas = ", ".join(c for c in COLUNAS_JOB if c != "conteudo")
+    return [dict(linha) for linha in conexao.execute(f"""
+        SELECT {colunas} FROM jobs_relatorios
+        WHERE usuario = ? ORDER BY id DESC LIMIT ?
+    """, (usuario, limite))]
+
+
+def posicao_na_fila(conexao, job_id):
+    """Quantos jobs na fila foram enviados antes deste (0 = é o próximo)."""
+    linha = conexao.execute("""
+        SELECT COUNT(*) FROM jobs_relatorios
+        WHERE status = 'na_fila' AND id < ?
+    """, (job_id,)).fetchone()
+    return linha[0]
+
+
+def renovar_sinal(conexao, dono=None):
+    """
+    Marca como vivos os jobs executando deste processo.
+
+    Chamado periodicamente pela fila: o modelo pode passar mais de um minuto
+    num generate() sem gravar progresso.
+
+    Returns:
+        int: quantos jobs foram renovados
+    """
+    cursor = conexao.execute("""
+        UPDATE jobs_relatorios SET sinal_em = ?
+        WHERE status = 'executando' AND dono = ?
+    """, (time.time(), dono or identificar_processo()))
+    conexao.commit()
+    return cursor.rowcount
+
+
+def recolocar_jobs_interrompidos(conexao, sem_sinal_segundos=JOB_SEM_SINAL_SEGUNDOS):
+    """
+    Devolve para a fila os jobs executando cujo processo dono caiu.
+
+    Um job é considerado interrompido se não renova o sinal há mais de
+    sem_sinal_segundos (jobs de bancos antigos, sem sinal: conta o início) ou
+    se o dono é um processo deste host que não existe mais. Jobs de processos
+    vivos continuam com eles.
+
+    Returns:
+        int: quantos jobs voltaram para a fila
+    """
+    limite = time.time() - sem_sinal_segundos
+    conexao.execute("BEGIN IMMEDIATE")
+    try:
+        interrompidos = [
+            (linha["id"],)
+            for linha in conexao.execute("""
+                SELECT id, dono, COALESCE(sinal_em, iniciado_em, 0) AS ultimo_sinal
+                FROM jobs_relatorios WHERE status = 'executando'
+            """)
+            if linha["ultimo_sinal"] < limite or _dono_morto(linha["dono"])
+        ]
+        conexao.executemany("""
+            UPDATE jobs_relatorios
+            SET status = 'na_fila', etapa = 'Na fila (reiniciado)', progresso = 0, iniciado_em = NULL,
+                texto_parcial = NULL, dono = NULL, sinal_em = NULL
+            WHERE id = ? AND status = 'executando'
+        """, interrompidos)
+        conexao.commit()
+        return len(interrompidos)
+    except Exception:
+        conexao.rollback()
+        raise
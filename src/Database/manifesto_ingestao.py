@@ -0,0 +1,57 @@
+import hashlib
+from datetime import datetime
+
+CAMINHO_BANCO = "data/projetos_sonae.db"
+
+TAMANHO_BLOCO_HASH = 1024 * 1024
+
+
+def garantir_tabela_manifesto(conexao):
+    """Cria (se necessário) a tabela que guarda o que já foi ingerido de cada arquivo."""
+    conexao.execute("""
+        CREATE TABLE IF NOT EXISTS arquivos_ingeridos (
+            caminho TEXT PRIMARY KEY,
+            tamanho INTEGER NOT NULL,
+            mtime REAL NOT NULL,
+            sha256 TEXT NOT NULL,
+            data_ingestao TEXT NOT NULL
+        )
+    """)
+
+
+def carregar_manifesto(cursor):
+    """
+    Carrega o manifesto inteiro.
+
+    Returns:
+        dict {caminho: (tamanho, mtime, sha256)}
+    """
+    cursor.execute("SELECT caminho, tamanho, mtime, sha256 FROM arquivos_ingeridos")
+    return {caminho: (tamanho, mtime, sha256) for caminho, tamanho, mtime, sha256 in cursor}
+
+
+def calcular_sha256(caminho_arquivo):
+    """Calcula o sha256 do arquivo lendo em blocos (memória constante)."""
+    sha = hashlib.sha256()
+    with open(caminho_arquivo, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(TAMANHO_BLOCO_HASH), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def registrar_arquivos(cursor, entradas):
+    """
+    Grava/atualiza entradas do manifesto.
+
+    Args:
+        cursor: Cursor da conexão (a mesma transação dos dados do projeto)
+        entradas: Iterável de tuplas (caminho, tamanho, mtime, sha256)
+    """
+    data_ingestao = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+    cursor.executemany("""
+        INSERT INTO arquivos_ingeridos (caminho, tamanho, mtime, sha256, data_ingestao)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(caminho) DO UPDATE SET
+            tamanho = excluded.tamanho, mtime = excluded.mtime,
+            sha256 = excluded.sha256, data_ingestao = excluded.data_ingestao
+    """, [(c, t, m, s, data_ingestao) for c, t, m, s in entradas])
@@ -30,6 +30,7 @@ def adicionar_colunas_projetos():
             ("tags", "TEXT"),
             ("criado_em", "TEXT"),
             ("criado_por", "INTEGER"),
+            ("hash_insight", "TEXT"),
         ]
         
         # Verificar quais colunas já existem
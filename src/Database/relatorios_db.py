@@ -3,13 +3,15 @@ from datetime import datetime
 from typing import List, Dict, Optional
 import os
 
+from Database.indice_termos import ORIGEM_RELATORIO, garantir_tabelas_indice, indexar_documento, remover_documento
+
 CAMINHO_BANCO = "data/projetos_sonae.db"
 
 class RelatoriosDB:
     """Gerenciador de relatórios salvos no banco de dados"""
     
-    def __init__(self):
-        self.caminho_banco = CAMINHO_BANCO
+    def __init__(self, caminho_banco: str = CAMINHO_BANCO):
+        self.caminho_banco = caminho_banco
     
     def salvar_relatorio(
         self, 
@@ -24,6 +26,27 @@ class RelatoriosDB:
         """
         Salva um relatório no banco de dados.
         
+        Returns:
+            bool: True se salvou com sucesso, False caso contrário
+        """
+        return self.inserir_relatorio(
+            nome_relatorio, conteudo_relatorio, arquivo_original, tags,
+            tamanho_detalhe, prompt_personalizado, user_id
+        ) is not None
+    
+    def inserir_relatorio(
+        self, 
+        nome_relatorio: str, 
+        conteudo_relatorio: str,
+        arquivo_original: str = None,
+        tags: List[str] = None,
+        tamanho_detalhe: str = None,
+        prompt_personalizado: str = None,
+        user_id: int = None
+    ) -> Optional[int]:
+        """
+        Salva um relatório no banco de dados e retorna o ID gerado.
+        
         Args:
             nome_relatorio: Nome do relatório
             conteudo_relatorio: Conteúdo completo do relatório
@@ -34,11 +57,12 @@ class RelatoriosDB:
             user_id: ID do usuário (para futuro sistema de login)
         
         Returns:
-            bool: True se salvou com sucesso, False caso contrário
+            int: ID do relatório, ou None em caso de erro
         """
         conexao = None
         try:
             conexao = sqlite3.connect(self.caminho_banco)
+            garantir_tabelas_indice(conexao)
             cursor = conexao.cursor()
             
             # Converter tags para string
@@ -62,15 +86,19 @@ class RelatoriosDB:
                 tamanho_detalhe,
                 prompt_personalizado
             ))
+            relatorio_id = cursor.lastrowid
+            
+            # Índice de termos na mesma transação (palavras-chave por TF-IDF)
+            indexar_documento(cursor, ORIGEM_RELATORIO, relatorio_id, conteudo_relatorio)
             
             conexao.commit()
-            return True
+            return relatorio_id
             
         except Exception as e:
             print(f"Erro ao salvar relatório: {e}")
             if conexao:
                 conexao.rollback()
-            return False
+            return None
             
         finally:
             if conexao:
@@ -178,6 +206,41 @@ class RelatoriosDB:
             if conexao:
                 conexao.close()
     
+    def atualizar_relatorio(self, relatorio_id: int, nome_relatorio: str, tags: List[str] = None) -> bool:
+        """
+        Renomeia um relatório já salvo e troca suas tags.
+        
+        Args:
+            relatorio_id: ID do relatório
+            nome_relatorio: Novo nome
+            tags: Nova lista de tags
+        
+        Returns:
+            bool: True se atualizou com sucesso
+        """
+        conexao = None
+        try:
+            conexao = sqlite3.connect(self.caminho_banco)
+            cursor = conexao.cursor()
+            
+            cursor.execute("""
+                UPDATE relatorios_salvos SET nome_relatorio = ?, tags = ?
+                WHERE id = ?
+            """, (nome_relatorio, ", ".join(tags) if tags else None, relatorio_id))
+            
+            conexao.commit()
+            return cursor.rowcount > 0
+            
+        except Exception as e:
+            print(f"Erro ao atualizar relatório: {e}")
+            if conexao:
+                conexao.rollback()
+            return False
+            
+        finally:
+            if conexao:
+                conexao.close()
+    
     def deletar_relatorio(self, relatorio_id: int, user_id: int = None) -> bool:
         """
         Deleta um relatório.
@@ -204,9 +267,14 @@ class RelatoriosDB:
                 cursor.execute("""
                     DELETE FROM relatorios_salvos WHERE id = ?
                 """, (relatorio_id,))
+            deletado = cursor.rowcount > 0
+            
+            if deletado:
+                garantir_tabelas_indice(conexao)
+                remover_documento(cursor, ORIGEM_RELATORIO, relatorio_id)
             
             conexao.commit()
-            return cursor.rowcount > 0
+            return deletado
             
         except Exception as e:
             print(f"Erro ao deletar relatório: {e}")
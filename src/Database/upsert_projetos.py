@@ -0,0 +1,186 @@
+import sqlite3
+
+from Database.indice_termos import garantir_tabelas_indice
+
+CAMINHO_BANCO = "data/projetos_sonae.db"
+
+# Colunas que os leitores (Excel, PDF, Word) e a criação manual podem gravar
+COLUNAS_PROJETO = [
+    "nome", "responsavel", "status", "data_ultima_atualizacao", "fonte_dados",
+    "resumo_executivo", "progresso_atual", "principais_desafios",
+    "acoes_corretivas", "perspectiva", "resumo_ia", "hash_insight",
+    "data_inicio", "data_fim", "prioridade", "orcamento", "custo_atual",
+    "progresso", "descricao", "categoria", "tags", "criado_por", "criado_em"
+]
+
+# Colunas gravadas pelos leitores, na ordem usada nos registros em lote
+# (cada registro é a tupla: nome_projeto, *COLUNAS_LEITORES).
+# resumo_ia não entra: o insight só é recalculado depois do UPSERT, se o
+# resumo ou os desafios mudaram (processador_ia.atualizar_insights_desatualizados)
+COLUNAS_LEITORES = [
+    "responsavel", "status", "data_ultima_atualizacao", "fonte_dados",
+    "resumo_executivo", "progresso_atual", "principais_desafios",
+    "acoes_corretivas", "perspectiva"
+]
+
+NOME_INDICE = "idx_projetos_nome_projeto"
+
+
+def garantir_indice_nome_projeto(conexao):
+    """
+    Cria (se necessário) o índice único em projetos.nome_projeto.
+
+    O UPSERT nativo do SQLite (ON CONFLICT) depende deste índice.
+
+    Raises:
+        sqlite3.IntegrityError: se já existirem projetos com nome duplicado
+    """
+    try:
+        conexao.execute(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {NOME_INDICE} ON projetos(nome_projeto)"
+        )
+    except sqlite3.IntegrityError as e:
+        raise sqlite3.IntegrityError(
+            "Existem projetos com 'nome_projeto' duplicado. "
+            "Execute 'python src/Database/criar_indice_projetos.py' antes de continuar."
+        ) from e
+
+
+def garantir_coluna_hash_insight(conexao):
+    """
+    Cria (se necessário) a coluna projetos.hash_insight.
+
+    Guarda o hash das entradas usadas no resumo_ia; projetos antigos ficam com
+    NULL e têm o insight recalculado uma vez.
+    """
+    colunas = [linha[1] for linha in conexao.execute("PRAGMA table_info(projetos)")]
+    if colunas and "hash_insight" not in colunas:
+        conexao.execute("ALTER TABLE projetos ADD COLUMN hash_insight TEXT")
+
+
+def conectar(caminho_banco=CAMINHO_BANCO):
+    """
+    Abre uma conexão pronta para UPSERT.
+
+    Usa timeout de espera para que dois processos gravando ao mesmo tempo
+    aguardem a vez em vez de falhar imediatamente com 'database is locked'.
+    """
+    conexao = sqlite3.connect(caminho_banco, timeout=30)
+    garantir_indice_nome_projeto(conexao)
+    garantir_coluna_hash_insight(conexao)
+    garantir_tabelas_indice(conexao)
+    return conexao
+
+
+def _validar_colunas(colunas):
+    """Garante que só colunas conhecidas entram no SQL montado dinamicamente."""
+    invalidas = [c for c in colunas if c not in COLUNAS_PROJETO]
+    if invalidas:
+        raise ValueError(f"Colunas desconhecidas para projetos: {', '.join(invalidas)}")
+
+
+def _sql_upsert(colunas, origem="VALUES"):
+    """Monta o INSERT ... ON CONFLICT(nome_projeto) DO UPDATE para as colunas dadas."""
+    _validar_colunas(colunas)
+    lista_colunas = ", ".join(["nome_projeto"] + list(colunas))
+    atualizacoes = ", ".join(f"{c} = excluded.{c}" for c in colunas)
+
+    if origem == "VALUES":
+        valores = "VALUES (" + ", ".join(["?"] * (len(colunas) + 1)) + ")"
+    else:
+        # INSERT ... SELECT precisa de um WHERE para o parser não confundir com JOIN
+        valores = f"SELECT {lista_colunas} FROM {origem} WHERE true"
+
+    return f"""
+        INSERT INTO projetos ({lista_colunas})
+        {valores}
+        ON CONFLICT(nome_projeto) DO UPDATE SET {atualizacoes}
+    """
+
+
+def upsert_projeto(cursor, nome_projeto, dados):
+    """
+    Insere ou atualiza um projeto numa única instrução indexada.
+
+    Args:
+        cursor: Cursor de uma conexão aberta com conectar()
+        nome_projeto: Chave natural do projeto
+        dados: dict {coluna: valor} com as colunas a gravar
+
+    Returns:
+        tuple: (id do projeto, True se foi inserido / False se foi atualizado)
+    """
+    colunas = list(dados.keys())
+    sql = _sql_upsert(colunas) + " RETURNING id"
+    # Só o ramo INSERT muda last_insert_rowid (o DO UPDATE não mexe nele) e,
+    # com AUTOINCREMENT, um id novo nunca repete um anterior
+    cursor.execute("SELECT last_insert_rowid()")
+    ultimo_inserido = cursor.fetchone()[0]
+    cursor.execute(sql, [nome_projeto] + [dados[c] for c in colunas])
+    projeto_id = cursor.fetchone()[0]
+    cursor.execute("SELECT last_insert_rowid()")
+    return projeto_id, cursor.fetchone()[0] != ultimo_inserido
+
+
+def upsert_projetos_lote(cursor, colunas, registros):
+    """
+    Insere ou atualiza vários projetos de uma vez.
+
+    Os registros são carregados numa tabela temporária, os existentes são
+    contados com uma única consulta no índice e a escrita é um só
+    INSERT ... SELECT ... ON CONFLICT DO UPDATE. Nomes repetidos no lote:
+    o último vence.
+
+    Args:
+        cursor: Cursor de uma conexão aberta com conectar()
+        colunas: Lista de colunas (sem 'nome_projeto') na ordem dos registros
+        registros: Iterável de tuplas (nome_projeto, valor1, valor2, ...)
+
+    Returns:
+        tuple: (inseridos, atualizados)
+    """
+    _validar_colunas(colunas)
+    cursor.execute("DROP TABLE IF EXISTS temp.lote_projetos")
+    cursor.execute(
+        f"CREATE TEMP TABLE lote_projetos (nome_projeto TEXT PRIMARY KEY, {', '.join(colunas)})"
+    )
+    marcadores = ", ".join(["?"] * (len(colunas) + 1))
+    cursor.executemany(f"INSERT OR REPLACE INTO lote_projetos VALUES ({marcadores})", registros)
+
+    cursor.execute("""
+        SELECT COUNT(*) FROM lote_projetos
+        WHERE nome_projeto IN (SELECT nome_projeto FROM projetos)
+    """)
+    atualizados = cursor.fetchone()[0]
+    cursor.execute("SELECT COUNT(*) FROM lote_projetos")
+    inseridos = cursor.fetchone()[0] - atualizados
+
+    cursor.execute(_sql_upsert(colunas, origem="lote_projetos"))
+    cursor.execute("DROP TABLE temp.lote_projetos")
+    return inseridos, atualizados
+
+
+def inserir_projeto_novo(cursor, nome_projeto, dados):
+    """
+    Insere um projeto que NÃO pode existir ainda (criação manual / upload).
+
+    Se outra origem criar o mesmo projeto ao mesmo tempo, o índice único
+    rejeita o segundo INSERT e a função retorna None em vez de duplicar.
+
+    Returns:
+        int: ID do novo projeto, ou None se o nome já existir
+    """
+    colunas = list(dados.keys())
+    _validar_colunas(colunas)
+    lista_colunas = ", ".join(["nome_projeto"] + colunas)
+    marcadores = ", ".join(["?"] * (len(colunas) + 1))
+    try:
+        cursor.execute(
+            f"INSERT INTO projetos ({lista_colunas}) VALUES ({marcadores})",
+            [nome_projeto] + [dados[c] for c in colunas]
+        )
+    except sqlite3.IntegrityError as e:
+        if "UNIQUE" not in str(e):
+            raise
+        return None
+    return cursor.lastrowid
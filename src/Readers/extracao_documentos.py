@@ -0,0 +1,144 @@
+"""
+Serviço único de extração de texto de documentos (PDF, Word e Excel).
+
+Recebe um caminho, bytes ou o próprio buffer do upload (UploadedFile do
+Streamlit / BytesIO) e escolhe o leitor pela extensão. Nada é gravado em
+arquivo temporário: os leitores trabalham direto no buffer em memória.
+
+O texto sai em streaming (uma página, um parágrafo ou um bloco de linhas
+por vez), e é o mesmo caminho usado pelas páginas e pelos leitores de linha
+de comando.
+
+O texto extraído fica num cache endereçado pelo sha256 do arquivo
+(Database/cache_extracao.py): reenviar o mesmo arquivo não lê o documento de novo.
+Ao mudar a saída de algum leitor, incremente VERSAO_EXTRATOR.
+
+Uso:
+    python src/Readers/extracao_documentos.py data/relatorio_riscos.pdf
+"""
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from Readers.leitor_pdf import iterar_paginas_pdf
+from Readers.leitor_word import iterar_texto_word
+from Readers.leitor_excel import iterar_texto_excel
+from Database.cache_extracao import CacheExtracao, sha256_do_arquivo, TAMANHO_MAXIMO_ENTRADA
+
+# Versão da saída dos leitores: faz parte da chave do cache
+VERSAO_EXTRATOR = "1"
+
+# Extensão -> leitor em streaming
+LEITORES_TEXTO = {
+    "pdf": iterar_paginas_pdf,
+    "docx": iterar_texto_word,
+    "doc": iterar_texto_word,
+    "xlsx": iterar_texto_excel,
+    "xls": iterar_texto_excel,
+}
+
+
+_cache_extracao = None
+
+
+def obter_cache_extracao():
+    """Cache compartilhado pelo processo (None se o banco do cache não puder ser aberto)."""
+    global _cache_extracao
+    if _cache_extracao is None:
+        try:
+            _cache_extracao = CacheExtracao()
+        except Exception as e:
+            print(f"Cache de extração indisponível: {e}")
+            return None
+    return _cache_extracao
+
+
+def tipo_do_arquivo(nome_arquivo):
+    """Retorna a extensão em minúsculas (sem ponto) ou None se não houver."""
+    if not nome_arquivo or "." not in nome_arquivo:
+        return None
+    return nome_arquivo.rsplit(".", 1)[-1].lower()
+
+
+def tipo_suportado(nome_arquivo):
+    return tipo_do_arquivo(nome_arquivo) in LEITORES_TEXTO
+
+
+def _origem(arquivo):
+    """Bytes viram BytesIO; caminhos e buffers (UploadedFile, BytesIO) passam direto."""
+    if isinstance(arquivo, (bytes, bytearray, memoryview)):
+        return io.BytesIO(arquivo)
+    return arquivo
+
+
+def iterar_texto_documento(arquivo, nome_arquivo=None, usar_cache=True):
+    """
+    Gera o texto do documento em pedaços, sem arquivo temporário.
+
+    Se o mesmo conteúdo já foi extraído, o texto vem inteiro do cache num
+    único pedaço e o documento nem é aberto.
+
+    Args:
+        arquivo: Caminho, bytes ou objeto tipo arquivo
+        nome_arquivo: Nome usado para descobrir o tipo (padrão: o caminho
+            ou o atributo .name do upload)
+        usar_cache: Se False, sempre lê o documento
+
+    Yields:
+        Pedaços de texto que, concatenados, formam o documento inteiro
+
+    Raises:
+        ValueError: se o tipo do arquivo não for suportado
+    """
+    if nome_arquivo is None:
+        nome_arquivo = arquivo if isinstance(arquivo, str) else getattr(arquivo, "name", None)
+    tipo = tipo_do_arquivo(nome_arquivo)
+    leitor = LEITORES_TEXTO.get(tipo)
+    if leitor is None:
+        raise ValueError(f"Formato de arquivo não suportado: .{tipo}")
+
+    origem = _origem(arquivo)
+    cache = obter_cache_extracao() if usar_cache else None
+    if cache is None:
+        yield from leitor(origem)
+        return
+
+    sha256 = sha256_do_arquivo(origem)
+    texto = cache.buscar(sha256, tipo, VERSAO_EXTRATOR)
+    if texto is not None:
+        yield texto
+        return
+
+    # Falha: lê normalmente e guarda o texto (se não for grande demais)
+    pedacos = []
+    tamanho = 0
+    for pedaco in leitor(origem):
+        if pedacos is not None:
+            tamanho += len(pedaco)
+            if tamanho > TAMANHO_MAXIMO_ENTRADA:
+                pedacos = None
+            else:
+                pedacos.append(pedaco)
+        yield pedaco
+
+    if pedacos is not None:
+        cache.salvar(sha256, tipo, VERSAO_EXTRATOR, "".join(pedacos))
+
+
+def extrair_texto_documento(arquivo, nome_arquivo=None, usar_cache=True):
+    """
+    Extrai o texto completo do documento (junta os pedaços com um único join).
+
+    Raises:
+        ValueError: se o tipo do arquivo não for suportado
+    """
+    return "".join(iterar_texto_documento(arquivo, nome_arquivo, usar_cache))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Uso: python src/Readers/extracao_documentos.py <arquivo>")
+        sys.exit(1)
+    for pedaco in iterar_texto_documento(sys.argv[1]):
+        sys.stdout.write(pedaco)
@@ -0,0 +1,107 @@
+import re
+
+
+class ExtratorCampos:
+    """
+    Extrai vários campos marcados ("Status:", "Projeto:", ...) de um texto de uma vez.
+
+    Tudo o que depende só dos marcadores é preparado uma única vez no construtor
+    (marcadores em minúsculas, regex de prefixo, regex de valor). Na extração o
+    texto é convertido para minúsculas uma única vez e cada marcador é localizado
+    com str.find, que roda em C. O valor é recortado até a próxima quebra de linha
+    sem copiar nem dividir o resto do texto.
+
+    Obs: uma alternação única (marcador1|marcador2|...) no módulo re foi medida
+    mais lenta que as buscas literais, porque o re testa a alternação posição a
+    posição; por isso a busca é literal por marcador.
+    """
+
+    def __init__(self, marcadores, ignorar_maiusculas=True, padrao_valor=None):
+        """
+        Args:
+            marcadores: dict {marcador: campo}, na ordem de prioridade
+            ignorar_maiusculas: Se True, casa os marcadores sem diferenciar maiúsculas
+            padrao_valor: Regex opcional (com um grupo) para o valor logo após o marcador.
+                Sem ele, o valor vai do fim do marcador até o fim da linha.
+        """
+        self.marcadores = dict(marcadores)
+        self.ignorar_maiusculas = ignorar_maiusculas
+        flags = re.IGNORECASE if ignorar_maiusculas else 0
+
+        # (marcador original, marcador normalizado, campo)
+        self._itens = [
+            (marcador, marcador.lower() if ignorar_maiusculas else marcador, campo)
+            for marcador, campo in self.marcadores.items()
+        ]
+        self._total_campos = len(set(self.marcadores.values()))
+
+        # Um regex por marcador com o valor embutido (só quando há padrao_valor)
+        self._regex_valor = None
+        if padrao_valor is not None:
+            self._regex_valor = [
+                re.compile(re.escape(marcador) + padrao_valor, flags)
+                for marcador in self.marcadores
+            ]
+
+        # Prefixo: a alternação ancorada no início só é testada numa posição
+        alternativas = "|".join(f"({re.escape(m)})" for m in self.marcadores)
+        self._regex_prefixo = re.compile(f"(?:{alternativas})", flags)
+        self._nomes_marcadores = list(self.marcadores.keys())
+        self._campos = list(self.marcadores.values())
+
+    def extrair(self, texto, campos_ja_encontrados=None):
+        """
+        Devolve a primeira ocorrência de cada campo no texto.
+
+        Sem padrao_valor, o valor segue a regra de leitor_pdf.extrair_valor:
+        do fim do marcador até a quebra de linha, sem espaços nas pontas e sem ':'.
+        Quando vários marcadores levam ao mesmo campo, vale o primeiro do dict
+        que aparecer no texto.
+
+        Args:
+            texto: Texto a analisar
+            campos_ja_encontrados: Campos a ignorar (útil ao processar página a página)
+
+        Returns:
+            dict {campo: valor}
+        """
+        ignorar = set(campos_ja_encontrados or ())
+        resultado = {}
+        if not texto or len(ignorar) >= self._total_campos:
+            return resultado
+
+        if self._regex_valor is not None:
+            for (_, _, campo), regex in zip(self._itens, self._regex_valor):
+                if campo in resultado or campo in ignorar:
+                    continue
+                match = regex.search(texto)
+                if match:
+                    resultado[campo] = match.group(1)
+            return resultado
+
+        # Uma única conversão para minúsculas para todos os marcadores
+        texto_busca = texto.lower() if self.ignorar_maiusculas else texto
+        for marcador, marcador_busca, campo in self._itens:
+            if campo in resultado or campo in ignorar:
+                continue
+            inicio = texto_busca.find(marcador_busca)
+            if inicio == -1:
+                continue
+            inicio_valor = inicio + len(marcador)
+            fim_linha = texto.find("\n", inicio_valor)
+            valor = texto[inicio_valor:] if fim_linha == -1 else texto[inicio_valor:fim_linha]
+            resultado[campo] = valor.strip().replace(":", "")
+        return resultado
+
+    def marcador_no_inicio(self, linha):
+        """
+        Verifica se a linha começa com algum marcador (equivale a vários startswith).
+
+        Returns:
+            tuple (marcador, campo) ou None
+        """
+        match = self._regex_prefixo.match(linha)
+        if not match:
+            return None
+        indice = match.lastindex - 1
+        return self._nomes_marcadores[indice], self._campos[indice]
@@ -0,0 +1,215 @@
+"""
+Ingestão em paralelo de um diretório inteiro de relatórios (PDF, Word e Excel).
+
+Os arquivos são lidos num pool de processos (um por núcleo) e os registros
+voltam para um único escritor, que grava no banco em lotes com UPSERT.
+
+A ingestão é incremental: um manifesto (tabela arquivos_ingeridos) guarda
+tamanho, mtime e sha256 de cada arquivo. Arquivos com tamanho e mtime iguais
+nem são abertos; os demais só são lidos de novo se o sha256 mudou. Dos
+projetos gravados, só os que tiveram resumo ou desafios alterados têm o
+insight de IA recalculado.
+
+Uso:
+    python src/Readers/ingestao.py data --workers 32 --lote 500
+    python src/Readers/ingestao.py data --forcar   # ignora o manifesto
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Adicionar path para importar os módulos do projeto
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from Readers.leitor_excel import extrair_registros_excel
+from Readers.leitor_pdf import extrair_registro_pdf
+from Readers.leitor_word import extrair_registro_word
+from Database.upsert_projetos import conectar, upsert_projetos_lote, COLUNAS_LEITORES
+from Database.indice_termos import indexar_projetos
+from AI.processador_ia import atualizar_insights_desatualizados
+from Database.manifesto_ingestao import (
+    garantir_tabela_manifesto, carregar_manifesto, calcular_sha256, registrar_arquivos
+)
+
+CAMINHO_BANCO = "data/projetos_sonae.db"
+DIRETORIO_PADRAO = "data"
+TAMANHO_LOTE_PADRAO = 500
+
+EXTENSOES_SUPORTADAS = ('.pdf', '.docx', '.xlsx')
+
+
+def listar_arquivos(diretorio):
+    """Percorre o diretório (incluindo subpastas como data/uploads) e lista os relatórios."""
+    arquivos = []
+    for raiz, _, nomes in os.walk(diretorio):
+        for nome in nomes:
+            # Ignorar arquivos temporários do Office (~$relatorio.docx)
+            if nome.startswith('~$'):
+                continue
+            if nome.lower().endswith(EXTENSOES_SUPORTADAS):
+                arquivos.append(os.path.join(raiz, nome))
+    return sorted(arquivos)
+
+
+def _para_tupla(registro):
+    """Converte o dict retornado pelos leitores PDF/Word na tupla do lote."""
+    return tuple([registro['nome_projeto']] + [registro.get(c) for c in COLUNAS_LEITORES])
+
+
+def processar_arquivo(tarefa):
+    """
+    Lê um arquivo no processo trabalhador (sem acessar o banco).
+
+    Args:
+        tarefa: tupla (caminho_arquivo, tamanho, mtime, sha256_conhecido)
+
+    Returns:
+        dict com caminho, tamanho, mtime, sha256, inalterado, registros e erro
+    """
+    caminho_arquivo, tamanho, mtime, sha256_conhecido = tarefa
+    resultado = {
+        'caminho': caminho_arquivo, 'tamanho': tamanho, 'mtime': mtime,
+        'sha256': None, 'inalterado': False, 'registros': [], 'erro': None
+    }
+    try:
+        resultado['sha256'] = calcular_sha256(caminho_arquivo)
+        if resultado['sha256'] == sha256_conhecido:
+            # Só o mtime mudou (ex: cópia ou touch): não precisa ler de novo
+            resultado['inalterado'] = True
+            return resultado
+
+        extensao = os.path.splitext(caminho_arquivo)[1].lower()
+        if extensao == '.xlsx':
+            resultado['registros'], _ = extrair_registros_excel(caminho_arquivo)
+        else:
+            if extensao == '.pdf':
+                registro = extrair_registro_pdf(caminho_arquivo)
+            else:
+                registro = extrair_registro_word(caminho_arquivo)
+            resultado['registros'] = [_para_tupla(registro)] if registro else []
+    except Exception as e:
+        resultado['erro'] = str(e)
+    return resultado
+
+
+def ingerir_diretorio(diretorio=DIRETORIO_PADRAO, caminho_banco=CAMINHO_BANCO,
+                      workers=None, tamanho_lote=TAMANHO_LOTE_PADRAO, forcar=False):
+    """
+    Lê os relatórios novos ou alterados de um diretório em paralelo e grava com um único escritor.
+
+    Args:
+        diretorio: Diretório raiz a percorrer
+        caminho_banco: Caminho para o banco SQLite
+        workers: Número de processos leitores (padrão: núcleos da máquina)
+        tamanho_lote: Quantos registros acumular antes de cada commit
+        forcar: Se True, ignora o manifesto e reprocessa todos os arquivos
+
+    Returns:
+        dict com arquivos, ignorados, inalterados, sem_dados, erros, inseridos,
+        atualizados, insights_recalculados e segundos
+    """
+    inicio = time.perf_counter()
+    arquivos = listar_arquivos(diretorio)
+    workers = workers or os.cpu_count() or 1
+    estatisticas = {
+        'arquivos': len(arquivos), 'ignorados': 0, 'inalterados': 0, 'sem_dados': 0,
+        'erros': 0, 'inseridos': 0, 'atualizados': 0, 'insights_recalculados': 0, 'segundos': 0.0
+    }
+    print(f"{len(arquivos)} arquivos encontrados em '{diretorio}' ({workers} processos).")
+    if not arquivos:
+        return estatisticas
+
+    conexao = conectar(caminho_banco)
+    cursor = conexao.cursor()
+    garantir_tabela_manifesto(conexao)
+    manifesto = {} if forcar else carregar_manifesto(cursor)
+
+    # Filtro barato: tamanho e mtime iguais ao manifesto = arquivo não mudou
+    tarefas = []
+    for caminho_arquivo in arquivos:
+        info = os.stat(caminho_arquivo)
+        anterior = manifesto.get(caminho_arquivo)
+        if anterior and anterior[0] == info.st_size and anterior[1] == info.st_mtime:
+            estatisticas['ignorados'] += 1
+            continue
+        tarefas.append((caminho_arquivo, info.st_size, info.st_mtime,
+                        anterior[2] if anterior else None))
+    print(f"{estatisticas['ignorados']} arquivos sem alteração ignorados, "
+          f"{len(tarefas)} para verificar.")
+
+    pendentes = []
+    entradas_manifesto = []
+
+    def gravar_lote():
+        if pendentes:
+            inseridos, atualizados = upsert_projetos_lote(cursor, COLUNAS_LEITORES, pendentes)
+            estatisticas['inseridos'] += inseridos
+            estatisticas['atualizados'] += atualizados
+            nomes = [registro[0] for registro in pendentes]
+            estatisticas['insights_recalculados'] += atualizar_insights_desatualizados(cursor, nomes)
+            indexar_projetos(cursor, nomes)
+        # Manifesto na mesma transação dos dados: se a gravação falhar, o arquivo é relido
+        registrar_arquivos(cursor, entradas_manifesto)
+        conexao.commit()
+        pendentes.clear()
+        entradas_manifesto.clear()
+
+    try:
+        if tarefas:
+            # chunksize reduz a troca de mensagens entre processos com milhares de arquivos
+            chunksize = max(1, len(tarefas) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for resultado in pool.map(processar_arquivo, tarefas, chunksize=chunksize):
+                    caminho_arquivo = resultado['caminho']
+                    if resultado['erro']:
+                        estatisticas['erros'] += 1
+                        print(f"ERRO ao ler '{caminho_arquivo}': {resultado['erro']}")
+                        continue
+
+                    entradas_manifesto.append((caminho_arquivo, resultado['tamanho'],
+                                               resultado['mtime'], resultado['sha256']))
+                    if resultado['inalterado']:
+                        estatisticas['inalterados'] += 1
+                    elif not resultado['registros']:
+                        estatisticas['sem_dados'] += 1
+                        print(f"Aviso: nenhum projeto encontrado em '{caminho_arquivo}'")
+                    else:
+                        pendentes.extend(resultado['registros'])
+
+                    if len(pendentes) >= tamanho_lote or len(entradas_manifesto) >= tamanho_lote:
+                        gravar_lote()
+
+        gravar_lote()
+
+    except Exception as e:
+        print(f"ERRO inesperado na ingestão: {e}")
+        conexao.rollback()
+        raise
+    finally:
+        conexao.close()
+
+    estatisticas['segundos'] = time.perf_counter() - inicio
+    print(f"Sucesso! {estatisticas['inseridos']} projetos inseridos, "
+          f"{estatisticas['atualizados']} atualizados, "
+          f"{estatisticas['insights_recalculados']} insights de IA recalculados.")
+    print(f"{estatisticas['inalterados']} arquivos com conteúdo igual, "
+          f"{estatisticas['sem_dados']} sem projeto, {estatisticas['erros']} com erro. "
+          f"Tempo total: {estatisticas['segundos']:.2f}s")
+    return estatisticas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingestão paralela de relatórios PDF/DOCX/XLSX")
+    parser.add_argument("diretorio", nargs="?", default=DIRETORIO_PADRAO,
+                        help="Diretório a percorrer (padrão: data)")
+    parser.add_argument("--banco", default=CAMINHO_BANCO, help="Caminho do banco SQLite")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processos leitores (padrão: número de núcleos)")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE_PADRAO,
+                        help="Registros por commit do escritor")
+    parser.add_argument("--forcar", action="store_true",
+                        help="Reprocessa todos os arquivos, mesmo os que não mudaram")
+    args = parser.parse_args()
+
+    ingerir_diretorio(args.diretorio, args.banco, args.workers, args.lote, args.forcar)
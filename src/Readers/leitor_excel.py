@@ -1,55 +1,239 @@
-import pandas as pd
-import sqlite3
+import openpyxl
 import os
 import sys
+import time
 # Importamos a função de segurança
 from Readers.criptograph import encriptar_dado
 
 # Adicionar path para importar processador de IA
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-from AI.processador_ia import gerar_insight_para_projeto
+from AI.processador_ia import atualizar_insights_desatualizados
+from Database.upsert_projetos import conectar, upsert_projeto, upsert_projetos_lote, COLUNAS_LEITORES
+from Database.indice_termos import indexar_projetos
 
 CAMINHO_ARQUIVO_EXCEL = "data/relatorios_sonae.xlsx"
 CAMINHO_BANCO = "data/projetos_sonae.db"
 
+# Linhas lidas por bloco: limita a memória em planilhas muito grandes
+TAMANHO_BLOCO_EXCEL = 5000
+
+# A primeira linha do Excel de projetos é vazia/título; os nomes das colunas estão na 2ª
+LINHA_CABECALHO_PROJETOS = 2
+
+# Textos padrão usados quando a coluna não existe no Excel
+PADRAO_RESUMO_EXECUTIVO = (
+    'Projeto focado na extração, transformação e análise de dados empresariais '
+    'para suporte à tomada de decisão estratégica. Implementa processos automatizados '
+    'de ETL (Extract, Transform, Load) para consolidação de informações de múltiplas '
+    'fontes de dados, incluindo sistemas legados, APIs externas e planilhas operacionais.')
+
+PADRAO_PROGRESSO_ATUAL = (
+    'Fase de desenvolvimento em andamento. Arquitetura de dados definida e validada, '
+    'com implementação de 60% dos pipelines de extração. Testes unitários em execução '
+    'para garantir qualidade e integridade dos dados processados.')
+
+PADRAO_PRINCIPAIS_DESAFIOS = (
+    'Integração com múltiplas fontes de dados heterogêneas, garantindo consistência '
+    'e qualidade da informação. Necessidade de otimização de performance para processar '
+    'grandes volumes de dados em tempo hábil. Padronização de formatos e estruturas '
+    'de dados provenientes de sistemas distintos.')
+
+PADRAO_ACOES_CORRETIVAS = (
+    'Revisão da arquitetura de dados para melhorar escalabilidade. Implementação de '
+    'camada de cache para otimizar consultas frequentes. Criação de documentação técnica '
+    'detalhada para facilitar manutenção e evolução do sistema.')
+
+PADRAO_PERSPECTIVA = (
+    'Lançamento da versão beta previsto para o próximo trimestre, com foco em validação '
+    'junto aos usuários-chave. Expectativa de redução de 40% no tempo de geração de '
+    'relatórios gerenciais. Planejamento de expansão para incluir análises preditivas '
+    'utilizando machine learning.')
+
+
+def abrir_pasta_excel(arquivo):
+    """
+    Abre a pasta de trabalho uma única vez em modo somente leitura (streaming).
+    
+    Args:
+        arquivo: Caminho ou objeto tipo arquivo (ex: BytesIO de um upload)
+    """
+    if hasattr(arquivo, "seek"):
+        arquivo.seek(0)
+    return openpyxl.load_workbook(arquivo, read_only=True, data_only=True)
+
+
+def iterar_blocos_excel(arquivo, linha_cabecalho=1, tamanho_bloco=TAMANHO_BLOCO_EXCEL,
+                        apenas_primeira=False):
+    """
+    Percorre todas as planilhas lendo as linhas em blocos de tamanho fixo.
+    
+    O arquivo é aberto uma vez só e as linhas vêm do iter_rows do openpyxl
+    (modo read_only), então a memória fica limitada ao tamanho do bloco,
+    mesmo em planilhas com centenas de milhares de linhas.
+    
+    Args:
+        arquivo: Caminho ou objeto tipo arquivo
+        linha_cabecalho: Linha do Excel (1 = primeira) com os nomes das colunas
+        tamanho_bloco: Quantas linhas por bloco
+        apenas_primeira: Se True, lê só a primeira planilha
+        
+    Yields:
+        tuple (nome_planilha, cabecalho, linhas) - linhas é uma lista de tuplas.
+        Toda planilha com cabeçalho gera ao menos um bloco (talvez vazio).
+        Linhas totalmente vazias são puladas, como no pandas.
+    """
+    pasta = abrir_pasta_excel(arquivo)
+    try:
+        planilhas = pasta.worksheets[:1] if apenas_primeira else pasta.worksheets
+        for planilha in planilhas:
+            linhas = planilha.iter_rows(min_row=linha_cabecalho, values_only=True)
+            cabecalho = next(linhas, None)
+            if cabecalho is None:
+                continue
+
+            bloco = []
+            enviou_bloco = False
+            for linha in linhas:
+                if all(valor is None for valor in linha):
+                    continue
+                bloco.append(linha)
+                if len(bloco) >= tamanho_bloco:
+                    yield planilha.title, cabecalho, bloco
+                    enviou_bloco = True
+                    bloco = []
+
+            if bloco or not enviou_bloco:
+                yield planilha.title, cabecalho, bloco
+    finally:
+        pasta.close()
+
+
+def _texto_celula(valor):
+    return "" if valor is None else str(valor)
+
+
+def iterar_texto_excel(arquivo, tamanho_bloco=TAMANHO_BLOCO_EXCEL):
+    """
+    Serializa o Excel em texto bloco a bloco (uma linha de texto por linha da planilha).
+    
+    Yields:
+        Strings que, concatenadas, formam o texto de todas as planilhas
+    """
+    planilha_atual = None
+    for nome_planilha, cabecalho, linhas in iterar_blocos_excel(arquivo, tamanho_bloco=tamanho_bloco):
+        partes = []
+        if nome_planilha != planilha_atual:
+            planilha_atual = nome_planilha
+            partes.append(f"\n=== Planilha: {nome_planilha} ===\n")
+            partes.append(" | ".join(_texto_celula(v) for v in cabecalho) + "\n")
+        for linha in linhas:
+            partes.append(" | ".join(_texto_celula(v) for v in linha) + "\n")
+        yield "".join(partes)
+
 
 def ler_excel(caminho_arquivo):
     """
     Lê um arquivo Excel e retorna todo o texto extraído.
     
     Args:
-        caminho_arquivo: Caminho para o arquivo Excel (.xlsx, .xls)
+        caminho_arquivo: Caminho para o arquivo Excel (.xlsx) ou objeto tipo arquivo
         
     Returns:
         String contendo todo o conteúdo do Excel formatado
     """
     try:
-        # Ler todas as planilhas
-        excel_file = pd.ExcelFile(caminho_arquivo)
-        texto_completo = ""
-        
-        for sheet_name in excel_file.sheet_names:
-            df = pd.read_excel(caminho_arquivo, sheet_name=sheet_name)
-            texto_completo += f"\n=== Planilha: {sheet_name} ===\n"
-            texto_completo += df.to_string() + "\n"
-        
-        return texto_completo
+        # Abre o arquivo uma vez e junta os blocos com um único join
+        return "".join(iterar_texto_excel(caminho_arquivo))
         
     except Exception as e:
         print(f"Erro ao ler Excel: {e}")
         return None
 
 
+def _texto_data(valor):
+    """
+    Data em texto como o pandas gravava (str do Timestamp, ex: '2025-10-16 00:00:00').
+
+    O str de um datetime do openpyxl é igual ao do Timestamp do pandas; célula
+    vazia vira None em vez do 'nan' de antes.
+    """
+    if valor is None:
+        return None
+    return str(valor)
+
+
+def _celula(linha, indice, padrao=None):
+    """Lê uma célula; coluna ausente usa o padrão e célula vazia vira None."""
+    if indice is None:
+        return padrao
+    return linha[indice] if indice < len(linha) else None
+
+
+def iterar_registros_excel(caminho_arquivo, tamanho_bloco=TAMANHO_BLOCO_EXCEL):
+    """
+    Lê a planilha de projetos em blocos e monta os registros, sem acessar o banco.
+    
+    Args:
+        caminho_arquivo: Caminho para o arquivo Excel
+        tamanho_bloco: Quantas linhas por bloco
+    
+    Yields:
+        tuple (registros, ignorados) por bloco, onde cada registro é a tupla
+        (nome_projeto, *COLUNAS_LEITORES) e ignorados conta linhas sem nome
+    """
+    # Só a primeira planilha, como o pd.read_excel fazia
+    for _, cabecalho, linhas in iterar_blocos_excel(
+            caminho_arquivo, LINHA_CABECALHO_PROJETOS, tamanho_bloco, apenas_primeira=True):
+        indices = {}
+        for indice, nome_coluna in enumerate(cabecalho):
+            if nome_coluna is not None:
+                indices.setdefault(nome_coluna, indice)
+        coluna = indices.get
+
+        registros = []
+        for linha in linhas:
+            nome = _celula(linha, coluna('Nome do Projeto'))
+            if nome is None:
+                continue
+            registros.append((
+                nome,
+                encriptar_dado(_celula(linha, coluna('Responsavel'))),
+                _celula(linha, coluna('Status')),
+                _texto_data(_celula(linha, coluna('Ultima Atualizacao'))),
+                caminho_arquivo,
+                _celula(linha, coluna('Resumo Executivo'), PADRAO_RESUMO_EXECUTIVO),
+                _celula(linha, coluna('Progresso Atual'), PADRAO_PROGRESSO_ATUAL),
+                _celula(linha, coluna('Principais Desafios'), PADRAO_PRINCIPAIS_DESAFIOS),
+                _celula(linha, coluna('Ações Corretivas'), PADRAO_ACOES_CORRETIVAS),
+                _celula(linha, coluna('Perspectiva'), PADRAO_PERSPECTIVA)
+            ))
+        yield registros, len(linhas) - len(registros)
+
+
+def extrair_registros_excel(caminho_arquivo):
+    """
+    Lê a planilha de projetos inteira e monta os registros, sem acessar o banco.
+    
+    Args:
+        caminho_arquivo: Caminho para o arquivo Excel
+    
+    Returns:
+        tuple: (registros, ignorados) onde cada registro é a tupla
+        (nome_projeto, *COLUNAS_LEITORES) e ignorados conta linhas sem nome
+    """
+    registros = []
+    ignorados = 0
+    for registros_bloco, ignorados_bloco in iterar_registros_excel(caminho_arquivo):
+        registros.extend(registros_bloco)
+        ignorados += ignorados_bloco
+    return registros, ignorados
+
+
 def processar_dados_excel():
     conexao = None
     try:
-        # --- ETAPA 1: LER O EXCEL ---
-        # header=1 porque a primeira linha do seu Excel é vazia/título
-        dataframe = pd.read_excel(CAMINHO_ARQUIVO_EXCEL, header=1)
-        print(f"Arquivo '{CAMINHO_ARQUIVO_EXCEL}' lido com sucesso.")
-
-        # --- ETAPA 2: CONECTAR AO BANCO ---
-        conexao = sqlite3.connect(CAMINHO_BANCO)
+        # --- ETAPA 1: CONECTAR AO BANCO ---
+        conexao = conectar(CAMINHO_BANCO)
         cursor = conexao.cursor()
         print(f"Conexão com o banco '{CAMINHO_BANCO}' estabelecida.")
 
@@ -57,86 +241,24 @@ def processar_dados_excel():
         linhas_atualizadas = 0
         linhas_inseridas = 0
 
-        for index, linha in dataframe.iterrows():
-            nome = linha['Nome do Projeto']
-            status = linha['Status']
-            # AQUI APLICAMOS A SEGURANÇA:
-            responsavel_bruto = linha['Responsavel']
-            responsavel_seguro = encriptar_dado(responsavel_bruto)
-            
-            data_atualizacao = str(linha['Ultima Atualizacao'])
-            fonte = CAMINHO_ARQUIVO_EXCEL
-            
-            # Extrair campos detalhados (se existirem no Excel)
-            resumo_executivo = linha.get('Resumo Executivo', 
-                'Projeto focado na extração, transformação e análise de dados empresariais '
-                'para suporte à tomada de decisão estratégica. Implementa processos automatizados '
-                'de ETL (Extract, Transform, Load) para consolidação de informações de múltiplas '
-                'fontes de dados, incluindo sistemas legados, APIs externas e planilhas operacionais.')
-            
-            progresso_atual = linha.get('Progresso Atual', 
-                'Fase de desenvolvimento em andamento. Arquitetura de dados definida e validada, '
-                'com implementação de 60% dos pipelines de extração. Testes unitários em execução '
-                'para garantir qualidade e integridade dos dados processados.')
-            
-            principais_desafios = linha.get('Principais Desafios', 
-                'Integração com múltiplas fontes de dados heterogêneas, garantindo consistência '
-                'e qualidade da informação. Necessidade de otimização de performance para processar '
-                'grandes volumes de dados em tempo hábil. Padronização de formatos e estruturas '
-                'de dados provenientes de sistemas distintos.')
-            
-            acoes_corretivas = linha.get('Ações Corretivas', 
-                'Revisão da arquitetura de dados para melhorar escalabilidade. Implementação de '
-                'camada de cache para otimizar consultas frequentes. Criação de documentação técnica '
-                'detalhada para facilitar manutenção e evolução do sistema.')
-            
-            perspectiva = linha.get('Perspectiva', 
-                'Lançamento da versão beta previsto para o próximo trimestre, com foco em validação '
-                'junto aos usuários-chave. Expectativa de redução de 40% no tempo de geração de '
-                'relatórios gerenciais. Planejamento de expansão para incluir análises preditivas '
-                'utilizando machine learning.')
-
-            # --- ETAPA 3: VERIFICAR SE O PROJETO JÁ EXISTE ---
-            cursor.execute("SELECT id FROM projetos WHERE nome_projeto = ?", (nome,))
-            projeto_existente = cursor.fetchone()
-
-            if projeto_existente:
-                # --- UPDATE ---
-                id_projeto = projeto_existente[0]
-                sql_update = """
-                UPDATE projetos 
-                SET responsavel = ?, status = ?, data_ultima_atualizacao = ?, fonte_dados = ?,
-                    resumo_executivo = ?, progresso_atual = ?, principais_desafios = ?,
-                    acoes_corretivas = ?, perspectiva = ?
-                WHERE id = ?
-                """
-                cursor.execute(sql_update, (responsavel_seguro, status, data_atualizacao, fonte,
-                                           resumo_executivo, progresso_atual, principais_desafios,
-                                           acoes_corretivas, perspectiva, id_projeto))
-                linhas_atualizadas += 1
-                
-                # Gerar insight de IA
-                print(f"  Gerando insight de IA para '{nome}'...")
-                gerar_insight_para_projeto(projeto_id=id_projeto)
-            else:
-                # --- INSERT ---
-                sql_insert = """
-                INSERT INTO projetos (nome_projeto, responsavel, status, data_ultima_atualizacao, fonte_dados,
-                                     resumo_executivo, progresso_atual, principais_desafios,
-                                     acoes_corretivas, perspectiva)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
-                """
-                cursor.execute(sql_insert, (nome, responsavel_seguro, status, data_atualizacao, fonte,
-                                           resumo_executivo, progresso_atual, principais_desafios,
-                                           acoes_corretivas, perspectiva))
-                linhas_inseridas += 1
-                
-                # Obter ID do projeto recém-inserido e gerar insight
-                novo_id = cursor.lastrowid
-                print(f"  Gerando insight de IA para '{nome}'...")
-                gerar_insight_para_projeto(projeto_id=novo_id)
-
-        # --- ETAPA 5: SALVAR ---
+        # --- ETAPA 2: LER O EXCEL EM BLOCOS (responsável já criptografado) ---
+        for registros, _ in iterar_registros_excel(CAMINHO_ARQUIVO_EXCEL):
+            for nome, *valores in registros:
+                # --- ETAPA 3: UPSERT (uma instrução indexada) ---
+                print(f"  Gravando '{nome}'...")
+                _, inserido = upsert_projeto(cursor, nome, dict(zip(COLUNAS_LEITORES, valores)))
+                if inserido:
+                    linhas_inseridas += 1
+                else:
+                    linhas_atualizadas += 1
+            # --- INSIGHT DE IA E ÍNDICE DE TERMOS: só dos projetos com texto alterado ---
+            nomes = [registro[0] for registro in registros]
+            recalculados = atualizar_insights_desatualizados(cursor, nomes)
+            indexar_projetos(cursor, nomes)
+            print(f"  {recalculados} insights de IA recalculados.")
+        print(f"Arquivo '{CAMINHO_ARQUIVO_EXCEL}' lido com sucesso.")
+
+        # --- ETAPA 4: SALVAR ---
         conexao.commit()
         print(f"Sucesso! {linhas_inseridas} linhas novas inseridas.")
         print(f"Sucesso! {linhas_atualizadas} linhas existentes foram atualizadas.")
@@ -151,5 +273,84 @@ def processar_dados_excel():
             conexao.close()
             print("Conexão com o banco de dados fechada.")
 
+
+def processar_dados_excel_lote(caminho_arquivo=CAMINHO_ARQUIVO_EXCEL, caminho_banco=CAMINHO_BANCO,
+                               tamanho_bloco=TAMANHO_BLOCO_EXCEL):
+    """
+    Modo em lote do ingest do Excel: grava blocos de linhas em vez de linha a linha.
+    
+    As linhas são lidas em blocos de tamanho fixo e cada bloco vai para o banco
+    com um INSERT ... SELECT ... ON CONFLICT, então a memória não cresce com o
+    tamanho da planilha. Tudo acontece numa só transação.
+    Depois de cada bloco, só os insights de IA de projetos cujo resumo ou
+    desafios mudaram são recalculados.
+    
+    Args:
+        caminho_arquivo: Caminho para o arquivo Excel
+        caminho_banco: Caminho para o banco SQLite
+        tamanho_bloco: Quantas linhas ler e gravar por vez
+    
+    Returns:
+        dict com inseridos, atualizados, ignorados, insights_recalculados, linhas,
+        segundos e linhas_por_segundo (ou None em caso de erro)
+    """
+    conexao = None
+    inicio = time.perf_counter()
+    try:
+        conexao = conectar(caminho_banco)
+        cursor = conexao.cursor()
+        inseridos = atualizados = ignorados = insights = linhas = 0
+
+        # --- ETAPA 1 e 2: LER O EXCEL EM BLOCOS E FAZER UPSERT DE CADA BLOCO ---
+        for registros, ignorados_bloco in iterar_registros_excel(caminho_arquivo, tamanho_bloco):
+            inseridos_bloco, atualizados_bloco = upsert_projetos_lote(
+                cursor, COLUNAS_LEITORES, registros
+            )
+            nomes = [registro[0] for registro in registros]
+            insights += atualizar_insights_desatualizados(cursor, nomes)
+            indexar_projetos(cursor, nomes)
+            inseridos += inseridos_bloco
+            atualizados += atualizados_bloco
+            ignorados += ignorados_bloco
+            # Linhas lidas: um nome repetido no bloco é um só upsert, mas duas linhas
+            linhas += len(registros) + ignorados_bloco
+
+        print(f"Arquivo '{caminho_arquivo}' lido com sucesso ({linhas} linhas).")
+
+        # --- ETAPA 3: SALVAR ---
+        conexao.commit()
+
+        segundos = time.perf_counter() - inicio
+        estatisticas = {
+            'inseridos': inseridos,
+            'atualizados': atualizados,
+            'ignorados': ignorados,
+            'insights_recalculados': insights,
+            'linhas': linhas,
+            'segundos': segundos,
+            'linhas_por_segundo': linhas / segundos if segundos > 0 else 0.0
+        }
+        print(f"Sucesso! {inseridos} linhas novas inseridas.")
+        print(f"Sucesso! {atualizados} linhas existentes foram atualizadas.")
+        print(f"{insights} insights de IA recalculados (os demais não mudaram).")
+        if ignorados:
+            print(f"Aviso: {ignorados} linhas sem 'Nome do Projeto' foram ignoradas.")
+        print(f"Tempo total: {segundos:.2f}s ({estatisticas['linhas_por_segundo']:.0f} linhas/s)")
+        return estatisticas
+
+    except Exception as e:
+        print(f"ERRO inesperado ao processar Excel em lote: {e}")
+        if conexao:
+            conexao.rollback()
+        return None
+
+    finally:
+        if conexao:
+            conexao.close()
+            print("Conexão com o banco de dados fechada.")
+
 if __name__ == "__main__":
-    processar_dados_excel()
\ No newline at end of file
+    if "--lote" in sys.argv:
+        processar_dados_excel_lote()
+    else:
+        processar_dados_excel()
\ No newline at end of file
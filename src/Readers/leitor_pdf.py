@@ -1,5 +1,4 @@
 import fitz  # PyMuPDF
-import sqlite3
 import os
 import sys
 # Importamos a função de segurança
@@ -7,38 +6,120 @@ from Readers.criptograph import encriptar_dado
 
 # Adicionar path para importar processador de IA
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-from AI.processador_ia import gerar_insight_para_projeto
+from AI.processador_ia import atualizar_insights_desatualizados
+from Database.upsert_projetos import conectar, upsert_projeto
+from Database.indice_termos import indexar_projetos
+from Readers.extrator_campos import ExtratorCampos
 
 CAMINHO_ARQUIVO_PDF = "data/relatorio_riscos.pdf"
 CAMINHO_BANCO = "data/projetos_sonae.db"
 
 
-def ler_pdf(caminho_arquivo):
+# Marcadores procurados nos relatórios PDF (marcador -> campo do registro)
+MARCADORES_PDF = {
+    "Projeto:": "nome_projeto",
+    "Gerente Responsável:": "responsavel",
+    "Status:": "status",
+    "Data de Emissão:": "data_ultima_atualizacao",
+    "Resumo Executivo:": "resumo_executivo",
+    "Progresso:": "progresso_atual",
+    "Principais Riscos:": "principais_desafios",
+    "Ações Preventivas:": "acoes_corretivas",
+    "Perspectiva:": "perspectiva"
+}
+
+# Compilado uma vez: todos os marcadores numa única passada por página
+EXTRATOR_PDF = ExtratorCampos(MARCADORES_PDF)
+
+
+def abrir_pdf(arquivo):
+    """
+    Abre um PDF a partir de um caminho ou de um buffer em memória.
+    
+    Args:
+        arquivo: Caminho, bytes ou objeto tipo arquivo (ex: BytesIO de um upload)
+    """
+    if isinstance(arquivo, (str, os.PathLike)):
+        return fitz.open(arquivo)
+    if hasattr(arquivo, "read"):
+        arquivo.seek(0)
+        return fitz.open(stream=arquivo.read(), filetype="pdf")
+    return fitz.open(stream=arquivo, filetype="pdf")
+
+
+def iterar_paginas_pdf(caminho_arquivo, pagina_inicial=0, pagina_final=None):
+    """
+    Gera o texto do PDF página a página, sem montar o documento inteiro em memória.
+    
+    Args:
+        caminho_arquivo: Caminho, bytes ou objeto tipo arquivo com o PDF
+        pagina_inicial: Primeira página (0 = primeira do documento)
+        pagina_final: Página final exclusiva (None = até o fim)
+        
+    Yields:
+        String com o texto de uma página
+    """
+    with abrir_pdf(caminho_arquivo) as documento:
+        total = len(documento)
+        fim = total if pagina_final is None else min(pagina_final, total)
+        for numero in range(max(pagina_inicial, 0), fim):
+            yield documento.load_page(numero).get_text()
+
+
+def ler_pdf(caminho_arquivo, pagina_inicial=0, pagina_final=None):
     """
     Lê um arquivo PDF e retorna todo o texto extraído.
     
     Args:
-        caminho_arquivo: Caminho para o arquivo PDF
+        caminho_arquivo: Caminho, bytes ou objeto tipo arquivo com o PDF
+        pagina_inicial: Primeira página a ler (opcional)
+        pagina_final: Página final exclusiva (opcional)
         
     Returns:
         String contendo todo o texto do PDF
     """
     try:
-        documento = fitz.open(caminho_arquivo)
-        texto_completo = ""
-        
-        for pagina in documento:
-            texto_completo += pagina.get_text()
-        
-        documento.close()
-        return texto_completo
+        # join único em vez de += página a página (que é quadrático)
+        return "".join(iterar_paginas_pdf(caminho_arquivo, pagina_inicial, pagina_final))
         
     except Exception as e:
         print(f"Erro ao ler PDF: {e}")
         return None
 
 
+def extrair_campos_pdf(caminho_arquivo, marcadores=MARCADORES_PDF, pagina_inicial=0, pagina_final=None):
+    """
+    Procura os marcadores página a página e para assim que todos forem encontrados.
+    
+    Cada página é varrida uma única vez por ExtratorCampos (e não uma vez por marcador).
+    O valor de cada marcador vai até o fim da linha, então nunca atravessa páginas:
+    o resultado é o mesmo de extrair_valor() no texto completo, mas o pico de
+    memória fica limitado a uma página.
+    
+    Args:
+        caminho_arquivo: Caminho para o arquivo PDF
+        marcadores: dict {marcador: campo}
+        pagina_inicial: Primeira página a ler (opcional)
+        pagina_final: Página final exclusiva (opcional)
+        
+    Returns:
+        dict {campo: valor} apenas com os marcadores encontrados
+    """
+    extrator = EXTRATOR_PDF if marcadores is MARCADORES_PDF else ExtratorCampos(marcadores)
+    campos = {}
+    for texto_pagina in iterar_paginas_pdf(caminho_arquivo, pagina_inicial, pagina_final):
+        campos.update(extrator.extrair(texto_pagina, campos_ja_encontrados=campos))
+        if len(campos) == len(marcadores):
+            break
+    return campos
+
+
 def extrair_valor(texto_completo, marcador):
+    """
+    Busca um único marcador no texto (uma varredura por marcador).
+
+    Mantida para compatibilidade; para vários marcadores use ExtratorCampos.
+    """
     try:
         texto_lower = texto_completo.lower()
         marcador_lower = marcador.lower()
@@ -51,105 +132,99 @@ def extrair_valor(texto_completo, marcador):
     except Exception:
         return None
 
+def extrair_registro_pdf(caminho_arquivo, pagina_inicial=0, pagina_final=None):
+    """
+    Lê um relatório PDF e monta o registro do projeto, sem acessar o banco.
+    
+    O responsável já sai criptografado, para que o trabalho pesado possa rodar
+    em processos separados (ver Readers/ingestao.py). O insight de IA é
+    calculado depois do UPSERT, só se o resumo ou os desafios mudaram.
+    
+    Args:
+        caminho_arquivo: Caminho para o arquivo PDF
+        pagina_inicial: Primeira página a ler (opcional)
+        pagina_final: Página final exclusiva (opcional)
+        
+    Returns:
+        dict com 'nome_projeto' e as colunas de COLUNAS_LEITORES, ou None se o
+        nome do projeto não for encontrado
+    """
+    # --- ETAPA 1 e 2: LER O PDF PÁGINA A PÁGINA E PESCAR OS CAMPOS ---
+    campos = extrair_campos_pdf(caminho_arquivo, pagina_inicial=pagina_inicial, pagina_final=pagina_final)
+    nome = campos.get("nome_projeto")
+    if not nome:
+        return None
+    
+    # Campos detalhados com texto padrão quando o marcador não existe
+    resumo_executivo = campos.get("resumo_executivo") or (
+        "Projeto dedicado à análise abrangente e gestão proativa de riscos operacionais, "
+        "financeiros e estratégicos. Implementa metodologia estruturada para identificação, "
+        "avaliação, monitoramento e mitigação de riscos que possam impactar os objetivos "
+        "organizacionais. Utiliza frameworks internacionais de gestão de riscos (ISO 31000) "
+        "e ferramentas analíticas avançadas para mapeamento de cenários e simulações.")
+    
+    progresso_atual = campos.get("progresso_atual") or (
+        "Fase de mapeamento de riscos em andamento, com 75% dos processos críticos já avaliados. "
+        "Matriz de riscos corporativa atualizada e validada pela alta gestão. Implementação de "
+        "sistema de monitoramento contínuo em fase piloto, abrangendo as áreas de maior exposição.")
+    
+    principais_desafios = campos.get("principais_desafios") or (
+        "Identificação precisa de riscos emergentes em ambiente de constante mudança. "
+        "Necessidade de engajamento de todas as áreas para cultura de gestão de riscos. "
+        "Balanceamento entre apetite ao risco e oportunidades de crescimento. Integração "
+        "de dados de diferentes sistemas para análise holística de exposição a riscos.")
+    
+    acoes_corretivas = campos.get("acoes_corretivas") or (
+        "Implementação de controles preventivos e detectivos em processos críticos. "
+        "Desenvolvimento de planos de contingência para riscos de alta severidade. "
+        "Capacitação contínua de gestores em metodologias de gestão de riscos. "
+        "Estabelecimento de comitê de riscos com reuniões mensais de avaliação.")
+    
+    perspectiva = campos.get("perspectiva") or (
+        "Expectativa de redução de 30% na ocorrência de incidentes críticos no próximo ano. "
+        "Melhoria significativa na previsibilidade e antecipação de eventos adversos. "
+        "Fortalecimento da resiliência organizacional e capacidade de resposta a crises. "
+        "Integração completa da gestão de riscos ao planejamento estratégico corporativo.")
+
+    return {
+        "nome_projeto": nome,
+        # AQUI APLICAMOS A SEGURANÇA:
+        "responsavel": encriptar_dado(campos.get("responsavel")),
+        "status": campos.get("status"),
+        "data_ultima_atualizacao": campos.get("data_ultima_atualizacao"),
+        "fonte_dados": caminho_arquivo,
+        "resumo_executivo": resumo_executivo,
+        "progresso_atual": progresso_atual,
+        "principais_desafios": principais_desafios,
+        "acoes_corretivas": acoes_corretivas,
+        "perspectiva": perspectiva
+    }
+
+
 def processar_dados_pdf():
     conexao = None
     try:
-        # --- ETAPA 1: LER O PDF ---
-        texto_completo_pdf = ""
-        with fitz.open(CAMINHO_ARQUIVO_PDF) as doc:
-            for pagina in doc:
-                texto_completo_pdf += pagina.get_text() + "\n"
-        print(f"Arquivo '{CAMINHO_ARQUIVO_PDF}' lido com sucesso.")
-
-        # --- ETAPA 2: PESCARIA ---
+        # --- ETAPA 1 e 2: LER O PDF E PESCAR OS CAMPOS ---
         print("Iniciando 'modo detetive'...")
-        nome = extrair_valor(texto_completo_pdf, "Projeto:")
-        responsavel_bruto = extrair_valor(texto_completo_pdf, "Gerente Responsável:")
-        status = extrair_valor(texto_completo_pdf, "Status:")
-        data = extrair_valor(texto_completo_pdf, "Data de Emissão:")
-        
-        # Extrair campos detalhados
-        resumo_executivo = extrair_valor(texto_completo_pdf, "Resumo Executivo:") or (
-            "Projeto dedicado à análise abrangente e gestão proativa de riscos operacionais, "
-            "financeiros e estratégicos. Implementa metodologia estruturada para identificação, "
-            "avaliação, monitoramento e mitigação de riscos que possam impactar os objetivos "
-            "organizacionais. Utiliza frameworks internacionais de gestão de riscos (ISO 31000) "
-            "e ferramentas analíticas avançadas para mapeamento de cenários e simulações.")
-        
-        progresso_atual = extrair_valor(texto_completo_pdf, "Progresso:") or (
-            "Fase de mapeamento de riscos em andamento, com 75% dos processos críticos já avaliados. "
-            "Matriz de riscos corporativa atualizada e validada pela alta gestão. Implementação de "
-            "sistema de monitoramento contínuo em fase piloto, abrangendo as áreas de maior exposição.")
-        
-        principais_desafios = extrair_valor(texto_completo_pdf, "Principais Riscos:") or (
-            "Identificação precisa de riscos emergentes em ambiente de constante mudança. "
-            "Necessidade de engajamento de todas as áreas para cultura de gestão de riscos. "
-            "Balanceamento entre apetite ao risco e oportunidades de crescimento. Integração "
-            "de dados de diferentes sistemas para análise holística de exposição a riscos.")
-        
-        acoes_corretivas = extrair_valor(texto_completo_pdf, "Ações Preventivas:") or (
-            "Implementação de controles preventivos e detectivos em processos críticos. "
-            "Desenvolvimento de planos de contingência para riscos de alta severidade. "
-            "Capacitação contínua de gestores em metodologias de gestão de riscos. "
-            "Estabelecimento de comitê de riscos com reuniões mensais de avaliação.")
-        
-        perspectiva = extrair_valor(texto_completo_pdf, "Perspectiva:") or (
-            "Expectativa de redução de 30% na ocorrência de incidentes críticos no próximo ano. "
-            "Melhoria significativa na previsibilidade e antecipação de eventos adversos. "
-            "Fortalecimento da resiliência organizacional e capacidade de resposta a crises. "
-            "Integração completa da gestão de riscos ao planejamento estratégico corporativo.")
+        registro = extrair_registro_pdf(CAMINHO_ARQUIVO_PDF)
+        print(f"Arquivo '{CAMINHO_ARQUIVO_PDF}' lido com sucesso.")
 
-        if not nome:
+        if not registro:
             print("ERRO: Não foi possível extrair o 'Nome do Projeto' do PDF.")
             return 
 
+        nome = registro.pop("nome_projeto")
         print(f"Dados extraídos para: {nome}")
 
         # --- ETAPA 3: UPSERT COM SEGURANÇA ---
-        conexao = sqlite3.connect(CAMINHO_BANCO)
+        conexao = conectar(CAMINHO_BANCO)
         cursor = conexao.cursor()
-        fonte = CAMINHO_ARQUIVO_PDF
-        
-        # AQUI APLICAMOS A SEGURANÇA:
-        responsavel_seguro = encriptar_dado(responsavel_bruto)
-
-        cursor.execute("SELECT id FROM projetos WHERE nome_projeto = ?", (nome,))
-        projeto_existente = cursor.fetchone()
-
-        if projeto_existente:
-            id_projeto = projeto_existente[0]
-            sql_update = """
-            UPDATE projetos SET responsavel = ?, status = ?, data_ultima_atualizacao = ?, fonte_dados = ?,
-                resumo_executivo = ?, progresso_atual = ?, principais_desafios = ?,
-                acoes_corretivas = ?, perspectiva = ?
-            WHERE id = ?
-            """
-            cursor.execute(sql_update, (responsavel_seguro, status, data, fonte,
-                                       resumo_executivo, progresso_atual, principais_desafios,
-                                       acoes_corretivas, perspectiva, id_projeto))
-            print(f"Sucesso! Projeto '{nome}' ATUALIZADO (Seguro).")
-            
-            # Gerar insight de IA
-            print(f"  Gerando insight de IA para '{nome}'...")
-            gerar_insight_para_projeto(projeto_id=id_projeto)
-        else:
-            sql_insert = """
-            INSERT INTO projetos (nome_projeto, responsavel, status, data_ultima_atualizacao, fonte_dados,
-                                 resumo_executivo, progresso_atual, principais_desafios,
-                                 acoes_corretivas, perspectiva)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
-            """
-            cursor.execute(sql_insert, (nome, responsavel_seguro, status, data, fonte,
-                                       resumo_executivo, progresso_atual, principais_desafios,
-                                       acoes_corretivas, perspectiva))
-            novo_id = cursor.lastrowid
-            print(f"Sucesso! Projeto '{nome}' INSERIDO (Seguro).")
-            
-            # Gerar insight de IA
-            print(f"  Gerando insight de IA para '{nome}'...")
-            gerar_insight_para_projeto(projeto_id=novo_id)
-
+        id_projeto, inserido = upsert_projeto(cursor, nome, registro)
+        atualizar_insights_desatualizados(cursor, [nome])
+        indexar_projetos(cursor, [nome])
         conexao.commit()
+        situacao = "INSERIDO" if inserido else "ATUALIZADO"
+        print(f"Sucesso! Projeto '{nome}' {situacao} (Seguro, ID {id_projeto}).")
 
     except Exception as e:
         print(f"ERRO inesperado ao processar PDF: {e}")
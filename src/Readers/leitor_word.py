@@ -1,149 +1,249 @@
 import docx
-import sqlite3
 import os
+import sys
+import zipfile
+from lxml import etree
 # Importamos a função de segurança
 from Readers.criptograph import encriptar_dado
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from AI.processador_ia import atualizar_insights_desatualizados
+from Database.upsert_projetos import conectar, upsert_projeto
+from Database.indice_termos import indexar_projetos
+from Readers.extrator_campos import ExtratorCampos
+
 CAMINHO_ARQUIVO_WORD = "data/relatorio_crm.docx"
 CAMINHO_BANCO = "data/projetos_sonae.db"
 
+# Tags do WordprocessingML usadas na leitura direta do XML
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+TAG_CORPO = _W + "body"
+TAG_PARAGRAFO = _W + "p"
+TAG_RUN = _W + "r"
+TAG_HYPERLINK = _W + "hyperlink"
+
+# Equivalente em texto de cada elemento de um run (mesma regra do python-docx)
+TEXTO_ELEMENTOS_RUN = {
+    _W + "tab": "\t",
+    _W + "ptab": "\t",
+    _W + "cr": "\n",
+    _W + "noBreakHyphen": "-",
+}
+TAG_TEXTO = _W + "t"
+TAG_QUEBRA = _W + "br"
+ATRIBUTO_TIPO_QUEBRA = _W + "type"
+
+
+def _texto_run(run):
+    partes = []
+    for elemento in run:
+        tag = elemento.tag
+        if tag == TAG_TEXTO:
+            partes.append(elemento.text or "")
+        elif tag == TAG_QUEBRA:
+            # Quebras de página/coluna não viram texto
+            if elemento.get(ATRIBUTO_TIPO_QUEBRA, "textWrapping") == "textWrapping":
+                partes.append("\n")
+        elif tag in TEXTO_ELEMENTOS_RUN:
+            partes.append(TEXTO_ELEMENTOS_RUN[tag])
+    return "".join(partes)
+
+
+def _texto_paragrafo(paragrafo):
+    """Texto de um <w:p>: runs diretos e runs dentro de hyperlinks, como paragraph.text."""
+    partes = []
+    for filho in paragrafo:
+        if filho.tag == TAG_RUN:
+            partes.append(_texto_run(filho))
+        elif filho.tag == TAG_HYPERLINK:
+            partes.extend(_texto_run(run) for run in filho if run.tag == TAG_RUN)
+    return "".join(partes)
+
+
+def iterar_paragrafos_docx(arquivo):
+    """
+    Gera o texto dos parágrafos lendo word/document.xml em streaming (lxml iterparse).
+    
+    Não monta o DOM do documento: cada parágrafo é descartado depois de lido.
+    Assim como documento.paragraphs do python-docx, só entram os parágrafos
+    do corpo (parágrafos dentro de tabelas ficam de fora).
+    
+    Args:
+        arquivo: Caminho ou objeto tipo arquivo (.docx)
+        
+    Yields:
+        String com o texto de cada parágrafo
+    """
+    if hasattr(arquivo, "seek"):
+        arquivo.seek(0)
+    with zipfile.ZipFile(arquivo) as pacote:
+        with pacote.open("word/document.xml") as xml:
+            for _, paragrafo in etree.iterparse(xml, events=("end",), tag=TAG_PARAGRAFO):
+                pai = paragrafo.getparent()
+                if pai is None or pai.tag != TAG_CORPO:
+                    continue
+                yield _texto_paragrafo(paragrafo)
+
+                # Libera o parágrafo e tudo o que veio antes dele no corpo
+                paragrafo.clear()
+                while paragrafo.getprevious() is not None:
+                    del pai[0]
+
+
+def iterar_paragrafos_word(arquivo, streaming=True):
+    """
+    Gera o texto dos parágrafos de um .docx.
+    
+    Args:
+        arquivo: Caminho ou objeto tipo arquivo (.docx)
+        streaming: True lê o XML direto (rápido, memória constante);
+            False usa o python-docx (carrega o documento inteiro)
+    """
+    if streaming:
+        yield from iterar_paragrafos_docx(arquivo)
+    else:
+        for paragrafo in docx.Document(arquivo).paragraphs:
+            yield paragrafo.text
+
+
+def iterar_texto_word(arquivo):
+    """Gera o texto do documento parágrafo a parágrafo (cada um terminado em '\\n')."""
+    for texto in iterar_paragrafos_word(arquivo):
+        yield texto + "\n"
+
 
 def ler_word(caminho_arquivo):
     """
     Lê um arquivo Word e retorna todo o texto extraído.
     
     Args:
-        caminho_arquivo: Caminho para o arquivo Word (.docx)
+        caminho_arquivo: Caminho ou objeto tipo arquivo (.docx)
         
     Returns:
         String contendo todo o texto do documento
     """
     try:
-        documento = docx.Document(caminho_arquivo)
-        texto_completo = ""
-        
-        for paragrafo in documento.paragraphs:
-            texto_completo += paragrafo.text + "\n"
-        
-        return texto_completo
+        return "".join(iterar_texto_word(caminho_arquivo))
         
     except Exception as e:
         print(f"Erro ao ler Word: {e}")
         return None
 
 
+# Marcadores baseados no seu arquivo real
+MARCADORES = {
+    "Nome do Projeto:": "nome_projeto",
+    "Responsável:": "responsavel",
+    "Status:": "status",
+    "Data:": "data_ultima_atualizacao",
+    "1. Resumo Executivo": "resumo_executivo",
+    "2. Progresso Atual": "progresso_atual",
+    "3. Principais Desafios": "principais_desafios",
+    "4. Ações Corretivas": "acoes_corretivas",
+    "5. Perspectiva": "perspectiva"
+}
+
+# Um único regex ancorado no início da linha no lugar de um startswith por marcador
+# (sensível a maiúsculas, como o startswith)
+EXTRATOR_WORD = ExtratorCampos(MARCADORES, ignorar_maiusculas=False)
+
+CAMPOS_LINHA_UNICA = {"nome_projeto", "responsavel", "status", "data_ultima_atualizacao"}
+
+
+def extrair_registro_word(caminho_arquivo, streaming=True):
+    """
+    Lê um relatório Word e monta o registro do projeto, sem acessar o banco.
+    
+    O responsável já sai criptografado, para que o trabalho pesado possa rodar
+    em processos separados (ver Readers/ingestao.py). O insight de IA é
+    calculado depois do UPSERT, só se o resumo ou os desafios mudaram.
+    
+    Args:
+        caminho_arquivo: Caminho para o arquivo Word (.docx)
+        streaming: Se True (padrão), lê o XML em streaming em vez do python-docx
+        
+    Returns:
+        dict com 'nome_projeto' e as colunas de COLUNAS_LEITORES, ou None se o
+        marcador 'Nome do Projeto:' não for encontrado
+    """
+    # --- ETAPA 1: LER O ARQUIVO WORD (parágrafo a parágrafo) ---
+    paragrafos = iterar_paragrafos_word(caminho_arquivo, streaming)
+
+    # --- ETAPA 2: A "PESCARIA" AVANÇADA ---
+    dados_encontrados = {}
+    modo_captura = None 
+    texto_capturado = [] 
+    
+    for texto_paragrafo in paragrafos:
+        texto_linha = texto_paragrafo.strip()
+        if not texto_linha: continue
+
+        novo_modo = None
+        encontrado = EXTRATOR_WORD.marcador_no_inicio(texto_linha)
+        if encontrado:
+            chave = encontrado[1]
+            if chave in CAMPOS_LINHA_UNICA:
+                dados_encontrados[chave] = texto_linha.split(':', 1)[1].strip()
+            else:
+                novo_modo = chave
+
+        if novo_modo:
+            if modo_captura and texto_capturado:
+                dados_encontrados[modo_captura] = "\n".join(texto_capturado)
+            modo_captura = novo_modo 
+            texto_capturado = [] 
+        elif modo_captura:
+            if texto_linha.startswith("-"):
+                texto_capturado.append(f"• {texto_linha[1:].strip()}")
+            else:
+                texto_capturado.append(texto_linha)
+
+    if modo_captura and texto_capturado:
+        dados_encontrados[modo_captura] = "\n".join(texto_capturado)
+
+    # --- ETAPA 3: VERIFICAÇÃO ---
+    if 'nome_projeto' not in dados_encontrados:
+        return None
+
+    return {
+        "nome_projeto": dados_encontrados.get('nome_projeto'),
+        # AQUI APLICAMOS A SEGURANÇA:
+        "responsavel": encriptar_dado(dados_encontrados.get('responsavel')), # Salva criptografado
+        "status": dados_encontrados.get('status'),
+        "data_ultima_atualizacao": dados_encontrados.get('data_ultima_atualizacao'),
+        "fonte_dados": caminho_arquivo,
+        "resumo_executivo": dados_encontrados.get('resumo_executivo'),
+        "progresso_atual": dados_encontrados.get('progresso_atual'),
+        "principais_desafios": dados_encontrados.get('principais_desafios'),
+        "acoes_corretivas": dados_encontrados.get('acoes_corretivas'),
+        "perspectiva": dados_encontrados.get('perspectiva')
+    }
+
+
 def processar_dados_word():
     conexao = None
     try:
-        # --- ETAPA 1: LER O ARQUIVO WORD ---
-        documento = docx.Document(CAMINHO_ARQUIVO_WORD)
+        # --- ETAPA 1 a 3: LER O WORD E PESCAR AS SEÇÕES ---
+        print("Iniciando 'modo detetive 3.1'...")
+        registro = extrair_registro_word(CAMINHO_ARQUIVO_WORD)
         print(f"Arquivo '{CAMINHO_ARQUIVO_WORD}' lido com sucesso.")
 
-        # --- ETAPA 2: A "PESCARIA" AVANÇADA ---
-        print("Iniciando 'modo detetive 3.1'...")
-        
-        dados_encontrados = {}
-        modo_captura = None 
-        texto_capturado = [] 
-
-        # Marcadores baseados no seu arquivo real
-        MARCADORES = {
-            "Nome do Projeto:": "nome_projeto",
-            "Responsável:": "responsavel",
-            "Status:": "status",
-            "Data:": "data_ultima_atualizacao",
-            "1. Resumo Executivo": "resumo_executivo",
-            "2. Progresso Atual": "progresso_atual",
-            "3. Principais Desafios": "principais_desafios",
-            "4. Ações Corretivas": "acoes_corretivas",
-            "5. Perspectiva": "perspectiva"
-        }
-        
-        for paragrafo in documento.paragraphs:
-            texto_linha = paragrafo.text.strip()
-            if not texto_linha: continue
-
-            novo_modo = None
-            for marcador, chave in MARCADORES.items():
-                if texto_linha.startswith(marcador):
-                    novo_modo = chave
-                    if chave in ["nome_projeto", "responsavel", "status", "data_ultima_atualizacao"]:
-                        dados_encontrados[chave] = texto_linha.split(':', 1)[1].strip()
-                        novo_modo = None
-                    break 
-
-            if novo_modo:
-                if modo_captura and texto_capturado:
-                    dados_encontrados[modo_captura] = "\n".join(texto_capturado)
-                modo_captura = novo_modo 
-                texto_capturado = [] 
-            elif modo_captura:
-                if texto_linha.startswith("-"):
-                    texto_capturado.append(f"• {texto_linha[1:].strip()}")
-                else:
-                    texto_capturado.append(texto_linha)
-
-        if modo_captura and texto_capturado:
-            dados_encontrados[modo_captura] = "\n".join(texto_capturado)
-
-        # --- ETAPA 3: VERIFICAÇÃO ---
-        if 'nome_projeto' not in dados_encontrados:
+        if not registro:
             print("ERRO: Não foi possível encontrar o marcador 'Nome do Projeto:'.")
             return 
 
-        print(f"Dados detalhados extraídos para: {dados_encontrados.get('nome_projeto')}")
+        nome = registro.pop("nome_projeto")
+        print(f"Dados detalhados extraídos para: {nome}")
 
         # --- ETAPA 4: LÓGICA UPSERT COM SEGURANÇA ---
-        conexao = sqlite3.connect(CAMINHO_BANCO)
+        conexao = conectar(CAMINHO_BANCO)
         cursor = conexao.cursor()
-
-        nome = dados_encontrados.get('nome_projeto')
-        
-        # AQUI APLICAMOS A SEGURANÇA:
-        responsavel_seguro = encriptar_dado(dados_encontrados.get('responsavel'))
-        
-        dados_completos = {
-            "responsavel": responsavel_seguro, # Salva criptografado
-            "status": dados_encontrados.get('status'),
-            "data_ultima_atualizacao": dados_encontrados.get('data_ultima_atualizacao'),
-            "fonte_dados": CAMINHO_ARQUIVO_WORD,
-            "resumo_executivo": dados_encontrados.get('resumo_executivo'),
-            "progresso_atual": dados_encontrados.get('progresso_atual'),
-            "principais_desafios": dados_encontrados.get('principais_desafios'),
-            "acoes_corretivas": dados_encontrados.get('acoes_corretivas'),
-            "perspectiva": dados_encontrados.get('perspectiva')
-        }
-
-        cursor.execute("SELECT id FROM projetos WHERE nome_projeto = ?", (nome,))
-        projeto_existente = cursor.fetchone()
-
-        if projeto_existente:
-            # UPDATE
-            id_projeto = projeto_existente[0]
-            sql_update = """
-            UPDATE projetos SET 
-                responsavel = ?, status = ?, data_ultima_atualizacao = ?, fonte_dados = ?,
-                resumo_executivo = ?, progresso_atual = ?, principais_desafios = ?,
-                acoes_corretivas = ?, perspectiva = ?
-            WHERE id = ?
-            """
-            valores = list(dados_completos.values()) + [id_projeto]
-            cursor.execute(sql_update, valores)
-            print(f"Sucesso! Projeto '{nome}' ATUALIZADO (Seguro).")
-        else:
-            # INSERT
-            sql_insert = """
-            INSERT INTO projetos (
-                nome_projeto, responsavel, status, data_ultima_atualizacao, fonte_dados,
-                resumo_executivo, progresso_atual, principais_desafios,
-                acoes_corretivas, perspectiva
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """
-            valores = [nome] + list(dados_completos.values())
-            cursor.execute(sql_insert, valores)
-            print(f"Sucesso! Projeto '{nome}' INSERIDO (Seguro).")
-
+        id_projeto, inserido = upsert_projeto(cursor, nome, registro)
+        atualizar_insights_desatualizados(cursor, [nome])
+        indexar_projetos(cursor, [nome])
         conexao.commit()
+        situacao = "INSERIDO" if inserido else "ATUALIZADO"
+        print(f"Sucesso! Projeto '{nome}' {situacao} (Seguro, ID {id_projeto}).")
 
     except Exception as e:
         print(f"ERRO inesperado ao processar Word: {e}")
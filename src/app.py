@@ -1,3 +1,4 @@
+import os
 import streamlit as st
 import streamlit.components.v1 as components
 from pathlib import Path
@@ -20,6 +21,7 @@ from Components.Pages.aprovacao_contas import render_aprovacao_contas_page
 from Components.Pages.aprovacao_mudanca_cargo import render_aprovacao_mudanca_cargo_page
 from Components.Pages.criar_projeto import render_criar_projeto_page
 from Components.Pages.gerenciar_projetos import render_gerenciar_projetos_page
+from AI.processador_ia import iniciar_aquecimento_modelo
 
 # --- Configuração da Página ---
 st.set_page_config(
@@ -28,6 +30,11 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# --- MODELO DE IA ---
+# Carrega o FLAN-T5 em segundo plano uma vez por processo (as próximas chamadas não fazem nada)
+if os.getenv("AQUECER_MODELO_IA", "1") != "0":
+    iniciar_aquecimento_modelo()
+
 # --- CSS ---
 css_path = Path(__file__).parent / "Styles/styles.css"
 if css_path.exists():
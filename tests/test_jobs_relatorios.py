@@ -0,0 +1,78 @@
+"""
+Regressão: ao subir, um processo devolvia para a fila todos os jobs executando,
+inclusive os de outro processo vivo usando o mesmo banco.
+
+Uso:
+    python -m unittest discover tests
+"""
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from Database import jobs_relatorios
+
+
+class TestRecolocarJobs(unittest.TestCase):
+
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.conexao = jobs_relatorios.conectar(os.path.join(self.pasta.name, "jobs.db"))
+        jobs_relatorios.garantir_tabela_jobs(self.conexao)
+
+    def tearDown(self):
+        self.conexao.close()
+        self.pasta.cleanup()
+
+    def _job_executando(self, dono):
+        jobs_relatorios.inserir_job(self.conexao, f"usuario-{dono}", "conteúdo")
+        return jobs_relatorios.reservar_proximo_job(self.conexao, 1, dono)["id"]
+
+    def _pid_morto(self):
+        processo = subprocess.Popen([sys.executable, "-c", "pass"])
+        processo.wait()
+        return processo.pid
+
+    def _status(self, job_id):
+        return jobs_relatorios.status_do_job(self.conexao, job_id)
+
+    def test_nao_recoloca_job_de_processo_vivo(self):
+        job_outro_host = self._job_executando("outro-servidor:1234")
+        job_deste_processo = self._job_executando(jobs_relatorios.identificar_processo())
+        self.assertEqual(jobs_relatorios.recolocar_jobs_interrompidos(self.conexao), 0)
+        self.assertEqual(self._status(job_outro_host), jobs_relatorios.STATUS_EXECUTANDO)
+        self.assertEqual(self._status(job_deste_processo), jobs_relatorios.STATUS_EXECUTANDO)
+
+    def test_recoloca_job_de_pid_morto_neste_host(self):
+        job_id = self._job_executando(f"{socket.gethostname()}:{self._pid_morto()}")
+        self.assertEqual(jobs_relatorios.recolocar_jobs_interrompidos(self.conexao), 1)
+        job = jobs_relatorios.buscar_job(self.conexao, job_id)
+        self.assertEqual(job["status"], jobs_relatorios.STATUS_NA_FILA)
+        self.assertIsNone(job["dono"])
+
+    def test_recoloca_job_sem_sinal(self):
+        job_id = self._job_executando("outro-servidor:1234")
+        self.conexao.execute(
+            "UPDATE jobs_relatorios SET sinal_em = ? WHERE id = ?",
+            (time.time() - jobs_relatorios.JOB_SEM_SINAL_SEGUNDOS - 1, job_id)
+        )
+        self.conexao.commit()
+        self.assertEqual(jobs_relatorios.recolocar_jobs_interrompidos(self.conexao), 1)
+        self.assertEqual(self._status(job_id), jobs_relatorios.STATUS_NA_FILA)
+
+    def test_renovar_sinal_mantem_o_job(self):
+        dono = jobs_relatorios.identificar_processo()
+        job_id = self._job_executando(dono)
+        self.conexao.execute("UPDATE jobs_relatorios SET sinal_em = 0 WHERE id = ?", (job_id,))
+        self.conexao.commit()
+        self.assertEqual(jobs_relatorios.renovar_sinal(self.conexao, dono), 1)
+        self.assertEqual(jobs_relatorios.recolocar_jobs_interrompidos(self.conexao), 0)
+        self.assertEqual(self._status(job_id), jobs_relatorios.STATUS_EXECUTANDO)
+
+
+if __name__ == "__main__":
+    unittest.main()
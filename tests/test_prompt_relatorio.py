@@ -0,0 +1,36 @@
+"""
+Regressão: instruções personalizadas não podem tomar a janela do documento.
+
+Uso:
+    python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from AI.prompt_relatorio import TOKENS_MINIMOS_DOCUMENTO, montar_prompt, tokens_para_documento
+from test_resumo_longo import TokenizerPalavras
+
+DOCUMENTO = "palavra " * 100000
+
+
+class TestPromptPersonalizado(unittest.TestCase):
+
+    def test_reserva_tokens_do_documento(self):
+        for tokenizer in (None, TokenizerPalavras()):
+            for foco in ("", "foco " * 300, "foco " * 50000):
+                self.assertGreaterEqual(tokens_para_documento(tokenizer, "Médio", foco), TOKENS_MINIMOS_DOCUMENTO)
+                _, informacoes = montar_prompt(DOCUMENTO, "Médio", foco, tokenizer)
+                self.assertGreaterEqual(informacoes["tokens_documento"], TOKENS_MINIMOS_DOCUMENTO)
+                self.assertLessEqual(informacoes["tokens_usados"], informacoes["orcamento"])
+                self.assertEqual(informacoes["instrucoes_cortadas"], len(foco) > 1000)
+
+    def test_instrucoes_curtas_ficam_inteiras(self):
+        prompt, informacoes = montar_prompt("texto curto", "Médio", "riscos de prazo", TokenizerPalavras())
+        self.assertIn("Foco especial: riscos de prazo", prompt)
+        self.assertEqual(informacoes["tokens_descartados"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Regressão: orçamento de documento zero ou minúsculo no resumo longo.
+
+Com o "Foco especial" ocupando a janela inteira, tokens_para_documento devolvia
+0 e o map-reduce ficava em loop infinito em dividir_em_blocos.
+
+Uso:
+    python -m unittest discover tests
+"""
+import os
+import re
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from AI.orcamento_geracao import OrcamentoGeracao
+from AI.resumo_longo import FRACAO_PRAZO_RESUMO, TOKENS_RESUMO_BLOCO, condensar_documento, dividir_em_blocos
+
+DOCUMENTO = " ".join(f"Frase {i} do relatório de riscos com dados do projeto." for i in range(400))
+
+
+class TokenizerPalavras:
+    """Tokenizer rápido falso: uma palavra por token, com offsets."""
+
+    def __call__(self, texto, add_special_tokens=True, return_offsets_mapping=False):
+        if isinstance(texto, list):
+            return {"input_ids": [self(t)["input_ids"] for t in texto]}
+        offsets = [(m.start(), m.end()) for m in re.finditer(r"\S+", texto)]
+        saida = {"input_ids": list(range(len(offsets)))}
+        if return_offsets_mapping:
+            saida["offset_mapping"] = offsets
+        return saida
+
+
+class ModeloFalso:
+    """Pipeline falso: devolve as primeiras palavras de cada trecho (ou o trecho inteiro)."""
+
+    def __init__(self, tokenizer=None, palavras=None, segundos_por_chamada=0.0):
+        self.tokenizer = tokenizer
+        self.palavras = palavras
+        self.segundos_por_chamada = segundos_por_chamada
+        self.chamadas = 0
+
+    def __call__(self, prompts, batch_size=1, **parametros):
+        self.chamadas += 1
+        time.sleep(self.segundos_por_chamada)
+        saidas = []
+        for prompt in prompts:
+            trecho = prompt.split("Trecho:\n", 1)[-1].rsplit("\n\nResumo:", 1)[0]
+            palavras = trecho.split()
+            if self.palavras is not None:
+                palavras = palavras[:self.palavras]
+            saidas.append([{"generated_text": " ".join(palavras)}])
+        return saidas
+
+
+class TestOrcamentoPequeno(unittest.TestCase):
+
+    def test_bloco_zero_levanta_erro(self):
+        for tokenizer in (None, TokenizerPalavras()):
+            with self.assertRaises(ValueError):
+                dividir_em_blocos(DOCUMENTO, tokenizer, 0)
+
+    def test_bloco_de_um_token_avanca(self):
+        blocos = dividir_em_blocos("um dois três", TokenizerPalavras(), 1)
+        self.assertEqual(" ".join(blocos), "um dois três")
+
+    def test_alvo_zero_nao_resume(self):
+        for tokenizer in (None, TokenizerPalavras()):
+            modelo = ModeloFalso(tokenizer, palavras=5)
+            self.assertEqual(condensar_documento(modelo, DOCUMENTO, tokens_alvo=0), "")
+            self.assertEqual(modelo.chamadas, 0)
+
+    def test_alvo_minusculo_corta_sem_resumir(self):
+        tokenizer = TokenizerPalavras()
+        modelo = ModeloFalso(tokenizer, palavras=5)
+        for alvo in (1, 10, TOKENS_RESUMO_BLOCO):
+            texto = condensar_documento(modelo, DOCUMENTO, tokens_alvo=alvo)
+            self.assertTrue(0 < len(texto.split()) <= alvo)
+        self.assertEqual(modelo.chamadas, 0)
+
+    def test_para_quando_o_nivel_nao_encolhe(self):
+        # Modelo que devolve o trecho inteiro: nenhum nível reduz o texto
+        tokenizer = TokenizerPalavras()
+        modelo = ModeloFalso(tokenizer)
+        texto = condensar_documento(modelo, DOCUMENTO, tokens_alvo=200)
+        self.assertTrue(len(texto.split()) <= 200)
+        chamadas_um_nivel = -(-len(dividir_em_blocos(DOCUMENTO, tokenizer)) // 8)
+        self.assertEqual(modelo.chamadas, chamadas_um_nivel)
+
+    def test_converge_com_resumos_curtos(self):
+        tokenizer = TokenizerPalavras()
+        modelo = ModeloFalso(tokenizer, palavras=5)
+        texto = condensar_documento(modelo, DOCUMENTO, tokens_alvo=200)
+        self.assertTrue(0 < len(texto.split()) <= 200)
+
+
+class TestPrazoDoResumo(unittest.TestCase):
+
+    def test_resumo_para_no_prazo(self):
+        tokenizer = TokenizerPalavras()
+        modelo = ModeloFalso(tokenizer, palavras=5, segundos_por_chamada=0.05)
+        orcamento = OrcamentoGeracao(segundos=0.2)
+        orcamento.iniciar()
+        texto = condensar_documento(modelo, DOCUMENTO * 5, tokens_alvo=200, orcamento=orcamento)
+        self.assertTrue(len(texto.split()) <= 200)
+        # Para no primeiro lote depois de FRACAO_PRAZO_RESUMO do prazo (não resume os 59 blocos)
+        self.assertLessEqual(modelo.chamadas, int(0.2 * FRACAO_PRAZO_RESUMO / 0.05) + 1)
+        self.assertIsNone(orcamento.limite_atingido)
+
+
+if __name__ == "__main__":
+    unittest.main()